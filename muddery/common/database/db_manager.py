@@ -1,7 +1,8 @@
 
 import importlib
 import inspect
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import delete
 from sqlalchemy import inspect as sql_inspect
 from muddery.common.database.engines import get_engine, get_db_link
@@ -17,6 +18,8 @@ class DBManager(Singleton):
         self.logger = logger
         self.engine = None
         self.session = None
+        self.async_engine = None
+        self.async_sessionmaker = None
         self.connected = False
 
     def connect(self):
@@ -29,6 +32,11 @@ class DBManager(Singleton):
         try:
             self.engine = get_engine(self.config["ENGINE"], self.config)
             self.session = Session(self.engine, autocommit=True)
+
+            if self.config.get("ASYNC"):
+                # Create an asyncio engine for async storages.
+                self.async_engine = get_engine(self.config["ENGINE"], self.config, is_async=True)
+                self.async_sessionmaker = sessionmaker(self.async_engine, class_=AsyncSession, expire_on_commit=False)
         except Exception as e:
             self.logger.log_trace("Can not connect to db.")
             raise e
@@ -78,6 +86,18 @@ class DBManager(Singleton):
         """
         return self.session
 
+    def get_async_engine(self):
+        """
+        The asyncio engine of the database connection.
+        """
+        return self.async_engine
+
+    def get_async_sessionmaker(self):
+        """
+        The factory of asyncio sessions.
+        """
+        return self.async_sessionmaker
+
     def get_tables(self):
         """
         Get all tables' names of a scheme.
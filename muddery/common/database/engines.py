@@ -3,38 +3,54 @@ Create sqlalchemy engines.
 """
 
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
 
 
-def get_engine(db_type, configs):
+def get_engine(db_type, configs, is_async=False):
     """
     Get an engine according to the database type.
+
+    Args:
+        db_type: (string) database's type.
+        configs: (dict) database's configs.
+        is_async: (boolean) create an asyncio engine.
     """
-    db_link = get_db_link(db_type, configs)
-    return create_engine(db_link, echo=configs["DEBUG"])
+    db_link = get_db_link(db_type, configs, is_async)
+    if is_async:
+        return create_async_engine(db_link, echo=configs["DEBUG"])
+    else:
+        return create_engine(db_link, echo=configs["DEBUG"])
 
 
-def get_db_link(db_type, configs):
+def get_db_link(db_type, configs, is_async=False):
     if db_type == "sqlite3":
-        return get_sqlite3_link(configs)
+        return get_sqlite3_link(configs, is_async)
     elif db_type == "mysql":
-        return get_mysql_link(configs)
+        return get_mysql_link(configs, is_async)
 
 
-def get_sqlite3_link(configs):
+def get_sqlite3_link(configs, is_async=False):
     """
     Get a sqlite3 engine with configs.
+    The asyncio engine uses the aiosqlite driver.
     """
-    link = "sqlite:///{path}?check_same_thread=False".format(path=configs["NAME"])
+    if is_async:
+        link = "sqlite+aiosqlite:///{path}".format(path=configs["NAME"])
+    else:
+        link = "sqlite:///{path}?check_same_thread=False".format(path=configs["NAME"])
     return link
 
 
-def get_mysql_link(configs):
+def get_mysql_link(configs, is_async=False):
     """
     Get a mysql engine with configs.
     mysql+pymysql://root:*@localhost:3306/blog?charset=utf8
 
+    The asyncio engine uses the aiomysql driver.
     """
-    link = "mysql+pymysql://{user}:{password}@{host}{port}/{name}".format(
+    driver = "mysql+aiomysql" if is_async else "mysql+pymysql"
+    link = "{driver}://{user}:{password}@{host}{port}/{name}".format(
+               driver=driver,
                user=configs["USER"],
                password=configs["PASSWORD"],
                host=configs["HOST"] if configs["HOST"] else "localhost",
@@ -82,3 +82,27 @@ async def file_response(file_obj, filename):
         headers=headers,
         content_type=mime_type,
     )
+
+
+async def stream_response(chunks, filename):
+    """
+    Respond a file made by a generator.
+
+    Args:
+        chunks: (iterable) chunks of the file's content.
+        filename: (string) filename.
+    """
+    async def streaming_fn(response):
+        for content in chunks:
+            if content:
+                await response.write(content)
+
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    mime_type = guess_type(filename)[0] or "text/plain"
+
+    return ResponseStream(
+        streaming_fn=streaming_fn,
+        status=200,
+        headers=headers,
+        content_type=mime_type,
+    )
@@ -32,7 +32,6 @@ class Logger(object):
 
         # Set log level.
         logger.setLevel(log_level)
-        logging.getLogger('apscheduler.executors.default').setLevel(log_level)
 
         # Divide logs by date.
         if log_file:
@@ -5,6 +5,11 @@ This module parse data files to lines.
 import csv
 import xlrd
 
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
 
 class DataReader(object):
     """
@@ -98,9 +103,9 @@ class CSVReader(DataReader):
 
 class XLSReader(DataReader):
     """
-    XLS/XLSX file's reader.
+    XLS file's reader.
     """
-    types = ("xls", "xlsx")
+    types = ("xls",)
 
     def __init__(self, filename=None):
         """
@@ -119,7 +124,8 @@ class XLSReader(DataReader):
         self.sheet = None
 
         if filename:
-            self.book = xlrd.open_workbook(filename)
+            # Only load the first sheet.
+            self.book = xlrd.open_workbook(filename, on_demand=True)
             self.sheet = self.book.sheet_by_index(0)
 
     def readln(self):
@@ -140,8 +146,66 @@ class XLSReader(DataReader):
         self.row_pos += 1
         return self.sheet.row_values(pos)
 
+    def close(self):
+        """
+        Close the file.
+        """
+        if self.book:
+            self.book.release_resources()
+            self.book = None
+            self.sheet = None
+
+
+class XLSXReader(DataReader):
+    """
+    XLSX file's reader. Rows are read from the file one by one in the read-only mode.
+    """
+    types = ("xlsx",)
+
+    def __init__(self, filename=None):
+        """
+        Args:
+            filename: (String) data file's name.
+
+        Returns:
+            None
+        """
+        super(XLSXReader, self).__init__(filename)
+
+        self.book = None
+        self.rows = None
+
+        if filename:
+            if not openpyxl:
+                raise ImportError('You need to install "openpyxl" first to import xlsx files!')
+
+            self.book = openpyxl.load_workbook(filename, read_only=True, data_only=True)
+            self.rows = self.book.worksheets[0].iter_rows(values_only=True)
+
+    def readln(self):
+        """
+        Read data line.
+
+        Returns:
+            list: data line
+        """
+        if not self.rows:
+            raise StopIteration
+
+        # Read line.
+        return ["" if value is None else str(value) for value in next(self.rows)]
+
+    def close(self):
+        """
+        Close the file.
+        """
+        if self.book:
+            self.book.close()
+            self.book = None
+            self.rows = None
+
 
-all_readers = [CSVReader, XLSReader]
+all_readers = [CSVReader, XLSReader, XLSXReader]
 def get_readers():
     """
     Get all available writers.
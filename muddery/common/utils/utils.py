@@ -7,6 +7,7 @@ be of use when designing your own game.
 """
 
 import os, inspect
+import ast
 import asyncio
 import importlib
 from pkgutil import iter_modules
@@ -110,6 +111,28 @@ async def async_gather(coros: list):
     return await asyncio.gather(*coros)
 
 
+class RawString(str):
+    """
+    A text which is not a python literal. It is used as a string, but can be told from parsed
+    string literals.
+    """
+    __slots__ = ()
+
+
+def parse_literal(text):
+    """
+    Parse a python literal.
+
+    Returns:
+        (tuple) (value, is_literal). If the text is not a literal, returns (RawString(text), False),
+        the text is treated as a raw string.
+    """
+    try:
+        return ast.literal_eval(text), True
+    except (SyntaxError, ValueError, TypeError) as e:
+        return RawString(text), False
+
+
 def write_pid_file(filename, pid):
     """
     Write a pid to a file.
@@ -2,6 +2,7 @@
 This module parse data files to lines.
 """
 
+import io
 import csv
 import codecs
 
@@ -11,9 +12,9 @@ except ImportError:
     xlwt = None
 
 try:
-    import xlsxwriter
+    import openpyxl
 except ImportError:
-    xlsxwriter = None
+    openpyxl = None
 
 
 class DataWriter(object):
@@ -24,15 +25,18 @@ class DataWriter(object):
     name = None
     file_ext = None
 
-    def __init__(self, filename = None):
+    def __init__(self, filename=None, file_obj=None):
         """
         Args:
             filename: (String) data file's name.
+            file_obj: (binary file object) write data to this file object instead of the file.
+                      The file object is closed when the writer is saved.
 
         Returns:
             None
         """
         self.filename = filename
+        self.file_obj = file_obj
 
     def writeln(self, line):
         """
@@ -65,19 +69,23 @@ class CSVWriter(DataWriter):
     name = "csv"
     file_ext = "csv"
 
-    def __init__(self, filename=None):
+    def __init__(self, filename=None, file_obj=None):
         """
         Args:
             filename: (String) data file's name.
+            file_obj: (binary file object) write data to this file object instead of the file.
 
         Returns:
             None
         """
-        super(CSVWriter, self).__init__(filename)
+        super(CSVWriter, self).__init__(filename, file_obj)
 
         self.data_file = None
         self.writer = None
-        if filename:
+        if file_obj:
+            self.data_file = io.TextIOWrapper(file_obj, encoding="utf-8", newline='')
+            self.writer = csv.writer(self.data_file, dialect='excel')
+        elif filename:
             self.data_file = open(filename, 'w', encoding="utf-8", newline='')
             self.writer = csv.writer(self.data_file, dialect='excel')
 
@@ -119,19 +127,25 @@ class CSVWindowsWriter(DataWriter):
     name = "csv (For Windows)"
     file_ext = "csv"
 
-    def __init__(self, filename=None):
+    def __init__(self, filename=None, file_obj=None):
         """
         Args:
             filename: (String) data file's name.
+            file_obj: (binary file object) write data to this file object instead of the file.
 
         Returns:
             None
         """
-        super(CSVWindowsWriter, self).__init__(filename)
+        super(CSVWindowsWriter, self).__init__(filename, file_obj)
 
         self.data_file = None
         self.writer = None
-        if filename:
+        if file_obj:
+            # Add BOM.
+            file_obj.write(codecs.BOM_UTF8)
+            self.data_file = io.TextIOWrapper(file_obj, encoding="utf-8", newline='')
+            self.writer = csv.writer(self.data_file, dialect='excel')
+        elif filename:
             # Add BOM.
             with open(filename, 'wb') as fp:
                 fp.write(codecs.BOM_UTF8)
@@ -178,15 +192,16 @@ class XLSWriter(DataWriter):
     name = "xls"
     file_ext = "xls"
 
-    def __init__(self, filename=None):
+    def __init__(self, filename=None, file_obj=None):
         """
         Args:
             filename: (String) data file's name.
+            file_obj: (binary file object) write data to this file object instead of the file.
 
         Returns:
             None
         """
-        super(XLSWriter, self).__init__(filename)
+        super(XLSWriter, self).__init__(filename, file_obj)
 
         if not xlwt:
             print('**********************************************************')
@@ -199,7 +214,7 @@ class XLSWriter(DataWriter):
         self.book = None
         self.sheet = None
         self.row_pos = 0
-        if filename:
+        if filename or file_obj:
             self.book = xlwt.Workbook(encoding='utf-8')
             self.sheet = self.book.add_sheet("sheet 1")
 
@@ -233,44 +248,47 @@ class XLSWriter(DataWriter):
         if not self.book:
             return
 
-        self.book.save(self.filename)
+        if self.file_obj:
+            self.book.save(self.file_obj)
+            self.file_obj.close()
+        else:
+            self.book.save(self.filename)
 
 
 class XLSXWriter(DataWriter):
     """
-    XLSX file's writer.
-    
-    IT HAS PROBLEMS ON WINDOWS!
+    XLSX file's writer. Rows are written to a temporary file in the write-only mode,
+    so the workbook is not built in the memory.
     """
     type = "xlsx"
     name = "xlsx"
     file_ext = "xlsx"
 
-    def __init__(self, filename=None):
+    def __init__(self, filename=None, file_obj=None):
         """
         Args:
             filename: (String) data file's name.
+            file_obj: (binary file object) write data to this file object instead of the file.
 
         Returns:
             None
         """
-        super(XLSXWriter, self).__init__(filename)
+        super(XLSXWriter, self).__init__(filename, file_obj)
 
-        if not xlwt:
+        self.book = None
+        self.sheet = None
+
+        if not openpyxl:
             print('**********************************************************')
-            print('You need to install "xlsxwriter" first to export xlsx files!')
-            print('You can use "pip install xlsxw'
-                  'riter" to install it!         ')
+            print('You need to install "openpyxl" first to export xlsx files!')
+            print('You can use "pip install openpyxl" to install it!         ')
             print('**********************************************************')
             return
 
         # create file
-        self.book = None
-        self.sheet = None
-        self.row_pos = 0
-        if filename:
-            self.book = xlsxwriter.Workbook(filename)
-            self.sheet = self.book.add_worksheet("sheet 1")
+        if filename or file_obj:
+            self.book = openpyxl.Workbook(write_only=True)
+            self.sheet = self.book.create_sheet("sheet 1")
 
     def writeln(self, line):
         """
@@ -286,9 +304,7 @@ class XLSXWriter(DataWriter):
             return False
 
         # write line
-        self.sheet.write_row(self.row_pos, 0, line)
-
-        self.row_pos += 1
+        self.sheet.append(line)
         return True
 
     def save(self):
@@ -301,10 +317,14 @@ class XLSXWriter(DataWriter):
         if not self.book:
             return
 
-        self.book.close()
+        if self.file_obj:
+            self.book.save(self.file_obj)
+            self.file_obj.close()
+        else:
+            self.book.save(self.filename)
 
 
-all_writers = [CSVWindowsWriter, CSVWriter, XLSWriter]
+all_writers = [CSVWindowsWriter, CSVWriter, XLSWriter, XLSXWriter]
 def get_writers():
     """
     Get all available writers.
@@ -21,6 +21,9 @@ class ServerSettings(object):
     # Server-side websocket port to open for the webclient.
     GAME_SERVER_PORT = {GAME_SERVER_PORT}
 
+    # The secret shared with the world editor, used to reload the world.
+    GAME_SERVER_SECRET = "{GAME_SERVER_SECRET}"
+
     # The log level
     LOG_LEVEL = logging.WARNING
 
@@ -21,6 +21,9 @@ class ServerSettings(object):
     # Server-side websocket port to open for the webclient.
     GAME_SERVER_PORT = {GAME_SERVER_PORT}
 
+    # The secret shared with the world editor, used to reload the world.
+    GAME_SERVER_SECRET = "{GAME_SERVER_SECRET}"
+
     # Language code for this installation. All choices can be found here:
     # http://www.w3.org/TR/REC-html40/struct/dirlang.html#langcodes
     LANGUAGE_CODE = 'zh-Hans'
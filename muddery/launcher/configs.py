@@ -153,6 +153,17 @@ operations:
       -c, --client          Stop the web client only.
       -e, --editor          Stop the world editor only.
 
+  muddery simulate [-a <key> ...] [-d <key> ...] [-l <level> ...] [-n <number>] [-t <seconds>] [-w <number>] [-o <file>]
+    Simulate combats between characters in the worlddata without running servers.
+    arguments:
+      -a, --attackers       (optional) Attackers' keys, default is all characters.
+      -d, --defenders       (optional) Defenders' keys, default is all characters. Defenders use their default levels.
+      -l, --levels          (optional) Attackers' levels, default is all levels of each attacker.
+      -n, --fights          (optional) Number of combats of each attacker, level and defender, default is 100.
+      -t, --timeout         (optional) Max time of a combat in seconds, default is 300.
+      -w, --workers         (optional) Number of processes, default is the number of CPUs.
+      -o, --output          (optional) Write results to a csv file.
+
   muddery state             Check servers running states.
   muddery createadmin       Create an administrator account in the world editor.
   muddery upgrade           Upgrade a game directory to the latest version.
@@ -266,6 +266,53 @@ def load_system_data():
         raise
 
 
+def simulate_combats(attackers=None, defenders=None, levels=None, fights=100, timeout=300, workers=None,
+                     output=None):
+    """
+    Simulate combats between characters in the worlddata and show win rates and times to kill.
+
+    Args:
+        attackers: (list) attackers' keys, default is all characters.
+        defenders: (list) defenders' keys, default is all characters.
+        levels: (list) attackers' levels, default is all levels of each attacker.
+        fights: (int) number of combats of each attacker, level and defender.
+        timeout: (float) max time of a combat in seconds.
+        workers: (int) number of processes, default is the number of CPUs.
+        output: (string) write results to this csv file.
+    """
+    gamedir = os.path.abspath(configs.CURRENT_DIR)
+
+    from muddery.server.combat import combat_simulator
+    combat_simulator.init_simulation(gamedir)
+
+    grid = combat_simulator.get_grid(attackers, defenders, levels)
+    print("Simulating %d combats of %d characters pairs." % (len(grid) * fights, len(grid)))
+
+    results, seconds = combat_simulator.simulate_grid(gamedir, grid, fights, timeout, workers)
+
+    def format_time(value):
+        return "-" if value is None else "%.1f" % value
+
+    print("%-20s %5s %-20s %5s %6s %6s %6s %6s %8s %8s" % (
+        "attacker", "level", "defender", "level", "win", "lose", "draw", "escape", "kill(s)", "die(s)"))
+    for row in results:
+        print("%-20s %5s %-20s %5s %6.1f%% %5.1f%% %5.1f%% %5.1f%% %8s %8s" % (
+            row["attacker"], row["attacker_level"], row["defender"], row["defender_level"],
+            row["win_rate"] * 100, row["lose_rate"] * 100, row["draw_rate"] * 100, row["escape_rate"] * 100,
+            format_time(row["time_to_kill"]), format_time(row["time_to_die"])))
+
+    print("Simulated %d combats in %.2f seconds, %.0f combats per second." % (
+        len(grid) * fights, seconds, len(grid) * fights / seconds if seconds else 0))
+
+    if output:
+        import csv
+        with open(output, "w", newline="", encoding="utf-8") as fp:
+            writer = csv.DictWriter(fp, fieldnames=results[0].keys() if results else [])
+            writer.writeheader()
+            writer.writerows(results)
+        print("Results are written to %s." % output)
+
+
 def migrate_database(database_name):
     """
     Migrate databases to the latest Muddery version.
@@ -9,6 +9,7 @@ import shutil
 import configparser
 import random
 import string
+import secrets
 from subprocess import check_output, CalledProcessError, STDOUT
 from muddery.common.utils.crypto import RSA
 from muddery.launcher import configs
@@ -188,6 +189,7 @@ def create_game_directory(gamedir, template, port):
     setting_dict = {
         "WEBCLIENT_PORT": port,
         "GAME_SERVER_PORT": port + 1,
+        "GAME_SERVER_SECRET": secrets.token_urlsafe(32),
     }
     create_server_settings_file(gamedir, setting_dict)
     create_webclient_settings(gamedir, setting_dict)
@@ -119,6 +119,34 @@ def main():
             sys.exit(-1)
         sys.exit(0)
 
+    elif sys_argv[1] == "simulate":
+        # Simulate combats between characters.
+        parser = ArgumentParser()
+        parser.add_argument('-a', '--attackers', nargs='+', dest='attackers')
+        parser.add_argument('-d', '--defenders', nargs='+', dest='defenders')
+        parser.add_argument('-l', '--levels', nargs='+', type=int, dest='levels')
+        parser.add_argument('-n', '--fights', type=int, dest='fights', default=100)
+        parser.add_argument('-t', '--timeout', type=float, dest='timeout', default=300)
+        parser.add_argument('-w', '--workers', type=int, dest='workers')
+        parser.add_argument('-o', '--output', dest='output')
+        args, unknown_args = parser.parse_known_args(sys_argv[2:])
+
+        from muddery.launcher import manager
+        try:
+            manager.simulate_combats(
+                attackers=args.attackers,
+                defenders=args.defenders,
+                levels=args.levels,
+                fights=args.fights,
+                timeout=args.timeout,
+                workers=args.workers,
+                output=args.output,
+            )
+        except Exception as e:
+            traceback.print_exc()
+            sys.exit(-1)
+        sys.exit(0)
+
     elif sys_argv[1] == "start":
         # Start servers.
         parser = ArgumentParser()
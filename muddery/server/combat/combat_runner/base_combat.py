@@ -6,7 +6,8 @@ The life of a combat:
 2. set_combat: set teams in the combat and the end time if available, then calls the start_combat.
 3. start_combat: start the combat. Characters in the combat are allowed to use skills.
 4. cast_skill: characters call the cast_skill to use skills in the combat. It casts a skill and check if the
-   combat is finished.
+   combat is finished. Characters casting skills automatically are driven by the CombatTicker, which calls
+   the combat's tick method.
 5. can_finish: Check if the combat is finished. A combat finishes when only one or zero team has alive characters, or
    the combat is timeout. If a combat can finish calls the finish method.
 6. finish: send combat results to all characters.
@@ -16,14 +17,14 @@ The life of a combat:
 
 from enum import Enum
 import time
-import datetime
-import pytz
 import asyncio
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from muddery.common.utils.utils import async_wait, async_gather
 from muddery.common.utils.exception import MudderyError, ERR
 from muddery.common.utils import defines
+from muddery.server.settings import SETTINGS
 from muddery.server.utils.logger import logger
+from muddery.server.utils.timer_handler import TimerHandler
+from muddery.server.combat.combat_ticker import CombatTicker
 from muddery.server.database.worlddata.worlddata import WorldData
 from muddery.server.mappings.element_set import ELEMENT
 from muddery.server.utils.localized_strings_handler import _
@@ -67,12 +68,23 @@ class BaseCombat(object):
         self.rewards = {}
 
         self.timeout = 0
-        self.scheduler = None
+        self.timeout_job = None
+
+        # characters casting skills automatically, {character's id: next cast time}
+        self.auto_casters = {}
+
+        # Fields of characters' combat states sent in the last full state update,
+        # {character's id: set of fields}. Only changes of these fields are sent.
+        self.state_fields = {}
+        self.full_state_time = 0
 
     def __del__(self):
         # When the combat is finished.
-        if self.scheduler:
-            self.scheduler.stop()
+        if self.timeout_job:
+            self.timeout_job.cancel()
+
+        if self.auto_casters:
+            CombatTicker.inst().remove_combat(self.combat_id)
 
     async def at_timeout(self):
         """
@@ -122,16 +134,17 @@ class BaseCombat(object):
         if self.characters:
             await async_wait([c["char"].join_combat(combat_id) for c in self.characters.values()])
 
+            # Record changed states to send them to characters.
+            for char in self.characters.values():
+                char["char"].states.track_changes(True)
+
     def start(self):
         """
         Start a combat, make all NPCs to cast skills automatically.
         """
         if self.timeout:
             # Set finish time.
-            finish_time = datetime.datetime.fromtimestamp(time.time() + self.timeout)
-            self.scheduler = AsyncIOScheduler(timezone=pytz.utc)
-            self.scheduler.add_job(self.at_timeout, "date", run_date=finish_time)
-            self.scheduler.start()
+            self.timeout_job = TimerHandler.inst().call_later(self.timeout, self.at_timeout)
 
         for char in self.characters.values():
             char["status"] = CStatus.ACTIVE
@@ -141,12 +154,139 @@ class BaseCombat(object):
         Stop this combat.
         :return:
         """
+        for char_id in list(self.auto_casters):
+            self.characters[char_id]["char"].stop_auto_combat_skill()
+
+        for char in self.characters.values():
+            char["char"].states.track_changes(False)
+
         self.handler.remove_combat(self.combat_id)
 
+    def add_auto_caster(self, character):
+        """
+        Make a character cast skills automatically.
+
+        Args:
+            character: (object) a character in this combat.
+        """
+        self.auto_casters[character.get_id()] = time.time() + self.get_auto_cast_cd(character)
+        CombatTicker.inst().add_combat(self)
+
+    def remove_auto_caster(self, character):
+        """
+        Stop a character casting skills automatically.
+
+        Args:
+            character: (object) a character in this combat.
+        """
+        if self.auto_casters.pop(character.get_id(), None) is not None and not self.auto_casters:
+            CombatTicker.inst().remove_combat(self.combat_id)
+
+    def get_auto_cast_cd(self, character):
+        """
+        Get the interval of a character's auto casts. It is at least one tick, so the combat's
+        time always advances.
+
+        Args:
+            character: (object) a character in this combat.
+        """
+        return max(character.auto_cast_skill_cd or 0, SETTINGS.COMBAT_TICK_INTERVAL)
+
+    def get_next_tick_time(self):
+        """
+        Get the earliest time of auto casting characters' next casts.
+        """
+        return min(self.auto_casters.values(), default=float("inf"))
+
+    async def tick(self, now):
+        """
+        Called by the combat ticker. Characters whose auto cast cd finished cast skills, then send
+        all results of this tick to characters in one message. The combat's result is checked in
+        another task, so finishing a combat does not block the ticker.
+
+        Args:
+            now: (float) current time.
+        """
+        if await self.cast_auto_skills(now):
+            asyncio.create_task(self.check_finish())
+
+    async def cast_auto_skills(self, now):
+        """
+        Characters whose auto cast cd finished cast skills, then send all results to characters
+        in one message.
+
+        Args:
+            now: (float) current time.
+
+        Returns:
+            (boolean) if any skill is cast.
+        """
+        if self.finished:
+            return False
+
+        casters = [char_id for char_id, cast_time in self.auto_casters.items() if cast_time <= now]
+
+        messages = []
+        for char_id in casters:
+            character = self.characters[char_id]["char"]
+            self.auto_casters[char_id] = now + self.get_auto_cast_cd(character)
+
+            if self.characters[char_id]["status"] != CStatus.ACTIVE:
+                continue
+
+            try:
+                result = await character.auto_cast_skill(self)
+            except Exception as e:
+                logger.log_trace("Auto cast skill error: %s" % e)
+                continue
+
+            if result:
+                messages.append({
+                    "combat_skill_cast": result["result"],
+                })
+
+        if messages:
+            states = await self.get_state_updates()
+            if states:
+                messages[-1]["combat_skill_cast"]["states"] = states
+
+            self.msg_all(messages)
+            return True
+
+        return False
+
     async def cast_skill(self, skill_key, caller, target_id):
         """
         Cast a skill.
 
+        :arg
+            skill_key: (string) skill's key
+            caller: (obj) the skill's caller's object
+            target_id: (int) target's id
+
+        :return
+            {
+                "skill_cd": skill's cd time,
+                "result": cast_result,
+            }
+        """
+        result = await self.do_cast_skill(skill_key, caller, target_id)
+
+        states = await self.get_state_updates()
+        if states:
+            result["result"]["states"] = states
+
+        self.msg_all({
+            "combat_skill_cast": result["result"],
+        })
+        asyncio.create_task(self.check_finish())
+
+        return result
+
+    async def do_cast_skill(self, skill_key, caller, target_id):
+        """
+        Cast a skill without sending messages or checking the combat's result.
+
         :arg
             skill_key: (string) skill's key
             caller: (obj) the skill's caller's object
@@ -169,13 +309,7 @@ class BaseCombat(object):
         if target_id and target_id in self.characters:
             target = self.characters[target_id]["char"]
 
-        result = await caller.cast_skill(skill_key, target)
-        self.msg_all({
-            "combat_skill_cast": result["result"],
-        })
-        asyncio.create_task(self.check_finish())
-
-        return result
+        return await caller.cast_skill(skill_key, target)
 
     async def check_finish(self):
         """
@@ -219,9 +353,12 @@ class BaseCombat(object):
         """
         self.finished = True
 
-        if self.scheduler:
-            self.scheduler.stop()
-            self.scheduler = None
+        if self.timeout_job:
+            self.timeout_job.cancel()
+            self.timeout_job = None
+
+        # Finished combats do not need ticks.
+        CombatTicker.inst().remove_combat(self.combat_id)
 
         # get winners and losers
         self.winners, self.losers = await self.calc_winners()
@@ -282,8 +419,8 @@ class BaseCombat(object):
 
             self.stop()
 
-    def msg_all(self, message: dict) -> None:
-        "Send message to all combatants."
+    def msg_all(self, message: dict or list) -> None:
+        "Send message to all combatants. A list of messages is sent in one package."
         if self.characters:
             [c["char"].msg(message) for c in self.characters.values()]
 
@@ -423,10 +560,37 @@ class BaseCombat(object):
         if self.characters:
             chars = self.characters.keys()
             state = await async_gather([char["char"].get_combat_state() for char in self.characters.values()])
-            return dict(zip(chars, state))
+            states = dict(zip(chars, state))
+            self.state_fields = {char_id: set(char_state) for char_id, char_state in states.items()}
+            return states
         else:
             return {}
 
+    async def get_state_updates(self):
+        """
+        Get characters' states to send after casting skills. Only changed fields are returned,
+        and all characters' full states are returned every COMBAT_FULL_STATE_INTERVAL seconds.
+
+        Returns:
+            (dict) {character's id: {field: value}}
+        """
+        changes = {char_id: char["char"].states.pop_changes() for char_id, char in self.characters.items()}
+
+        now = time.time()
+        if now - self.full_state_time >= SETTINGS.COMBAT_FULL_STATE_INTERVAL:
+            self.full_state_time = now
+            return await self.get_combat_states()
+
+        states = {}
+        for char_id, char_changes in changes.items():
+            fields = self.state_fields.get(char_id)
+            if fields:
+                changed = {key: value for key, value in char_changes.items() if key in fields}
+                if changed:
+                    states[char_id] = changed
+
+        return states
+
     def get_combat_characters(self):
         """
         Get all characters in combat.
@@ -18,7 +18,7 @@ class HonourAutoCombat(HonourCombat):
         # All characters auto cast skills.
         for char in self.characters.values():
             character = char["char"]
-            character.start_auto_combat_skill()
+            character.start_auto_combat_skill(self)
 
     async def finish(self):
         """
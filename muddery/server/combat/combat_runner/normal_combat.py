@@ -19,7 +19,7 @@ class NormalCombat(BaseCombat):
             character = char["char"]
             if not character.is_player():
                 # Monsters auto cast skills
-                character.start_auto_combat_skill()
+                character.start_auto_combat_skill(self)
 
     async def finish(self):
         """
@@ -0,0 +1,107 @@
+"""
+Combat handler.
+"""
+
+import random
+from muddery.server.combat.combat_runner.base_combat import BaseCombat, CStatus
+
+
+class SimulatedCombat(BaseCombat):
+    """
+    A combat running on a virtual clock, used by the combat simulator. All characters cast
+    skills automatically. It does not send messages or give rewards.
+    """
+    def __init__(self):
+        super(SimulatedCombat, self).__init__()
+
+        # virtual time in seconds since the combat began
+        self.now = 0
+
+    async def set_combat(self, handler, combat_id, combat_type, teams, desc, timeout):
+        """
+        Add combatant to handler
+        """
+        await super(SimulatedCombat, self).set_combat(handler, combat_id, combat_type, teams, desc, timeout)
+
+        for char in self.characters.values():
+            char["char"].sim_combat = self
+
+            # No one receives state updates.
+            char["char"].states.track_changes(False)
+
+    def start(self):
+        """
+        Start a combat, make all characters to cast skills automatically.
+        """
+        super(SimulatedCombat, self).start()
+
+        for char in self.characters.values():
+            char["char"].start_auto_combat_skill(self)
+
+    def stop(self):
+        """
+        Stop this combat.
+        """
+        for char_id in list(self.auto_casters):
+            self.characters[char_id]["char"].stop_auto_combat_skill()
+
+    def add_auto_caster(self, character):
+        """
+        Make a character cast skills automatically. The first cast's time is random in the first
+        cd, so the first team does not always cast first.
+        """
+        self.auto_casters[character.get_id()] = self.now + random.random() * self.get_auto_cast_cd(character)
+
+    def remove_auto_caster(self, character):
+        """
+        Stop a character casting skills automatically.
+        """
+        self.auto_casters.pop(character.get_id(), None)
+
+    async def get_state_updates(self):
+        """
+        No one receives state updates.
+        """
+        return {}
+
+    async def can_finish(self):
+        """
+        Check if can finish this combat. Characters are checked one by one, because they do not
+        wait for IO.
+        """
+        teams = set()
+        for char in self.characters.values():
+            if char["status"] == CStatus.ACTIVE and await char["char"].check_alive():
+                teams.add(char["team"])
+                if len(teams) > 1:
+                    return False
+
+        return True
+
+    async def finish(self):
+        """
+        Finish a combat without rewards.
+        """
+        self.finished = True
+        self.winners, self.losers = await self.calc_winners()
+
+        for char in self.characters.values():
+            char["status"] = CStatus.FINISHED
+
+    async def run(self, timeout):
+        """
+        Run ticks until the combat finishes or times out.
+
+        Args:
+            timeout: (float) max combat time in virtual seconds.
+        """
+        while not self.finished:
+            next_time = self.get_next_tick_time()
+            if next_time > timeout:
+                break
+
+            self.now = next_time
+            if await self.cast_auto_skills(self.now):
+                await self.check_finish()
+
+        self.stop()
@@ -0,0 +1,292 @@
+"""
+Headless combat simulator.
+
+Run combats between characters in the worlddata without sessions, timers or the gamedata
+database. Simulated combats use BaseCombat, the game's skill functions and the skill AI, but
+run on a virtual clock, so a combat finishes as fast as its skills can be cast.
+
+Results are collected for every (attacker, defender, attacker's level) cell of a grid, cells
+are simulated in a process pool.
+"""
+
+import os
+import sys
+import time
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from muddery.server.settings import SETTINGS
+from muddery.common.utils import defines
+from muddery.common.utils.defines import CombatType
+
+
+# Simulation's environment has been set in this process.
+_initialized = False
+
+
+def init_simulation(game_dir):
+    """
+    Set up the game's settings and worlddata in this process. It is also the initializer of
+    worker processes.
+
+    Args:
+        game_dir: (string) the game's directory.
+    """
+    global _initialized
+    if _initialized:
+        return
+
+    os.chdir(game_dir)
+    if len(sys.path) == 0 or sys.path[0] != game_dir:
+        sys.path.insert(0, game_dir)
+
+    # Settings must be set before loading other modules.
+    from server.settings import ServerSettings
+    SETTINGS.update(ServerSettings())
+
+    from muddery.server.database.worlddata_db import WorldDataDB
+    from muddery.server.database.worlddata.worlddata import WorldData
+    WorldDataDB.inst().connect()
+    WorldData.init()
+
+    _initialized = True
+
+
+def get_bestiary():
+    """
+    Get all characters in the worlddata.
+
+    Returns:
+        (list) [(character's key, element type, default level)]
+    """
+    from muddery.server.mappings.element_set import ELEMENT
+    from muddery.server.database.worlddata.worlddata import WorldData
+
+    base_model = ELEMENT(SETTINGS.CHARACTER_ELEMENT_TYPE).get_base_model()
+    return [(record.key, record.element_type, record.level) for record in WorldData.get_table_all(base_model)]
+
+
+def get_grid(attackers=None, defenders=None, levels=None):
+    """
+    Get cells of the simulation grid.
+
+    Args:
+        attackers: (list) attackers' keys, default is all characters.
+        defenders: (list) defenders' keys, default is all characters.
+        levels: (list) attackers' levels, default is all levels with properties of each attacker.
+            Defenders use their default levels.
+
+    Returns:
+        (list) [(attacker's key, attacker's level, defender's key, defender's level)]
+    """
+    from muddery.server.database.worlddata.element_properties import ElementProperties
+
+    bestiary = {key: (element_type, level) for key, element_type, level in get_bestiary()}
+    for key in (attackers or []) + (defenders or []):
+        if key not in bestiary:
+            raise KeyError("Can not find character %s." % key)
+
+    grid = []
+    for attacker_key in attackers or bestiary:
+        element_type, default_level = bestiary[attacker_key]
+        attacker_levels = levels or ElementProperties.get_levels(element_type, attacker_key) or [default_level]
+        for level in attacker_levels:
+            for defender_key in defenders or bestiary:
+                grid.append((attacker_key, level, defender_key, bestiary[defender_key][1]))
+
+    return grid
+
+
+class SimulatedCharacter(object):
+    """
+    A character used in simulations. It works like the game's character class, but reads time
+    from its simulated combat and does not use the gamedata database.
+    """
+    # the simulated combat which the character is in
+    sim_combat = None
+
+    @classmethod
+    def create_class(cls, element_type):
+        """
+        Create a simulated character class of an element type. It uses data and properties of
+        the element type.
+
+        Args:
+            element_type: (string) the element type of the character.
+        """
+        from muddery.server.mappings.element_set import ELEMENT
+
+        element_class = ELEMENT(element_type)
+        return type("Simulated" + element_class.__name__, (cls, ELEMENT(SETTINGS.CHARACTER_ELEMENT_TYPE)), {
+            "element_type": element_type,
+            "model_name": "",
+            "_base_model_": element_class.get_base_model(),
+            "_all_models_": element_class.get_models(),
+            "_all_properties_": element_class.get_properties_info(),
+        })
+
+    def get_time(self):
+        """
+        Get the current time of skills' cd.
+        """
+        return self.sim_combat.now if self.sim_combat else 0
+
+    async def get_combat(self):
+        """
+        Get the character's combat.
+        """
+        return self.sim_combat
+
+    async def reset(self):
+        """
+        Set the character's states to default values and clear skills' cd.
+        """
+        await self.refresh_states(False)
+        self.is_alive = True
+        self.combat_id = None
+        self.sim_combat = None
+        self.gcd_finish_time = 0
+        for skill in self.skills.values():
+            skill["cd_finish"] = 0
+
+
+class CombatSimulator(object):
+    """
+    Simulate combats of a grid cell.
+    """
+    def __init__(self):
+        # simulated character classes, {element type: class}
+        self.character_classes = {}
+
+    async def create_character(self, key, level):
+        """
+        Create a simulated character.
+
+        Args:
+            key: (string) character's key.
+            level: (int) character's level.
+        """
+        from muddery.server.mappings.element_set import ELEMENT
+        from muddery.server.database.worlddata.worlddata import WorldData
+
+        base_model = ELEMENT(SETTINGS.CHARACTER_ELEMENT_TYPE).get_base_model()
+        element_type = WorldData.get_table_data(base_model, key=key)[0].element_type
+        if element_type not in self.character_classes:
+            self.character_classes[element_type] = SimulatedCharacter.create_class(element_type)
+
+        character = self.character_classes[element_type]()
+        await character.setup_element(key, level=level, first_time=True, temp=True)
+
+        # Player characters cast their passive skills after they are loaded.
+        if hasattr(ELEMENT(element_type), "cast_passive_skills"):
+            for skill in character.skills.values():
+                if skill["obj"].is_passive():
+                    await skill["obj"].cast(character, character)
+
+        return character
+
+    async def simulate(self, attacker_key, attacker_level, defender_key, defender_level, fights, timeout):
+        """
+        Simulate combats between two characters.
+
+        Args:
+            attacker_key: (string) attacker's key.
+            attacker_level: (int) attacker's level.
+            defender_key: (string) defender's key.
+            defender_level: (int) defender's level.
+            fights: (int) number of combats.
+            timeout: (float) max time of a combat in virtual seconds, timeout combats are draws.
+
+        Returns:
+            (dict) results from the attacker's view.
+        """
+        from muddery.server.combat.combat_runner.simulated_combat import SimulatedCombat
+
+        attacker = await self.create_character(attacker_key, attacker_level)
+        defender = await self.create_character(defender_key, defender_level)
+
+        counts = {
+            defines.COMBAT_WIN: 0,
+            defines.COMBAT_LOSE: 0,
+            defines.COMBAT_DRAW: 0,
+            defines.COMBAT_ESCAPED: 0,
+        }
+        win_time = 0
+        lose_time = 0
+
+        for i in range(fights):
+            await attacker.reset()
+            await defender.reset()
+
+            combat = SimulatedCombat()
+            await combat.set_combat(None, i, CombatType.NORMAL, {1: [attacker], 2: [defender]}, "", 0)
+            combat.start()
+            await combat.run(timeout)
+
+            if combat.finished:
+                result = combat.get_combat_result(attacker.get_id())[0]
+            else:
+                result = defines.COMBAT_DRAW
+            counts[result] += 1
+
+            if result == defines.COMBAT_WIN:
+                win_time += combat.now
+            elif result == defines.COMBAT_LOSE:
+                lose_time += combat.now
+
+        wins = counts[defines.COMBAT_WIN]
+        loses = counts[defines.COMBAT_LOSE]
+        return {
+            "attacker": attacker_key,
+            "attacker_level": attacker_level,
+            "defender": defender_key,
+            "defender_level": defender_level,
+            "fights": fights,
+            "win_rate": wins / fights,
+            "lose_rate": loses / fights,
+            "draw_rate": counts[defines.COMBAT_DRAW] / fights,
+            "escape_rate": counts[defines.COMBAT_ESCAPED] / fights,
+            "time_to_kill": win_time / wins if wins else None,
+            "time_to_die": lose_time / loses if loses else None,
+        }
+
+
+# The simulator of this process.
+_simulator = None
+
+
+def simulate_cell(cell, fights, timeout):
+    """
+    Simulate a grid cell in this process.
+
+    Args:
+        cell: (tuple) (attacker's key, attacker's level, defender's key, defender's level)
+        fights: (int) number of combats.
+        timeout: (float) max time of a combat in virtual seconds.
+    """
+    global _simulator
+    if _simulator is None:
+        _simulator = CombatSimulator()
+
+    return asyncio.run(_simulator.simulate(*cell, fights, timeout))
+
+
+def simulate_grid(game_dir, grid, fights, timeout, workers=None):
+    """
+    Simulate all cells of a grid in a process pool.
+
+    Args:
+        game_dir: (string) the game's directory.
+        grid: (list) cells of the grid.
+        fights: (int) number of combats of each cell.
+        timeout: (float) max time of a combat in virtual seconds.
+        workers: (int) number of processes, default is the number of CPUs.
+
+    Returns:
+        (list, float) results of cells in the grid's order, and seconds used.
+    """
+    begin = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_simulation, initargs=(game_dir,)) as executor:
+        futures = [executor.submit(simulate_cell, cell, fights, timeout) for cell in grid]
+        results = [future.result() for future in futures]
+
+    return results, time.perf_counter() - begin
@@ -0,0 +1,88 @@
+"""
+Advance all running combats from one timer job.
+
+In every tick, characters casting skills automatically choose and cast skills when their
+auto cast cd finished. Each combat sends all skill results of the tick to its characters in
+one message, then checks if it is finished.
+"""
+
+import time
+from muddery.server.settings import SETTINGS
+from muddery.server.utils.logger import logger
+from muddery.server.utils.timer_handler import TimerHandler
+from muddery.common.utils.utils import async_wait
+from muddery.common.utils.singleton import Singleton
+
+
+class CombatTicker(Singleton):
+    """
+    Run ticks of combats which have auto casting characters.
+    """
+    def __init__(self):
+        # combats with auto casting characters, {combat's id: combat}
+        self.combats = {}
+
+        self.tick_job = None
+
+        # statistics
+        self.ticks = 0
+        self.combat_ticks = 0
+        self.total_tick_time = 0
+        self.last_tick_time = 0
+        self.max_tick_time = 0
+
+    def add_combat(self, combat) -> None:
+        """
+        Add a combat to the ticker. Start the tick job if it is not running.
+        """
+        self.combats[combat.combat_id] = combat
+
+        if self.tick_job is None:
+            self.tick_job = TimerHandler.inst().call_interval(SETTINGS.COMBAT_TICK_INTERVAL, self.tick)
+
+    def remove_combat(self, combat_id) -> None:
+        """
+        Remove a combat from the ticker. Stop the tick job if there are no combats.
+        """
+        self.combats.pop(combat_id, None)
+
+        if not self.combats and self.tick_job is not None:
+            self.tick_job.cancel()
+            self.tick_job = None
+
+    async def tick(self) -> None:
+        """
+        Advance all combats.
+        """
+        if not self.combats:
+            return
+
+        begin = time.perf_counter()
+        now = time.time()
+
+        combats = [combat for combat in self.combats.values() if combat.get_next_tick_time() <= now]
+        if combats:
+            await async_wait([combat.tick(now) for combat in combats])
+
+        tick_time = time.perf_counter() - begin
+        self.ticks += 1
+        self.combat_ticks += len(combats)
+        self.total_tick_time += tick_time
+        self.last_tick_time = tick_time
+        if tick_time > self.max_tick_time:
+            self.max_tick_time = tick_time
+
+        if tick_time > SETTINGS.COMBAT_TICK_INTERVAL:
+            logger.log_warn("Combat tick of %d combats took %.3fs." % (len(combats), tick_time))
+
+    def get_stats(self) -> dict:
+        """
+        Get ticker statistics.
+        """
+        return {
+            "combats": len(self.combats),
+            "ticks": self.ticks,
+            "last_tick_time": self.last_tick_time,
+            "max_tick_time": self.max_tick_time,
+            "combats_per_second": self.combat_ticks / self.total_tick_time if self.total_tick_time else 0,
+        }
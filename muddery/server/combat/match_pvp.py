@@ -1,13 +1,11 @@
 """
 This model translates default strings into localized strings.
 """
-from collections import deque
 import time
-import datetime
-import math
-import pytz
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from muddery.server.settings import SETTINGS
 from muddery.common.utils.exception import MudderyError, ERR
+from muddery.server.utils.timer_handler import TimerHandler
+from muddery.server.utils.logger import logger
 from muddery.server.database.gamedata.honours_mapper import HonoursMapper
 from muddery.server.utils.localized_strings_handler import _
 from muddery.common.utils.defines import CombatType
@@ -31,19 +29,19 @@ class MatchPVPHandler(Singleton):
         self.preparing_time = 0
         self.match_interval = 10
 
-        # waiting_queue: a list of character's db id
-        self.waiting_queue = deque()
+        # waiting_queue: {character's db id: the time of joining the queue}
+        self.waiting_queue = {}
 
         # preparing:
         #   character's db id: {
         #       "time": begin time,
         #       "opponent": match's opponent,
         #       "confirmed": confirmed the combat,
-        #       "job_id": waiting caller's id,
+        #       "job": waiting caller's timer job,
         #   }
         self.preparing = {}
 
-        self.scheduler = AsyncIOScheduler(timezone=pytz.utc)
+        self.match_job = None
         self.loop = None
         self.key = "MATCH_PVP_HANDLER"
 
@@ -62,9 +60,8 @@ class MatchPVPHandler(Singleton):
         """
         # Remove all characters in the waiting queue.
         """
-        for char_db_id, info in self.preparing.values():
-            job_id = info["job_id"]
-            self.scheduler.remove_job(job_id)
+        for char_db_id, info in self.preparing.items():
+            info["job"].cancel()
 
             try:
                 character = Server.world.get_character(char_db_id)
@@ -97,12 +94,15 @@ class MatchPVPHandler(Singleton):
         if honour_settings:
             self.max_honour_diff = honour_settings.max_honour_diff
             self.preparing_time = honour_settings.preparing_time
-            self.match_interval = honour_settings.match_interval
+            if honour_settings.match_interval and honour_settings.match_interval > 0:
+                self.match_interval = honour_settings.match_interval
+            else:
+                logger.log_warn("Invalid match interval: %s, use %s seconds." %
+                                (honour_settings.match_interval, self.match_interval))
 
-        # add the loot job
-        if self.scheduler.get_job(self.key) is None:
-            self.scheduler.add_job(self.match, "interval", seconds=self.match_interval, id=self.key)
-            self.scheduler.start()
+        # add the match job
+        if self.match_job is None:
+            self.match_job = TimerHandler.inst().call_interval(self.match_interval, self.match)
 
     def add(self, character):
         """
@@ -113,7 +113,7 @@ class MatchPVPHandler(Singleton):
         if char_db_id in self.waiting_queue:
             raise MudderyError(ERR.invalid_input, _("You are already in the queue."))
         
-        self.waiting_queue.append(char_db_id)
+        self.waiting_queue[char_db_id] = time.time()
 
     def remove(self, character):
         """
@@ -121,69 +121,96 @@ class MatchPVPHandler(Singleton):
         """
         char_db_id = character.get_db_id()
 
-        try:
-            self.waiting_queue.remove(char_db_id)
-        except ValueError:
-            pass
+        self.waiting_queue.pop(char_db_id, None)
 
         try:
             del self.preparing[char_db_id]
         except KeyError:
             pass
 
+    def get_max_honour_diff(self, waiting_time):
+        """
+        Get the max honour difference of two characters which can be matched. The limit increases
+        with the waiting time, so characters with rare honours can find opponents at last.
+
+        Args:
+            waiting_time: (float) seconds of waiting in the queue.
+
+        Returns:
+            (float) the max honour difference, or None if there is no limit.
+        """
+        # max_honour_diff == 0 means no limits
+        if self.max_honour_diff == 0:
+            return None
+
+        widen_time = SETTINGS.MATCH_PVP_HONOUR_DIFF_WIDEN_TIME
+        if widen_time > 0:
+            return self.max_honour_diff * (1 + waiting_time / widen_time)
+        else:
+            return self.max_honour_diff
+
     async def match(self):
         """
-        Match opponents according to character's scores.
-        The longer a character in the queue, the score is higher.
-        The nearer of two characters' rank, the score is higher.
+        Match opponents according to characters' honours.
+        Characters are sorted by their honours, then neighbours are matched if their honour
+        difference is in the limit. The longer a character waits in the queue, the larger
+        the limit is.
         """
         if len(self.waiting_queue) < 2:
             return
 
-        # match characters by honour differences
-        for i in range(len(self.waiting_queue) - 1):
-            char_id_A = self.waiting_queue[i]
-            if char_id_A in self.preparing:
-                continue
-
-            for j in range(i + 1, len(self.waiting_queue)):
-                char_id_B = self.waiting_queue[j]
-                if char_id_B in self.preparing:
-                    continue
-
-                honour_A = HonoursMapper.inst().get_honour(char_id_A, 0)
-                honour_B = HonoursMapper.inst().get_honour(char_id_B, 0)
-
-                # max_honour_diff means no limits
-                if self.max_honour_diff == 0 or math.fabs(honour_A - honour_B) <= self.max_honour_diff:
-                    # can match
-                    try:
-                        character_A = Server.world.get_character(char_id_A)
-                        character_A.msg({"prepare_match": self.preparing_time})
-                    except KeyError:
-                        pass
-
-                    try:
-                        character_B = Server.world.get_character(char_id_B)
-                        character_B.msg({"prepare_match": self.preparing_time})
-                    except KeyError:
-                        pass
-
-                    job_time = datetime.datetime.now(tz=pytz.utc) + datetime.timedelta(seconds=self.preparing_time)
-                    job = self.scheduler.add_job(self.fight, 'date', run_date=job_time, args=(char_id_A, char_id_B))
-
-                    self.preparing[char_id_A] = {
-                        "time": time.time(),
-                        "opponent": char_id_B,
-                        "confirmed": False,
-                        "job_id": job.id,
-                    }
-                    self.preparing[char_id_B] = {
-                        "time": time.time(),
-                        "opponent": char_id_A,
-                        "confirmed": False,
-                        "job_id": job.id,
-                    }
+        # [(honour, joining time, character's db id)]
+        honours_mapper = HonoursMapper.inst()
+        candidates = [
+            (honours_mapper.get_honour(char_db_id, 0), join_time, char_db_id)
+            for char_db_id, join_time in self.waiting_queue.items()
+            if char_db_id not in self.preparing
+        ]
+        candidates.sort()
+
+        now = time.time()
+        i = 0
+        while i < len(candidates) - 1:
+            honour_A, time_A, char_id_A = candidates[i]
+            honour_B, time_B, char_id_B = candidates[i + 1]
+
+            max_diff = self.get_max_honour_diff(now - min(time_A, time_B))
+            if max_diff is None or honour_B - honour_A <= max_diff:
+                self.prepare_match(char_id_A, char_id_B)
+                i += 2
+            else:
+                i += 1
+
+    def prepare_match(self, char_id_A, char_id_B):
+        """
+        Ask two matched characters to confirm the combat.
+        """
+        try:
+            character_A = Server.world.get_character(char_id_A)
+            character_A.msg({"prepare_match": self.preparing_time})
+        except KeyError:
+            pass
+
+        try:
+            character_B = Server.world.get_character(char_id_B)
+            character_B.msg({"prepare_match": self.preparing_time})
+        except KeyError:
+            pass
+
+        job = TimerHandler.inst().call_later(self.preparing_time, self.fight, char_id_A, char_id_B)
+
+        self.preparing[char_id_A] = {
+            "time": time.time(),
+            "opponent": char_id_B,
+            "confirmed": False,
+            "job": job,
+        }
+        self.preparing[char_id_B] = {
+            "time": time.time(),
+            "opponent": char_id_A,
+            "confirmed": False,
+            "job": job,
+        }
 
     def confirm(self, character):
         """
@@ -207,8 +234,7 @@ class MatchPVPHandler(Singleton):
             return
 
         # stop the call
-        job_id = info["job_id"]
-        self.scheduler.remove_job(job_id)
+        info["job"].cancel()
         
         # remove characters from the preparing queue
         del self.preparing[char_db_id]
@@ -235,10 +261,7 @@ class MatchPVPHandler(Singleton):
             """
             Remove a character from the queue.
             """
-            try:
-                self.waiting_queue.remove(char_db_id)
-            except ValueError:
-                pass
+            self.waiting_queue.pop(char_db_id, None)
 
             try:
                 del self.preparing[char_db_id]
@@ -332,7 +355,7 @@ class MatchPVPHandler(Singleton):
             remove_by_id(char_id_B)
 
             combat_info = combat.get_appearance()
-            combat_states = combat.get_combat_states()
+            combat_states = await combat.get_combat_states()
             name0 = opponent0.get_name()
             name1 = opponent1.get_name()
 
@@ -5,7 +5,6 @@ Query and deal game data.
 
 from muddery.server.settings import SETTINGS
 from muddery.common.utils import utils
-from muddery.server.database.storage.storage_with_cache import StorageWithCache
 from muddery.server.database.gamedata_db import GameDataDB
 
 
@@ -28,13 +27,22 @@ class BaseData(object):
         """
         pass
 
+    def get_db_session(self, storage_class):
+        """
+        Get the db session that the storage class needs.
+        """
+        if getattr(storage_class, "use_async_session", False):
+            return GameDataDB.inst().get_async_sessionmaker()
+        else:
+            return GameDataDB.inst().get_session()
+
     def create_storage(self, table_name, category_name, key_field, default_value_field):
         """
         Create the storage object.
         """
         storage_class = utils.class_from_path(SETTINGS.DATABASE_STORAGE_OBJECT)
         storage = storage_class(
-            GameDataDB.inst().get_session(),
+            self.get_db_session(storage_class),
             SETTINGS.GAMEDATA_DB["MODELS"],
             table_name,
             category_name,
@@ -45,7 +53,8 @@ class BaseData(object):
         cache_class = utils.class_from_path(SETTINGS.DATABASE_CACHE_OBJECT)
         cache = cache_class()
 
-        return StorageWithCache(storage, cache)
+        cached_storage_class = utils.class_from_path(SETTINGS.DATABASE_CACHED_STORAGE_OBJECT)
+        return cached_storage_class(storage, cache)
 
     def create_storage_no_cache(self, table_name, category_name, key_field, default_value_field):
         """
@@ -53,7 +62,7 @@ class BaseData(object):
         """
         storage_class = utils.class_from_path(SETTINGS.DATABASE_STORAGE_OBJECT)
         return storage_class(
-            GameDataDB.inst().get_session(),
+            self.get_db_session(storage_class),
             SETTINGS.GAMEDATA_DB["MODELS"],
             table_name,
             category_name,
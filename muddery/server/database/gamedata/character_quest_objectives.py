@@ -44,7 +44,7 @@ class CharacterQuestObjectives(BaseData, Singleton):
         """
         objective = "%s:%s" % (objective_type, object_key)
 
-        with self.storage.transaction():
+        async with self.storage.transaction():
             data = await self.storage.load(character_id, quest, "{}", for_update=True)
             objectives = json.loads(data)
             objectives[objective] = progress
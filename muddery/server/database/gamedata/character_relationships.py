@@ -48,7 +48,7 @@ class CharacterRelationships(BaseData, Singleton):
                 was found matching `key` and no default value set.
         """
         element = "%s:%s" % (element_type, element_key)
-        with self.storage.transaction():
+        async with self.storage.transaction():
             relationship = await self.storage.load(character_id, element, for_update=True)
             relationship += value
             await self.storage.save(character_id, element, relationship)
@@ -4,6 +4,7 @@ This model translates default strings into localized strings.
 
 import importlib
 import traceback
+from sortedcontainers import SortedList
 from sqlalchemy import select, update, delete
 from muddery.common.utils.singleton import Singleton
 from muddery.server.settings import SETTINGS
@@ -21,8 +22,11 @@ class HonoursMapper(Singleton):
         self.model = getattr(module, self.model_name)
         self.session = GameDataDB.inst().get_session()
 
+        # {character's id: honour}
         self.honours = {}
-        self.rankings = []
+
+        # Ranked characters ordered by honours from high to low, [(-honour, character's id)]
+        self.rankings = SortedList()
 
     async def init(self):
         """
@@ -34,38 +38,40 @@ class HonoursMapper(Singleton):
         """
         Reload all data.
         """
-        self.honours = {}
-        self.rankings = []
-
         stmt = select(self.model)
         result = self.session.execute(stmt)
-        for record in result.scalars():
-            self.honours[record.character] = {
-                "honour": record.honour,
-                "place": 0,
-                "ranking": 0
-            }
-        self.make_rankings()
+        self.honours = {record.character: record.honour for record in result.scalars()}
+
+        # only ranking normal players
+        self.rankings = SortedList((-honour, char_id) for char_id, honour in self.honours.items() if honour >= 0)
 
-    def make_rankings(self):
+    def update_honour(self, char_id, honour):
         """
-        Calculate all character's rankings.
+        Set a character's honour in the memory and update its ranking. Pass None to remove the character.
         """
-        rankings = sorted(self.honours.items(), key=lambda x: x[1]["honour"], reverse=True)
-        # only ranking normal players
-        self.rankings = [item[0] for item in rankings if item[1]["honour"] >= 0]
-        
-        if not self.rankings:
+        old_honour = self.honours.get(char_id)
+        if old_honour is not None and old_honour >= 0:
+            self.rankings.discard((-old_honour, char_id))
+
+        if honour is None:
+            self.honours.pop(char_id, None)
             return
-        
-        last = self.rankings[0]
-        for i, key in enumerate(self.rankings):
-            self.honours[key]["place"] = i
-            self.honours[key]["ranking"] = i + 1
-            if self.honours[key]["honour"] == self.honours[last]["honour"]:
-                self.honours[key]["ranking"] = self.honours[last]["ranking"]
-            last = key
-            
+
+        self.honours[char_id] = honour
+        if honour >= 0:
+            self.rankings.add((-honour, char_id))
+
+    def get_place(self, char_id):
+        """
+        Get a character's position in the ranking list, or None if it is not ranked.
+        """
+        honour = self.honours.get(char_id)
+        if honour is None or honour < 0:
+            return None
+
+        return self.rankings.index((-honour, char_id))
+
+
     def has_info(self, character):
         """
         If a character has honour information.
@@ -76,7 +82,7 @@ class HonoursMapper(Singleton):
         Return:
             boolean: has or not.
         """
-        return character.id in self.honours
+        return character.get_db_id() in self.honours
 
     def get_info(self, character):
         """
@@ -89,7 +95,11 @@ class HonoursMapper(Singleton):
             dict: Character's honour information.
         """
         try:
-            return self.honours[character.id]
+            return {
+                "honour": self.honours[character.get_db_id()],
+                "place": self.get_place(character.get_db_id()),
+                "ranking": self.get_ranking(character.get_db_id()),
+            }
         except Exception as e:
             logger.log_err("Can not get character's honour: %s" % e)
 
@@ -104,7 +114,7 @@ class HonoursMapper(Singleton):
             number: Character's honour.
         """
         try:
-            return self.honours[char_db_id]["honour"]
+            return self.honours[char_db_id]
         except Exception as e:
             if default is not None:
                 return default
@@ -122,7 +132,12 @@ class HonoursMapper(Singleton):
             number: Character's ranking.
         """
         try:
-            return self.honours[char_db_id]["ranking"]
+            honour = self.honours[char_db_id]
+            if honour < 0:
+                return 0
+
+            # Characters with the same honour have the same ranking.
+            return self.rankings.bisect_left((-honour,)) + 1
         except Exception as e:
             logger.log_err("Can not get character's ranking: %s" % e)
             
@@ -132,27 +147,33 @@ class HonoursMapper(Singleton):
         """
         if number <= 0:
             return
-        return [char_id for char_id in self.rankings[:number]]
-        
-    def get_nearest_rankings(self, character, number):
+        return [char_id for honour, char_id in self.rankings[:number]]
+
+    def get_nearest_range(self, char_id, number):
         """
-        Get nearest ranking characters.
+        Get the range of places around a character in the ranking list.
         """
-        character_id = character.id
-        if character_id in self.honours:
-            place = self.honours[character_id]["place"]
-            begin = place - number / 2
+        place = self.get_place(char_id)
+        if place is None:
+            return max(len(self.rankings) - number, 0), len(self.rankings)
+
+        begin = place - number // 2
+        if begin < 0:
+            begin = 0
+        end = begin + number + 1
+        if end > len(self.rankings):
+            end = len(self.rankings)
+            begin = end - number - 1
             if begin < 0:
                 begin = 0
-            end = begin + number + 1
-            if end > len(self.rankings):
-                end = len(self.rankings)
-                begin = end - number - 1
-                if begin < 0:
-                    begin = 0
-            return [id for id in self.rankings[begin:end]]
-        else:
-            return [id for id in self.rankings[-number:]]
+        return begin, end
+
+    def get_nearest_rankings(self, character, number):
+        """
+        Get nearest ranking characters.
+        """
+        begin, end = self.get_nearest_range(character.get_db_id(), number)
+        return [char_id for honour, char_id in self.rankings[begin:end]]
 
     async def create_honour(self, char_id, honour):
         """
@@ -170,12 +191,7 @@ class HonoursMapper(Singleton):
             self.session.add(record)
             self.session.flush()
 
-            self.honours[char_id] = {
-                "honour": honour,
-                "place": 0,
-                "ranking": 0
-            }
-            self.make_rankings()
+            self.update_honour(char_id, honour)
         except Exception as e:
             logger.log_err("Can not create character's honour: %s" % e)
 
@@ -190,16 +206,11 @@ class HonoursMapper(Singleton):
         stmt = update(self.model).where(getattr(self.model, "character") == char_id).values(honour=honour)
         result = self.session.execute(stmt)
         if result.rowcount > 0:
-            try:
-                self.honours[char_id]["honour"] = honour
-            except Exception as e:
-                logger.log_err("Can not set character's honour: %s" % e)
+            self.update_honour(char_id, honour)
         else:
             # Add a new honour record.
             await self.create_honour(char_id, honour)
 
-        self.make_rankings()
-
     async def set_honours(self, new_honours):
         """
         Set a set of characters' honours.
@@ -220,8 +231,7 @@ class HonoursMapper(Singleton):
         
         if success:
             for key, value in new_honours.items():
-                self.honours[key]["honour"] = value
-            self.make_rankings()
+                self.update_honour(key, value)
         else:
             logger.log_err("Can not set character's honours")
             
@@ -233,10 +243,7 @@ class HonoursMapper(Singleton):
             stmt = delete(self.model).where(getattr(self.model, "character") == char_db_id)
             self.session.execute(stmt)
 
-            if char_db_id in self.honours:
-                del self.honours[char_db_id]
-
-            self.make_rankings()
+            self.update_honour(char_db_id, None)
         except Exception as e:
             logger.log_err("Can not remove character's honour: %s" % e)
 
@@ -244,18 +251,6 @@ class HonoursMapper(Singleton):
         """
         Get opponents whose ranking is in the given number.
         """
-        character_id = character.id
-        if character_id in self.honours:
-            place = self.honours[character_id]["place"]
-            begin = place - number / 2
-            if begin < 0:
-                begin = 0
-            end = begin + number + 1
-            if end > len(self.rankings):
-                end = len(self.rankings)
-                begin = end - number - 1
-                if begin < 0:
-                    begin = 0
-            return [id for id in self.rankings[begin:end] if id != character_id]
-        else:
-            return [id for id in self.rankings[-number:]]
+        character_id = character.get_db_id()
+        begin, end = self.get_nearest_range(character_id, number)
+        return [char_id for honour, char_id in self.rankings[begin:end] if char_id != character_id]
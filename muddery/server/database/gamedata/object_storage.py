@@ -3,6 +3,7 @@ Object's attributes cache.
 """
 
 import json
+import copy
 import traceback
 from collections import OrderedDict
 from muddery.common.utils.exception import MudderyError, ERR
@@ -56,6 +57,18 @@ def from_string(str_value):
     return value
 
 
+# Values of these types can be shared without copying.
+IMMUTABLE_TYPES = {type(None), str, int, float, bool, bytes}
+
+
+def copy_value(value):
+    # copy a mutable value, so the stored value will not be changed outside.
+    if type(value) in IMMUTABLE_TYPES:
+        return value
+    else:
+        return copy.deepcopy(value)
+
+
 class BaseObjectStorage(BaseData, Singleton):
     """
     The storage of object attributes.
@@ -84,12 +97,24 @@ class BaseObjectStorage(BaseData, Singleton):
         """
         if value_dict:
             try:
-                with self.storage.transaction():
-                    for key, value in value_dict.items():
-                        await self.storage.save(obj_id, key, to_string(value))
+                async with self.storage.transaction():
+                    await self.storage.save_many(obj_id, {key: to_string(value) for key, value in value_dict.items()})
             except Exception as e:
                 traceback.print_exc()
 
+    async def has_many(self, obj_id, keys):
+        """
+        Check if attributes exist.
+
+        Args:
+            obj_id: (number) object's id.
+            keys: (list) attributes' keys.
+
+        Returns:
+            (dict) {key: exists or not}
+        """
+        return await self.storage.has_many(obj_id, keys)
+
     async def has(self, obj_id, key):
         """
         Check if the attribute exists.
@@ -122,6 +147,26 @@ class BaseObjectStorage(BaseData, Singleton):
             else:
                 raise e
 
+    async def load_many(self, obj_id, keys, *default):
+        """
+        Get values of attributes.
+
+        Args:
+            obj_id: (number) object's id.
+            keys: (list) attributes' keys.
+            default: (any or none) default value of missing attributes. If it is not set, missing attributes
+                are omitted.
+
+        Returns:
+            (dict) {key: value}
+        """
+        values = await self.storage.load_many(obj_id, keys)
+        values = {key: from_string(value) for key, value in values.items()}
+        if len(default) > 0:
+            return {key: values.get(key, default[0]) for key in keys}
+        else:
+            return values
+
     async def load_obj(self, obj_id):
         """
         Get values of an object.
@@ -142,6 +187,17 @@ class BaseObjectStorage(BaseData, Singleton):
         """
         await self.storage.delete(obj_id, key)
 
+    async def delete_keys(self, obj_id, keys):
+        """
+        delete attributes of an object.
+
+        Args:
+            obj_id: (number) object's id.
+            keys: (list) attributes' keys.
+        """
+        if keys:
+            await self.storage.delete_many(obj_id, keys)
+
     async def remove_obj(self, obj_id):
         """
         Remove an object's all attributes.
@@ -170,8 +226,82 @@ class CharacterObjectStorage(BaseObjectStorage):
 class MemoryObjectStorage(BaseObjectStorage):
     """
     The storage of object attributes.
+
+    Values never leave the process, so they are stored as native Python values
+    without serialization. Mutable values are copied when they are saved or loaded.
     """
     def __init__(self):
         # data storage
         super(MemoryObjectStorage, self).__init__()
         self.storage = MemoryKVStorage()
+
+    async def save(self, obj_id, key, value):
+        """
+        Set an attribute.
+
+        Args:
+            obj_id: (number) object's id.
+            key: (string) attribute's key.
+            value: (any) attribute's value.
+        """
+        # MemoryKVStorage.save() merges dict values, replace the old value instead.
+        await self.storage.replace_many(obj_id, {key: copy_value(value)})
+
+    async def save_keys(self, obj_id, value_dict):
+        """
+        Set attributes.
+
+        Args:
+            obj_id: (number) object's id.
+            value_dict: (dict) a dict of key-values.
+        """
+        # MemoryKVStorage.save_many() merges dict values, replace the old values instead.
+        await self.storage.replace_many(obj_id, {key: copy_value(value) for key, value in value_dict.items()})
+
+    async def load(self, obj_id, key, *default):
+        """
+        Get the value of an attribute.
+
+        Args:
+            obj_id: (number) object's id.
+            key: (string) attribute's key.
+            default: (any or none) default value.
+
+        Raises:
+            KeyError: If `raise_exception` is set and no matching Attribute
+                was found matching `key` and no default value set.
+        """
+        try:
+            value = await self.storage.load(obj_id, key)
+            return copy_value(value)
+        except KeyError as e:
+            if len(default) > 0:
+                return default[0]
+            else:
+                raise e
+
+    async def load_many(self, obj_id, keys, *default):
+        """
+        Get values of attributes.
+
+        Args:
+            obj_id: (number) object's id.
+            keys: (list) attributes' keys.
+            default: (any or none) default value of missing attributes. If it is not set, missing attributes
+                are omitted.
+
+        Returns:
+            (dict) {key: value}
+        """
+        values = await self.storage.load_many(obj_id, keys, *default)
+        return {key: copy_value(value) for key, value in values.items()}
+
+    async def load_obj(self, obj_id):
+        """
+        Get values of an object.
+
+        Args:
+            obj_id: (number) object's id.
+        """
+        values = await self.storage.load_category(obj_id, {})
+        return {key: copy_value(value) for key, value in values.items()}
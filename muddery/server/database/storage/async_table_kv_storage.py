@@ -0,0 +1,446 @@
+"""
+Key value storage in relational database, accessed through asyncio sessions.
+
+Database operations do not block the event loop, so other players' commands
+can run while the storage is waiting for the database.
+
+A transaction's session belongs to the task running the transaction, other tasks
+use their own sessions. Transactions are committed in the order they finish.
+"""
+
+import asyncio
+from contextvars import ContextVar
+from sqlalchemy.orm.exc import NoResultFound
+from sqlalchemy import select, insert, update, delete
+from sqlalchemy import func
+from muddery.server.database.storage.table_kv_storage import TableKVStorage
+from muddery.server.utils.logger import logger
+
+
+class AsyncTableKVStorage(TableKVStorage):
+    """
+    The storage of object attributes.
+    """
+    # This storage needs a factory of asyncio sessions.
+    use_async_session = True
+
+    def __init__(self,
+                 session: any,
+                 model_path: str,
+                 model_name: str,
+                 category_field: str,
+                 key_field: str,
+                 default_value_field: str = None):
+        """
+        :param session: the factory of asyncio sessions
+        :param model_name: table's model
+        :param category_field: category's field name in the table
+        :param key_field: key's field name in the table
+        :param default_value_field: default value's field name in the table.
+                If set the default value field, it can only store a simple value.
+                If the default value field is not set, value should be a dict.
+        """
+        super(AsyncTableKVStorage, self).__init__(session, model_path, model_name, category_field, key_field,
+                                                  default_value_field)
+
+        # The transaction of the current task.
+        # {"session": the transaction's session, "lock": lock of the session, "depth": number of nested transactions}
+        self.transaction_var = ContextVar("async_table_transaction", default=None)
+
+        # The commit job of the current task's last transaction.
+        self.commit_var = ContextVar("async_table_commit", default=None)
+
+        # The commit job of the last finished transaction. Transactions are committed one by one.
+        self.last_commit = None
+
+    async def execute(self, *stmts):
+        """
+        Execute statements. If it is not in a transaction, statements are committed at once.
+
+        Returns:
+            the result of the last statement.
+        """
+        if self.last_commit and not self.last_commit.done():
+            # Wait for finished transactions.
+            await asyncio.wait([self.last_commit])
+
+        result = None
+        trans = self.transaction_var.get()
+        if trans:
+            # Tasks created in the transaction share its session, use it one by one.
+            async with trans["lock"]:
+                for stmt in stmts:
+                    result = await trans["session"].execute(stmt)
+        else:
+            async with self.session() as session:
+                async with session.begin():
+                    for stmt in stmts:
+                        result = await session.execute(stmt)
+        return result
+
+    async def add(self, category, key, value=None):
+        """
+        Add a new attribute. If the key already exists, raise an exception.
+
+        Args:
+            category: (string) the category of data.
+            key: (string) the key.
+            value: (any) data.
+        """
+        if value is None:
+            data = {}
+        elif self.default_value_field is None:
+            data = dict(value)
+        else:
+            data = {self.default_value_field: value}
+
+        if self.category_field:
+            data[self.category_field] = category
+
+        if self.key_field:
+            data[self.key_field] = key
+
+        await self.execute(insert(self.model).values(**data))
+
+    async def save(self, category, key, value=None):
+        """
+        Set a value to the default value field.
+
+        Args:
+            category: (string) the category of data.
+            key: (string) the key.
+            value: (any) data.
+        """
+        if value is None:
+            data = {}
+        elif self.default_value_field is None:
+            data = dict(value)
+        else:
+            data = {self.default_value_field: value}
+
+        stmt = update(self.model).values(**data)
+
+        if self.category_field:
+            stmt = stmt.where(getattr(self.model, self.category_field) == category)
+
+        if self.key_field:
+            stmt = stmt.where(getattr(self.model, self.key_field) == key)
+
+        result = await self.execute(stmt)
+        if result.rowcount == 0:
+            # no matched rows
+            if self.category_field:
+                data[self.category_field] = category
+
+            if self.key_field:
+                data[self.key_field] = key
+
+            await self.execute(insert(self.model).values(**data))
+
+    async def has(self, category: str, key: str, check_category: bool = False) -> bool:
+        """
+        Check if the key exists.
+
+        Args:
+            category: the category of data.
+            key: attribute's key.
+            check_category: if check_category is True and does not has the category, it will raise a KeyError.
+        """
+        stmt = select(func.count()).select_from(self.model)
+
+        if self.category_field:
+            stmt = stmt.where(getattr(self.model, self.category_field) == category)
+
+        if self.key_field:
+            stmt = stmt.where(getattr(self.model, self.key_field) == key)
+
+        result = await self.execute(stmt)
+        count = result.scalars().one()
+        if count > 0:
+            return True
+
+        if not check_category:
+            return False
+
+        # Check if the category exists.
+        if not self.category_field:
+            return False
+
+        stmt = select(func.count()).select_from(self.model).where(getattr(self.model, self.category_field) == category)
+        result = await self.execute(stmt)
+        count = result.scalars().one()
+        if count > 0:
+            return False
+        else:
+            raise KeyError
+
+    async def load(self, category, key, *default, for_update=False):
+        """
+        Get the default field value of a key.
+
+        Args:
+            category: (string) the category of data.
+            key: (string) data's key.
+            default: (any or none) default value.
+
+        Raises:
+            KeyError: If `raise_exception` is set and no matching Attribute
+                was found matching `key` and no default value set.
+        """
+        stmt = select(self.model)
+
+        if for_update:
+            stmt = stmt.with_for_update()
+
+        if self.category_field:
+            stmt = stmt.where(getattr(self.model, self.category_field) == category)
+
+        if self.key_field:
+            stmt = stmt.where(getattr(self.model, self.key_field) == key)
+
+        result = await self.execute(stmt)
+
+        try:
+            record = result.scalars().one()
+        except NoResultFound:
+            if len(default) > 0:
+                return default[0]
+            else:
+                raise KeyError
+
+        if self.default_value_field is not None:
+            return getattr(record, self.default_value_field)
+        else:
+            return {
+                k: getattr(record, k) for k in self.columns
+            }
+
+    async def delete(self, category, key):
+        """
+        delete a key.
+
+        Args:
+            category: (string) the category of data.
+            key: (string) attribute's key.
+        """
+        stmt = delete(self.model)
+
+        if self.category_field:
+            stmt = stmt.where(getattr(self.model, self.category_field) == category)
+
+        if self.key_field:
+            stmt = stmt.where(getattr(self.model, self.key_field) == key)
+
+        await self.execute(stmt)
+
+    async def set_all(self, all_data: dict) -> None:
+        """
+        Set all data to the storage.
+        """
+        # remove old data
+        stmts = [delete(self.model)]
+
+        for cate_name, cate_data in all_data.items():
+            for key_name, key_data in cate_data.items():
+                data = dict(key_data)
+                if self.category_field:
+                    data[self.category_field] = cate_name
+                if self.key_field:
+                    data[self.key_field] = key_name
+
+                stmts.append(insert(self.model).values(**data))
+
+        await self.execute(*stmts)
+
+    async def load_all(self) -> dict:
+        """
+        Get all data.
+        :return:
+        """
+        stmt = select(self.model)
+        result = await self.execute(stmt)
+        records = result.scalars().all()
+
+        all_data = {}
+        if self.category_field:
+            for r in records:
+                category = getattr(r, self.category_field)
+                if category not in all_data:
+                    all_data[category] = {}
+
+                key = getattr(r, self.key_field) if self.key_field else ""
+                all_data[category][key] = {k: getattr(r, k) for k in self.columns}
+        elif self.key_field:
+            all_data[""] = {
+                getattr(r, self.key_field): {
+                    k: getattr(r, k) for k in self.columns
+                } for r in records
+            }
+        elif len(records) > 0:
+            all_data[""] = {"": {k: getattr(records[0], k) for k in self.columns}}
+        else:
+            all_data[""] = {"": {}}
+
+        if self.default_value_field is not None:
+            all_data = {
+                key: value[self.default_value_field] for category, data in all_data.items() for key, value in data.items()
+            }
+
+        return all_data
+
+    async def set_category(self, category: str, data: dict) -> None:
+        """
+        Set a category of data.
+        """
+        # remove old data
+        stmt = delete(self.model)
+        if self.category_field:
+            stmt = stmt.where(getattr(self.model, self.category_field) == category)
+        stmts = [stmt]
+
+        for key_name, key_data in data.items():
+            values = dict(key_data)
+            if self.category_field:
+                values[self.category_field] = category
+            if self.key_field:
+                values[self.key_field] = key_name
+
+            stmts.append(insert(self.model).values(**values))
+
+        await self.execute(*stmts)
+
+    async def has_category(self, category: str) -> bool:
+        """
+        Check if the category exists.
+        """
+        stmt = select(func.count()).select_from(self.model)
+
+        if self.category_field:
+            stmt = stmt.where(getattr(self.model, self.category_field) == category)
+
+        result = await self.execute(stmt)
+        record = result.scalars().one()
+        return record > 0
+
+    async def load_category(self, category, *default):
+        """
+        Get all default field's values of a category.
+
+        Args:
+            category: (string) category's name.
+        """
+        stmt = select(self.model)
+
+        if self.category_field:
+            stmt = stmt.where(getattr(self.model, self.category_field) == category)
+
+        result = await self.execute(stmt)
+        records = result.scalars().all()
+
+        if self.key_field:
+            if self.default_value_field:
+                data = {
+                    getattr(record, self.key_field): getattr(record, self.default_value_field) for record in records
+                }
+            else:
+                data = {
+                    getattr(record, self.key_field): {
+                        k: getattr(record, k) for k in self.columns
+                    } for record in records
+                }
+        else:
+            data = {
+                "": {
+                    k: getattr(record, k) for k in self.columns
+                } for record in records
+            }
+
+        if len(data) == 0:
+            if len(default) > 0:
+                return default[0]
+            else:
+                raise KeyError
+
+        return data
+
+    async def delete_category(self, category):
+        """
+        Remove all values of a category.
+
+        Args:
+            category: (string) the category of data.
+        """
+        stmt = delete(self.model)
+
+        if self.category_field:
+            stmt = stmt.where(getattr(self.model, self.category_field) == category)
+
+        await self.execute(stmt)
+
+    async def finish_transaction(self, session, commit: bool, last_commit) -> Exception or None:
+        """
+        Commit or rollback a transaction's session and close it, after the last transaction
+        finished.
+
+        Returns:
+            the error of committing, or None if it succeeded.
+        """
+        if last_commit and not last_commit.done():
+            await asyncio.wait([last_commit])
+
+        try:
+            if commit:
+                await session.commit()
+            else:
+                await session.rollback()
+        except Exception as e:
+            logger.log_trace("Can not finish the transaction of %s." % self.model_name)
+            return e
+        finally:
+            await session.close()
+
+    def end_transaction(self, commit: bool) -> None:
+        """
+        Leave a transaction. Commit or rollback it if it is the outermost transaction.
+        """
+        trans = self.transaction_var.get()
+        trans["depth"] -= 1
+        if trans["depth"] > 0:
+            return
+
+        self.transaction_var.set(None)
+        self.last_commit = asyncio.ensure_future(self.finish_transaction(trans["session"], commit, self.last_commit))
+        self.commit_var.set(self.last_commit)
+
+    def transaction_enter(self) -> None:
+        trans = self.transaction_var.get()
+        if trans is not None:
+            # A nested transaction joins the outer transaction.
+            trans["depth"] += 1
+            return
+
+        self.transaction_var.set({
+            "session": self.session(),
+            "lock": asyncio.Lock(),
+            "depth": 1,
+        })
+
+    def transaction_success(self, exc_type, exc_value, trace) -> None:
+        self.end_transaction(True)
+
+    def transaction_failed(self, exc_type, exc_value, trace) -> None:
+        self.end_transaction(False)
+
+    async def transaction_wait(self) -> None:
+        """
+        Wait until the current task's last transaction is committed. Raise the error if the
+        commit failed.
+        """
+        commit = self.commit_var.get()
+        if commit is None:
+            return
+
+        self.commit_var.set(None)
+        error = await commit
+        if error is not None:
+            raise error
@@ -4,6 +4,7 @@ The base class of key value storage.
 
 from asyncio import Lock
 from muddery.server.database.storage.transaction import Transaction
+from muddery.server.database.storage.lock_manager import LockManager
 
 
 class BaseKeyValueStorage(object):
@@ -11,8 +12,12 @@ class BaseKeyValueStorage(object):
     The storage of key-values.
     """
     def __init__(self):
+        # lock of the whole storage
         self.lock = Lock()
 
+        # locks of categories
+        self.category_locks = LockManager()
+
     async def add(self, category: str, key: str, value: any = None) -> None:
         """
         Add a new attribute. If the key already exists, raise an exception.
@@ -61,6 +66,62 @@ class BaseKeyValueStorage(object):
         """
         pass
 
+    async def has_many(self, category: str, keys: list) -> dict:
+        """
+        Check if attributes exist.
+
+        Args:
+            category: the category of data.
+            keys: attributes' keys.
+
+        Return:
+            (dict) {key: exists or not}
+        """
+        return {key: await self.has(category, key) for key in keys}
+
+    async def load_many(self, category: str, keys: list, *default) -> dict:
+        """
+        Get values of attributes.
+
+        Args:
+            category: (string, int) the category of data.
+            keys: (list) attributes' keys.
+            default: (any or none) default value of missing keys. If it is not set, missing keys are omitted.
+
+        Return:
+            (dict) {key: value}
+        """
+        values = {}
+        for key in keys:
+            try:
+                values[key] = await self.load(category, key)
+            except KeyError:
+                if len(default) > 0:
+                    values[key] = default[0]
+        return values
+
+    async def save_many(self, category: str, values: dict) -> None:
+        """
+        Set attributes.
+
+        Args:
+            category: (string, int) the category of data.
+            values: (dict) {key: value}
+        """
+        for key, value in values.items():
+            await self.save(category, key, value)
+
+    async def delete_many(self, category: str, keys: list) -> None:
+        """
+        Delete attributes of an object.
+
+        Args:
+            category: (string, int) the category of data.
+            keys: (list) attributes' keys.
+        """
+        for key in keys:
+            await self.delete(category, key)
+
     async def set_all(self, all_data: dict) -> None:
         """
         Set all data to cache.
@@ -114,6 +175,15 @@ class BaseKeyValueStorage(object):
         """
         pass
 
+    def discard_category(self, category: str) -> None:
+        """
+        Remove a category from a cache at once, so it will be loaded again.
+
+        Args:
+            category: (string) the category of data.
+        """
+        pass
+
     def transaction(self) -> Transaction:
         """
         Guarantee the transaction execution of a given block.
@@ -128,3 +198,9 @@ class BaseKeyValueStorage(object):
 
     def transaction_failed(self, exc_type, exc_value, trace) -> None:
         pass
+
+    async def transaction_wait(self) -> None:
+        """
+        Wait until the current task's last transaction is written to the database.
+        """
+        pass
@@ -0,0 +1,146 @@
+"""
+Locks of categories.
+
+Operations on different categories can run concurrently, operations on the same
+category run one by one. Idle locks are removed, so the number of locks does not
+grow with the number of categories.
+
+Operations on all categories wait until no category is locked, and new operations
+on categories wait until they finish.
+"""
+
+from asyncio import Lock, Event
+
+
+class CategoryLock(object):
+    """
+    The async context manager of a category's lock.
+    """
+    __slots__ = ("manager", "category", "item")
+
+    def __init__(self, manager, category):
+        self.manager = manager
+        self.category = category
+        self.item = None
+
+    async def __aenter__(self):
+        if self.manager.all_lock.locked():
+            # Wait for operations on all categories.
+            async with self.manager.all_lock:
+                pass
+
+        self.item = self.manager.acquire_item(self.category)
+        try:
+            await self.item[0].acquire()
+        except BaseException:
+            self.manager.release_item(self.category, self.item, False)
+            raise
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.manager.release_item(self.category, self.item, True)
+
+
+class AllCategoriesLock(object):
+    """
+    The async context manager of the lock of all categories.
+    """
+    __slots__ = ("manager",)
+
+    def __init__(self, manager):
+        self.manager = manager
+
+    async def __aenter__(self):
+        await self.manager.all_lock.acquire()
+        try:
+            await self.manager.idle.wait()
+        except BaseException:
+            self.manager.all_lock.release()
+            raise
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.manager.all_lock.release()
+
+
+class LockManager(object):
+    """
+    Manage locks of categories.
+    """
+    # contentions of all lock managers
+    total_contentions = 0
+
+    def __init__(self):
+        # {category: [lock, number of users]}
+        self.locks = {}
+
+        # the lock of operations on all categories
+        self.all_lock = Lock()
+
+        # It is set when no category is locked.
+        self.idle = Event()
+        self.idle.set()
+
+        # lock statistics
+        self.acquisitions = 0
+        self.contentions = 0
+
+    def lock(self, category: str) -> CategoryLock:
+        """
+        Get the lock of a category.
+
+        Usage:
+            async with lock_manager.lock(category):
+                ...
+        """
+        return CategoryLock(self, category)
+
+    def lock_all(self) -> AllCategoriesLock:
+        """
+        Get the lock of all categories.
+
+        Usage:
+            async with lock_manager.lock_all():
+                ...
+        """
+        return AllCategoriesLock(self)
+
+    def acquire_item(self, category: str) -> list:
+        """
+        Get a category's lock item and add a user to it.
+        """
+        item = self.locks.get(category)
+        if item is None:
+            item = [Lock(), 0]
+            self.locks[category] = item
+            self.idle.clear()
+
+        self.acquisitions += 1
+        if item[1] > 0:
+            # The lock is held by others.
+            self.contentions += 1
+            LockManager.total_contentions += 1
+
+        item[1] += 1
+        return item
+
+    def release_item(self, category: str, item: list, acquired: bool) -> None:
+        """
+        Remove a user from a category's lock item. Remove the lock if it is idle.
+        """
+        if acquired:
+            item[0].release()
+
+        item[1] -= 1
+        if item[1] == 0 and self.locks.get(category) is item:
+            del self.locks[category]
+            if not self.locks:
+                self.idle.set()
+
+    def get_stats(self) -> dict:
+        """
+        Get lock statistics.
+        """
+        return {
+            "locks": len(self.locks),
+            "acquisitions": self.acquisitions,
+            "contentions": self.contentions,
+        }
@@ -0,0 +1,266 @@
+"""
+Key value storage in memory with a bounded number of categories.
+
+Categories which have not been used for the longest time are removed when there are
+more than DATABASE_CACHE_MAX_CATEGORIES categories, or when they have not been used
+for DATABASE_CACHE_TTL seconds. Pinned categories, like the data of online characters,
+are never removed.
+"""
+
+import time
+from collections import OrderedDict
+from muddery.server.settings import SETTINGS
+from muddery.server.database.storage.memory_kv_storage import MemoryKVStorage
+
+
+class LRUMemoryKVStorage(MemoryKVStorage):
+    """
+    The storage of object attributes.
+    """
+    # Categories that can not be removed, shared by all caches.
+    pinned_categories = set()
+
+    def __init__(self):
+        super(LRUMemoryKVStorage, self).__init__()
+
+        self.max_categories = SETTINGS.DATABASE_CACHE_MAX_CATEGORIES
+        self.ttl = SETTINGS.DATABASE_CACHE_TTL
+
+        # Last access time of categories, from the oldest to the newest.
+        # {category: last access time}
+        self.last_access = OrderedDict()
+
+        # cache statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def pin(cls, category: str) -> None:
+        """
+        Keep a category in caches.
+        """
+        cls.pinned_categories.add(category)
+
+    @classmethod
+    def unpin(cls, category: str) -> None:
+        """
+        The category can be removed from caches.
+        """
+        cls.pinned_categories.discard(category)
+
+    def touch(self, category: str) -> bool:
+        """
+        Update the category's access time.
+
+        Return:
+            (bool) if the category is in the cache.
+        """
+        if category in self.storage:
+            self.last_access[category] = time.monotonic()
+            self.last_access.move_to_end(category)
+            self.hits += 1
+            return True
+        else:
+            self.misses += 1
+            return False
+
+    def evict(self) -> None:
+        """
+        Remove the least recently used categories.
+        """
+        deadline = time.monotonic() - self.ttl if self.ttl else None
+
+        # Check every category at most once.
+        for _ in range(len(self.last_access)):
+            category, last_time = next(iter(self.last_access.items()))
+            if len(self.storage) <= self.max_categories and (deadline is None or last_time > deadline):
+                break
+
+            if category in self.pinned_categories:
+                self.last_access.move_to_end(category)
+                continue
+
+            del self.last_access[category]
+            del self.storage[category]
+            self.evictions += 1
+
+    async def add(self, category, key, value=None):
+        """
+        Add a new attribute. If the key already exists, raise an exception.
+
+        Args:
+            category: (string) the category of data.
+            key: (string) the key.
+            value: (any) data.
+
+        Raises:
+            KeyError: If the category is not in the cache.
+        """
+        if not self.touch(category):
+            raise KeyError
+
+        await super(LRUMemoryKVStorage, self).add(category, key, value)
+
+    async def save(self, category, key, value=None):
+        """
+        Set a value to the default value field.
+
+        Args:
+            category: (string) the category of data.
+            key: (string) the key.
+            value: (any) data.
+
+        Raises:
+            KeyError: If the category is not in the cache.
+        """
+        if not self.touch(category):
+            raise KeyError
+
+        await super(LRUMemoryKVStorage, self).save(category, key, value)
+
+    async def has(self, category: str, key: str, check_category: bool = False) -> bool:
+        """
+        Check if the key exists.
+
+        Args:
+            category: (string) the category of data.
+            key: (string) attribute's key.
+            check_category: if check_category is True and does not has the category, it will raise a KeyError.
+        """
+        self.touch(category)
+        return await super(LRUMemoryKVStorage, self).has(category, key, check_category)
+
+    async def load(self, category, key, *default, for_update=False):
+        """
+        Get the default field value of a key.
+
+        Args:
+            category: (string) the category of data.
+            key: (string) data's key.
+            default: (any or none) default value.
+        """
+        self.touch(category)
+        return await super(LRUMemoryKVStorage, self).load(category, key, *default, for_update=for_update)
+
+    async def has_many(self, category: str, keys: list) -> dict:
+        """
+        Check if keys exist.
+
+        Args:
+            category: (string) the category of data.
+            keys: (list) attributes' keys.
+        """
+        self.touch(category)
+        return await super(LRUMemoryKVStorage, self).has_many(category, keys)
+
+    async def load_many(self, category: str, keys: list, *default) -> dict:
+        """
+        Get values of keys.
+
+        Args:
+            category: (string) the category of data.
+            keys: (list) data's keys.
+            default: (any or none) default value of missing keys.
+        """
+        self.touch(category)
+        return await super(LRUMemoryKVStorage, self).load_many(category, keys, *default)
+
+    async def save_many(self, category: str, values: dict) -> None:
+        """
+        Set values of keys.
+
+        Args:
+            category: (string) the category of data.
+            values: (dict) {key: value}
+
+        Raises:
+            KeyError: If the category is not in the cache.
+        """
+        if not self.touch(category):
+            raise KeyError
+
+        await super(LRUMemoryKVStorage, self).save_many(category, values)
+
+    async def replace_many(self, category: str, values: dict) -> None:
+        """
+        Set values of keys. Old values are replaced, dict values are not merged.
+
+        Args:
+            category: (string) the category of data.
+            values: (dict) {key: value}
+
+        Raises:
+            KeyError: If the category is not in the cache.
+        """
+        if not self.touch(category):
+            raise KeyError
+
+        await super(LRUMemoryKVStorage, self).replace_many(category, values)
+
+    async def set_all(self, all_data: dict) -> None:
+        """
+        Set all data.
+        """
+        await super(LRUMemoryKVStorage, self).set_all(all_data)
+
+        now = time.monotonic()
+        self.last_access = OrderedDict((category, now) for category in self.storage)
+        self.evict()
+
+    async def set_category(self, category: str, data: dict) -> None:
+        """
+        Set a category of data to cache.
+        """
+        await super(LRUMemoryKVStorage, self).set_category(category, data)
+
+        self.last_access[category] = time.monotonic()
+        self.last_access.move_to_end(category)
+        self.evict()
+
+    async def load_category(self, category, *default):
+        """
+        Get all default field's values of a category.
+
+        Args:
+            category: (string) category's name.
+        """
+        self.touch(category)
+        return await super(LRUMemoryKVStorage, self).load_category(category, *default)
+
+    async def has_category(self, category: str) -> bool:
+        """
+        Check if the category is in cache.
+        """
+        return category in self.storage
+
+    async def delete_category(self, category):
+        """
+        Remove all values of a category.
+
+        Args:
+            category: (string) the category of data.
+        """
+        await super(LRUMemoryKVStorage, self).delete_category(category)
+        self.last_access.pop(category, None)
+
+    def discard_category(self, category: str) -> None:
+        """
+        Remove a category from the cache at once, so it will be loaded again.
+
+        Args:
+            category: (string) the category of data.
+        """
+        super(LRUMemoryKVStorage, self).discard_category(category)
+        self.last_access.pop(category, None)
+
+    def get_stats(self) -> dict:
+        """
+        Get cache statistics.
+        """
+        return {
+            "categories": len(self.storage),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
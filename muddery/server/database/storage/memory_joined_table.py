@@ -0,0 +1,67 @@
+"""
+Join cached tables by their key field.
+"""
+
+from muddery.common.utils.exception import MudderyError
+from muddery.server.database.storage.memory_record import MemoryRecord
+
+
+class MemoryJoinedTable(object):
+    """
+    A view of several tables joined by the key field. Joined records are built once.
+    """
+    def __init__(self, tables):
+        """
+        Args:
+            tables: (list) a list of (table's name, MemoryTable).
+                    If tables have the same field, use the last table's value.
+        """
+        self.table_names = [table_name for table_name, table in tables]
+
+        # {field's name: table's position}
+        sources = {}
+        for pos, (table_name, table) in enumerate(tables):
+            for field_name in table.fields():
+                sources[field_name] = pos
+
+        self.record_class = MemoryRecord.create_class("_".join(self.table_names), sources.keys())
+        self.empty_record = self.record_class([None] * len(sources))
+
+        # records of tables by key, [{key: record}]
+        # keys which have more than one record in a table, {key: table's name}
+        table_records = []
+        self.duplicated = {}
+        for table_name, table in tables:
+            records = {}
+            for record in table.all():
+                if record.key in records:
+                    self.duplicated[record.key] = table_name
+                else:
+                    records[record.key] = record
+            table_records.append(records)
+
+        # joined records, {key: record}
+        self.records = {}
+        keys = set()
+        for records in table_records:
+            keys.update(records.keys())
+
+        for key in keys:
+            row = [records.get(key) for records in table_records]
+            row_data = [
+                None if row[pos] is None else getattr(row[pos], field_name)
+                for field_name, pos in sources.items()
+            ]
+            self.records[key] = self.record_class(row_data)
+
+    def get(self, key):
+        """
+        Get a joined record by key. If no table has this key, returns a record of None values.
+
+        Args:
+            key: (string) record's key
+        """
+        if key in self.duplicated:
+            raise MudderyError("Can not solve more than one records from table: %s" % self.duplicated[key])
+
+        return self.records.get(key, self.empty_record)
@@ -58,6 +58,32 @@ class MemoryKVCache(MemoryKVStorage):
         if self.in_transaction:
             self.dirty_categories.add(category)
 
+    async def save_many(self, category: str, values: dict) -> None:
+        """
+        Set values of keys.
+
+        Args:
+            category: (string) the category of data.
+            values: (dict) {key: value}
+        """
+        await super(MemoryKVCache, self).save_many(category, values)
+
+        if self.in_transaction:
+            self.dirty_categories.add(category)
+
+    async def delete_many(self, category: str, keys: list) -> None:
+        """
+        delete keys.
+
+        Args:
+            category: (string) the category of data.
+            keys: (list) attributes' keys.
+        """
+        await super(MemoryKVCache, self).delete_many(category, keys)
+
+        if self.in_transaction:
+            self.dirty_categories.add(category)
+
     async def set_all(self, all_data: dict) -> None:
         """
         Set all data.
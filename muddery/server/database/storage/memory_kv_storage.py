@@ -96,6 +96,76 @@ class MemoryKVStorage(BaseKeyValueStorage):
         except KeyError:
             pass
 
+    async def has_many(self, category: str, keys: list) -> dict:
+        """
+        Check if keys exist.
+
+        Args:
+            category: (string) the category of data.
+            keys: (list) attributes' keys.
+        """
+        data = self.storage.get(category, {})
+        return {key: key in data for key in keys}
+
+    async def load_many(self, category: str, keys: list, *default) -> dict:
+        """
+        Get values of keys.
+
+        Args:
+            category: (string) the category of data.
+            keys: (list) data's keys.
+            default: (any or none) default value of missing keys. If it is not set, missing keys are omitted.
+        """
+        data = self.storage.get(category, {})
+        if len(default) > 0:
+            return {key: data.get(key, default[0]) for key in keys}
+        else:
+            return {key: data[key] for key in keys if key in data}
+
+    async def save_many(self, category: str, values: dict) -> None:
+        """
+        Set values of keys.
+
+        Args:
+            category: (string) the category of data.
+            values: (dict) {key: value}
+        """
+        if category not in self.storage:
+            self.storage[category] = {}
+
+        data = self.storage[category]
+        for key, value in values.items():
+            if key in data and type(data[key]) == dict:
+                data[key].update(value)
+            else:
+                data[key] = value
+
+    async def replace_many(self, category: str, values: dict) -> None:
+        """
+        Set values of keys. Old values are replaced, dict values are not merged.
+
+        Args:
+            category: (string) the category of data.
+            values: (dict) {key: value}
+        """
+        if category not in self.storage:
+            self.storage[category] = {}
+
+        self.storage[category].update(values)
+
+    async def delete_many(self, category: str, keys: list) -> None:
+        """
+        delete keys.
+
+        Args:
+            category: (string) the category of data.
+            keys: (list) attributes' keys.
+        """
+        data = self.storage.get(category)
+        if data:
+            for key in keys:
+                data.pop(key, None)
+
     async def set_all(self, all_data: dict) -> None:
         """
         Set all data.
@@ -144,7 +214,13 @@ class MemoryKVStorage(BaseKeyValueStorage):
         Args:
             category: (string) the category of data.
         """
-        try:
-            del self.storage[category]
-        except KeyError:
-            pass
+        self.discard_category(category)
+
+    def discard_category(self, category: str) -> None:
+        """
+        Remove a category from the cache at once, so it will be loaded again.
+
+        Args:
+            category: (string) the category of data.
+        """
+        self.storage.pop(category, None)
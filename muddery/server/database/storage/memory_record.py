@@ -1,27 +1,51 @@
-
 class MemoryRecord(object):
     """
     Record object. Use attributes to access record fields.
+
+    Each table has its own record class created by create_class(), record fields are stored
+    in slots, so reading a field is a native attribute access.
     """
-    def __init__(self, fields, data):
+    __slots__ = ()
+
+    # {field's name: field's position}
+    _fields = {}
+
+    # setters of slots, in the order of fields
+    _setters = ()
+
+    def __init__(self, data):
         """
         Args:
-            fields: (dict) a dict of field names and data positions.
-            data: (list) a list of records. A record is a list too.
-                  Data's order in a record must be the same as the position of fields dict.
+            data: (list) record's values. Data's order must be the same as the position of fields.
         """
-        object.__setattr__(self, "_fields", fields)
-        object.__setattr__(self, "_records", data)
+        for setter, value in zip(self._setters, data):
+            setter(self, value)
 
-    def __getattribute__(self, attr_name):
-        try:
-            pos = object.__getattribute__(self, "_fields")[attr_name]
-        except KeyError:
-            raise AttributeError("Can not find field %s." % attr_name)
-        return object.__getattribute__(self, "_records")[pos]
+    @classmethod
+    def create_class(cls, name, fields):
+        """
+        Create a record class.
+
+        Args:
+            name: (string) class's name.
+            fields: (list) field names.
+        """
+        fields = list(fields)
+        record_class = type(name, (cls,), {
+            "__slots__": tuple(fields),
+            "_fields": {field_name: i for i, field_name in enumerate(fields)},
+        })
+        record_class._setters = tuple(getattr(record_class, field_name).__set__ for field_name in fields)
+        return record_class
 
     def __setattr__(self, attr_name, value):
         raise Exception("Cannot assign directly to record attributes!")
 
     def __delattr__(self, attr_name):
         raise Exception("Cannot delete record attributes!")
+
+    def __repr__(self):
+        return "%s(%s)" % (
+            type(self).__name__,
+            ", ".join("%s=%r" % (field_name, getattr(self, field_name)) for field_name in self._fields)
+        )
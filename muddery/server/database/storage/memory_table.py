@@ -12,36 +12,46 @@ class MemoryTable(object):
     """
     Load and cache a table's data.
     """
-    def __init__(self, session, model_path, model_name):
+    def __init__(self, session, model_path, model_name, data=None):
+        """
+        Args:
+            session: database session.
+            model_path: (string) models' module.
+            model_name: (string) table's name.
+            data: (dict) table's data dumped by dump(). If it is None, load data from the database.
+        """
         self.model_name = model_name
         module = importlib.import_module(model_path)
         self.session = session
         self.model = getattr(module, model_name)
         self.columns = self.model.__table__.columns.keys()
 
+        self.record_class = MemoryRecord.create_class(model_name, self.columns)
+        self.table_fields = self.record_class._fields
+
         self.records = []
-        self.table_fields = {}
         self.index = {}     # index: {field's value: recode's index}
-        self.reload()
+
+        if data is None:
+            self.reload()
+        else:
+            self.load_data(data)
 
     def clear(self):
         self.records = []
-        self.table_fields = {}
         self.index = {}
 
     def reload(self):
         self.clear()
 
-        for i, field_name in enumerate(self.columns):
-            self.table_fields[field_name] = i
-
         # load records
         stmt = select(self.model)
         result = self.session.execute(stmt)
         records = result.scalars()
+        record_class = self.record_class
         for r in records:
             row_data = [getattr(r, field_name) for field_name in self.columns]
-            self.records.append(MemoryRecord(self.table_fields, row_data))
+            self.records.append(record_class(row_data))
 
         # set unique index
         for field_name in self.columns:
@@ -83,6 +93,37 @@ class MemoryTable(object):
             index_name = ".".join(index_fields)
             self.index[index_name] = all_values
 
+    def rows(self):
+        """
+        Get values of all records.
+
+        Returns:
+            (list) a tuple of values for each record.
+        """
+        return [tuple(getattr(record, field_name) for field_name in self.columns) for record in self.records]
+
+    def dump(self):
+        """
+        Get the table's records and indexes as built-in types, so they can be saved to a snapshot.
+        """
+        return {
+            "columns": list(self.columns),
+            "rows": self.rows(),
+            "index": self.index,
+        }
+
+    def load_data(self, data):
+        """
+        Load records and indexes dumped by dump().
+        """
+        if data["columns"] != list(self.columns):
+            raise MudderyError("Table %s's fields have been changed." % self.model_name)
+
+        self.clear()
+        record_class = self.record_class
+        self.records = [record_class(row) for row in data["rows"]]
+        self.index = data["index"]
+
     def fields(self):
         """
         Get table fields.
@@ -26,7 +26,7 @@ class StorageWithCache(BaseKeyValueStorage):
             key: (string) the key.
             value: (any) data.
         """
-        async with self.lock:
+        async with self.category_locks.lock(category):
             await self.storage.add(category, key, value)
 
             try:
@@ -43,7 +43,7 @@ class StorageWithCache(BaseKeyValueStorage):
             key: (string) the key.
             value: (any) data.
         """
-        async with self.lock:
+        async with self.category_locks.lock(category):
             await self.storage.save(category, key, value)
 
             try:
@@ -60,7 +60,7 @@ class StorageWithCache(BaseKeyValueStorage):
             key: (string) attribute's key.
             check_category: if check_category is True and does not has the category, it will raise a KeyError.
         """
-        async with self.lock:
+        async with self.category_locks.lock(category):
             try:
                 return await self.cache.has(category, key, check_category=True)
             except KeyError:
@@ -72,7 +72,7 @@ class StorageWithCache(BaseKeyValueStorage):
         Get all data.
         :return:
         """
-        async with self.lock:
+        async with self.category_locks.lock_all():
             if self.all_cached:
                 return await self.cache.load_all()
             else:
@@ -91,7 +91,7 @@ class StorageWithCache(BaseKeyValueStorage):
             KeyError: If `raise_exception` is set and no matching Attribute
                 was found matching `key` and no default value set.
         """
-        async with self.lock:
+        async with self.category_locks.lock(category):
             try:
                 return await self.cache.load(category, key)
             except KeyError:
@@ -104,6 +104,53 @@ class StorageWithCache(BaseKeyValueStorage):
                     else:
                         raise e
 
+    async def has_many(self, category: str, keys: list) -> dict:
+        """
+        Check if keys exist.
+
+        Args:
+            category: the category of data.
+            keys: attributes' keys.
+
+        Return:
+            (dict) {key: exists or not}
+        """
+        async with self.category_locks.lock(category):
+            await self.ensure_category_cache(category)
+            return await self.cache.has_many(category, keys)
+
+    async def load_many(self, category: str, keys: list, *default) -> dict:
+        """
+        Get values of keys.
+
+        Args:
+            category: (string) the category of data.
+            keys: (list) data's keys.
+            default: (any or none) default value of missing keys. If it is not set, missing keys are omitted.
+
+        Return:
+            (dict) {key: value}
+        """
+        async with self.category_locks.lock(category):
+            await self.ensure_category_cache(category)
+            return await self.cache.load_many(category, keys, *default)
+
+    async def save_many(self, category: str, values: dict) -> None:
+        """
+        Set values of keys.
+
+        Args:
+            category: (string) the category of data.
+            values: (dict) {key: value}
+        """
+        async with self.category_locks.lock(category):
+            await self.storage.save_many(category, values)
+
+            try:
+                await self.cache.save_many(category, values)
+            except KeyError:
+                await self.set_category_cache(category)
+
     async def load_category(self, category: str, *default) -> dict:
         """
         Get all default field's values of a category.
@@ -115,7 +162,7 @@ class StorageWithCache(BaseKeyValueStorage):
             KeyError: If `raise_exception` is set and no matching Attribute
                 was found matching `category`.
         """
-        async with self.lock:
+        async with self.category_locks.lock(category):
             try:
                 return await self.cache.load_category(category)
             except KeyError:
@@ -139,10 +186,22 @@ class StorageWithCache(BaseKeyValueStorage):
         Return:
             (dict): deleted values
         """
-        async with self.lock:
+        async with self.category_locks.lock(category):
             await self.storage.delete(category, key)
             return await self.cache.delete(category, key)
 
+    async def delete_many(self, category: str, keys: list) -> None:
+        """
+        delete keys.
+
+        Args:
+            category: (string) the category of data.
+            keys: (list) attributes' keys.
+        """
+        async with self.category_locks.lock(category):
+            await self.storage.delete_many(category, keys)
+            await self.cache.delete_many(category, keys)
+
     async def delete_category(self, category: str) -> dict:
         """
         Remove all values of a category.
@@ -153,10 +212,17 @@ class StorageWithCache(BaseKeyValueStorage):
         Return:
             (dict): deleted values
         """
-        async with self.lock:
+        async with self.category_locks.lock(category):
             await self.storage.delete_category(category)
             return await self.cache.delete_category(category)
 
+    async def ensure_category_cache(self, category: str) -> None:
+        """
+        Load the category to the cache if it is not cached, so the cache holds all data of the category.
+        """
+        if not await self.cache.has_category(category):
+            await self.set_category_cache(category)
+
     async def set_all_cache(self) -> dict:
         """
         Load all data from db if have not loaded this category.
@@ -193,3 +259,6 @@ class StorageWithCache(BaseKeyValueStorage):
         # Remove dirty caches.
         self.storage.transaction_failed(exc_type, exc_value, trace)
         self.cache.transaction_failed(exc_type, exc_value, trace)
+
+    async def transaction_wait(self) -> None:
+        await self.storage.transaction_wait()
@@ -4,8 +4,8 @@ Key value storage in relational database.
 
 import importlib
 from sqlalchemy.orm.exc import NoResultFound
-from sqlalchemy import select, update, delete
-from sqlalchemy import func
+from sqlalchemy import select, insert, update, delete
+from sqlalchemy import func, case
 from muddery.server.database.storage.base_kv_storage import BaseKeyValueStorage
 
 
@@ -13,6 +13,12 @@ class TableKVStorage(BaseKeyValueStorage):
     """
     The storage of object attributes.
     """
+    # This storage needs a synchronous session.
+    use_async_session = False
+
+    # The max number of keys in one statement of batch operations.
+    batch_size = 500
+
     def __init__(self,
                  session: any,
                  model_path: str,
@@ -52,6 +58,35 @@ class TableKVStorage(BaseKeyValueStorage):
         if default_value_field:
             exclude_fields.add(default_value_field)
 
+    async def execute(self, *stmts):
+        """
+        Execute statements.
+
+        Returns:
+            the result of the last statement.
+        """
+        result = None
+        for stmt in stmts:
+            result = self.session.execute(stmt)
+        return result
+
+    def split_keys(self, keys):
+        """
+        Split keys into batches of batch_size.
+        """
+        keys = list(keys)
+        for i in range(0, len(keys), self.batch_size):
+            yield keys[i:i + self.batch_size]
+
+    def where_keys(self, stmt, category, keys):
+        """
+        Add conditions of the category and keys to a statement.
+        """
+        if self.category_field:
+            stmt = stmt.where(getattr(self.model, self.category_field) == category)
+
+        return stmt.where(getattr(self.model, self.key_field).in_(keys))
+
     async def add(self, category, key, value=None):
         """
         Add a new attribute. If the key already exists, raise an exception.
@@ -211,6 +246,116 @@ class TableKVStorage(BaseKeyValueStorage):
 
         self.session.execute(stmt)
 
+    async def has_many(self, category: str, keys: list) -> dict:
+        """
+        Check if keys exist. Each batch of keys is checked in one query.
+
+        Args:
+            category: the category of data.
+            keys: attributes' keys.
+
+        Return:
+            (dict) {key: exists or not}
+        """
+        if not self.key_field:
+            return await super(TableKVStorage, self).has_many(category, keys)
+
+        key_field = getattr(self.model, self.key_field)
+        exist_keys = set()
+        for batch in self.split_keys(keys):
+            result = await self.execute(self.where_keys(select(key_field), category, batch))
+            exist_keys.update(result.scalars().all())
+
+        return {key: key in exist_keys for key in keys}
+
+    async def load_many(self, category: str, keys: list, *default) -> dict:
+        """
+        Get values of keys. Each batch of keys is loaded in one query.
+
+        Args:
+            category: (string) the category of data.
+            keys: (list) data's keys.
+            default: (any or none) default value of missing keys. If it is not set, missing keys are omitted.
+
+        Return:
+            (dict) {key: value}
+        """
+        if not self.key_field:
+            return await super(TableKVStorage, self).load_many(category, keys, *default)
+
+        data = {}
+        for batch in self.split_keys(keys):
+            result = await self.execute(self.where_keys(select(self.model), category, batch))
+            for record in result.scalars().all():
+                if self.default_value_field is not None:
+                    value = getattr(record, self.default_value_field)
+                else:
+                    value = {k: getattr(record, k) for k in self.columns}
+                data[getattr(record, self.key_field)] = value
+
+        if len(default) > 0:
+            return {key: data.get(key, default[0]) for key in keys}
+        else:
+            return {key: data[key] for key in keys if key in data}
+
+    async def save_many(self, category: str, values: dict) -> None:
+        """
+        Set values of keys. Existing records of a batch are updated in one statement and
+        new records are inserted in one statement.
+
+        Args:
+            category: (string) the category of data.
+            values: (dict) {key: value}
+        """
+        if not self.key_field or self.default_value_field is None:
+            # Values are dicts of different fields, save them one by one.
+            return await super(TableKVStorage, self).save_many(category, values)
+
+        key_field = getattr(self.model, self.key_field)
+        for batch in self.split_keys(values.keys()):
+            result = await self.execute(self.where_keys(select(key_field), category, batch))
+            exist_keys = set(result.scalars().all())
+
+            stmts = []
+            if exist_keys:
+                stmt = update(self.model).values({
+                    self.default_value_field: case(
+                        {key: values[key] for key in exist_keys},
+                        value=key_field,
+                    )
+                })
+                stmts.append(self.where_keys(stmt, category, list(exist_keys)))
+
+            new_records = []
+            for key in batch:
+                if key not in exist_keys:
+                    data = {
+                        self.key_field: key,
+                        self.default_value_field: values[key],
+                    }
+                    if self.category_field:
+                        data[self.category_field] = category
+                    new_records.append(data)
+
+            if new_records:
+                stmts.append(insert(self.model).values(new_records))
+
+            await self.execute(*stmts)
+
+    async def delete_many(self, category: str, keys: list) -> None:
+        """
+        Delete keys. Each batch of keys is deleted in one statement.
+
+        Args:
+            category: (string) the category of data.
+            keys: (list) attributes' keys.
+        """
+        if not self.key_field:
+            return await super(TableKVStorage, self).delete_many(category, keys)
+
+        for batch in self.split_keys(keys):
+            await self.execute(self.where_keys(delete(self.model), category, batch))
+
     async def set_all(self, all_data: dict) -> None:
         """
         Set all data to the storage.
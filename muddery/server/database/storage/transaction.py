@@ -5,6 +5,9 @@ import weakref
 class Transaction(object):
     """
     Guarantee the transaction execution of a given block.
+
+    Use it in an async with statement to wait until the transaction is written to the
+    database, errors of committing are raised there.
     """
     def __init__(self, storage):
         self.storage = weakref.proxy(storage)
@@ -17,3 +20,11 @@ class Transaction(object):
             self.storage.transaction_success(exc_type, exc_value, traceback)
         else:
             self.storage.transaction_failed(exc_type, exc_value, traceback)
+
+    async def __aenter__(self):
+        self.__enter__()
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.__exit__(exc_type, exc_value, traceback)
+        if exc_type is None:
+            await self.storage.transaction_wait()
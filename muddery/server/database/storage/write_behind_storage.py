@@ -0,0 +1,575 @@
+"""
+Key value storage in relational database with a write behind memory cache.
+
+The memory cache is authoritative. Changes are written to the cache at once and
+the dirty keys are written to the database in one transaction every
+DATABASE_FLUSH_INTERVAL seconds, or when there are DATABASE_FLUSH_SIZE dirty keys.
+
+Changes made in a transaction are kept in the transaction's own dirty keys, which
+belong to the task running the transaction. They are added to the storage's dirty
+keys when the transaction succeeds, or removed with their cached categories when it
+fails.
+"""
+
+import asyncio
+import weakref
+from collections import deque
+from contextvars import ContextVar
+from muddery.server.settings import SETTINGS
+from muddery.server.database.storage.base_kv_storage import BaseKeyValueStorage
+from muddery.server.database.storage.storage_with_cache import StorageWithCache
+from muddery.server.utils.logger import logger
+
+
+class WriteBehindStorage(StorageWithCache):
+    """
+    The storage of object attributes.
+    """
+    # all write behind storages, used to flush all data when the server stops.
+    instances = weakref.WeakSet()
+
+    def __init__(self, storage: BaseKeyValueStorage, cache: BaseKeyValueStorage):
+        super(WriteBehindStorage, self).__init__(storage, cache)
+
+        self.flush_interval = SETTINGS.DATABASE_FLUSH_INTERVAL
+        self.flush_size = SETTINGS.DATABASE_FLUSH_SIZE
+
+        # dirty keys: {(category, key): (operation, value)}
+        # operation can be "add", "save", "delete" or "replace" (delete the old record then add a new one).
+        self.dirty = {}
+
+        # categories to delete before writing dirty keys
+        self.deleted_categories = set()
+
+        # The transaction of the current task.
+        # {"dirty": dirty keys, "deleted_categories": deleted categories,
+        #  "categories": changed categories, "depth": number of nested transactions}
+        self.transaction_var = ContextVar("write_behind_transaction", default=None)
+
+        # running transactions
+        self.transactions = []
+
+        # Records are dropped after failing to be written so many times.
+        self.max_retries = SETTINGS.DATABASE_FLUSH_MAX_RETRIES
+
+        # failed times of records: {(category, key): times}, key is None for deleted categories.
+        self.failures = {}
+
+        # Dropped records: (category, key, operation, value, error)
+        self.dead_letters = deque(maxlen=1000)
+
+        self.flush_lock = asyncio.Lock()
+        self.flush_handle = None
+
+        self.instances.add(self)
+
+    @classmethod
+    async def flush_all(cls) -> None:
+        """
+        Write all dirty data of all storages to the database.
+        """
+        for storage in list(cls.instances):
+            await storage.flush()
+
+    async def add(self, category: str, key: str, value: any = None) -> None:
+        """
+        Add a new attribute. If the key already exists, raise an exception.
+
+        Args:
+            category: (string) the category of data.
+            key: (string) the key.
+            value: (any) data.
+        """
+        async with self.category_locks.lock(category):
+            await self.ensure_category_cache(category)
+            await self.cache.add(category, key, value)
+
+            dirty, deleted_categories = self.get_changes(category)
+            dirty_key = (category, key)
+            if dirty_key in dirty:
+                # The key has been deleted before.
+                dirty[dirty_key] = ("replace", self.copy_value(value))
+            else:
+                dirty[dirty_key] = ("add", self.copy_value(value))
+            self.schedule_flush()
+
+    async def save(self, category: str, key: str, value: any = None) -> None:
+        """
+        Set a value to the default value field.
+
+        Args:
+            category: (string) the category of data.
+            key: (string) the key.
+            value: (any) data.
+        """
+        async with self.category_locks.lock(category):
+            await self.ensure_category_cache(category)
+            await self.cache.save(category, key, value)
+            self.set_dirty_save(category, key, value)
+            self.schedule_flush()
+
+    async def save_many(self, category: str, values: dict) -> None:
+        """
+        Set values of keys.
+
+        Args:
+            category: (string) the category of data.
+            values: (dict) {key: value}
+        """
+        async with self.category_locks.lock(category):
+            await self.ensure_category_cache(category)
+            await self.cache.save_many(category, values)
+            for key, value in values.items():
+                self.set_dirty_save(category, key, value)
+            self.schedule_flush()
+
+    async def delete(self, category: str, key: str) -> dict:
+        """
+        delete a key.
+
+        Args:
+            category: (string) the category of data.
+            key: (string) attribute's key.
+
+        Return:
+            (dict): deleted values
+        """
+        async with self.category_locks.lock(category):
+            self.set_dirty_delete(category, key)
+            self.schedule_flush()
+            return await self.cache.delete(category, key)
+
+    async def delete_many(self, category: str, keys: list) -> None:
+        """
+        delete keys.
+
+        Args:
+            category: (string) the category of data.
+            keys: (list) attributes' keys.
+        """
+        async with self.category_locks.lock(category):
+            for key in keys:
+                self.set_dirty_delete(category, key)
+            self.schedule_flush()
+            await self.cache.delete_many(category, keys)
+
+    async def delete_category(self, category: str) -> dict:
+        """
+        Remove all values of a category.
+
+        Args:
+            category: (string) the category of data.
+
+        Return:
+            (dict): deleted values
+        """
+        async with self.category_locks.lock(category):
+            dirty, deleted_categories = self.get_changes(category)
+            for dirty_key in [dirty_key for dirty_key in dirty if dirty_key[0] == category]:
+                del dirty[dirty_key]
+            deleted_categories.add(category)
+            self.schedule_flush()
+
+            # Keep an empty category in the cache, so it will not be loaded from the database again.
+            await self.cache.set_category(category, {})
+
+    async def set_all_cache(self) -> dict:
+        """
+        Load all data from db if have not loaded this category.
+        :return:
+        """
+        await self.flush()
+        categories = self.deleted_categories.union(dirty_key[0] for dirty_key in self.dirty)
+        for trans in self.transactions:
+            categories.update(trans["categories"])
+
+        if not categories:
+            return await super(WriteBehindStorage, self).set_all_cache()
+
+        # Add changes which have not been written to the database's data.
+        all_data = await self.storage.load_all()
+        for category in categories:
+            all_data[category] = self.apply_changes(category, all_data.get(category, {}))
+
+        await self.cache.set_all(all_data)
+        self.all_cached = True
+        return all_data
+
+    async def set_category_cache(self, category: str) -> dict:
+        """
+        Load a category's data from db if have not loaded this category.
+        :param category:
+        :return:
+        """
+        if self.flush_lock.locked() or self.has_dirty(category, self.dirty, self.deleted_categories):
+            # Write dirty data before loading it from the database.
+            await self.flush()
+
+        if self.has_dirty(category, self.dirty, self.deleted_categories) or \
+                any(category in trans["categories"] for trans in self.transactions):
+            # The flush failed or running transactions changed the category, add changes which have
+            # not been written to the database's data.
+            try:
+                data = await self.storage.load_category(category)
+            except KeyError:
+                data = {}
+
+            data = self.apply_changes(category, data)
+            await self.cache.set_category(category, data)
+            return data
+
+        return await super(WriteBehindStorage, self).set_category_cache(category)
+
+    def get_changes(self, category: str) -> tuple:
+        """
+        Get the dirty keys and deleted categories to record a change of the category. Changes in a
+        transaction are recorded in the transaction.
+
+        Return:
+            (dict, set) dirty keys and deleted categories.
+        """
+        trans = self.transaction_var.get()
+        if trans is None:
+            return self.dirty, self.deleted_categories
+
+        trans["categories"].add(category)
+        return trans["dirty"], trans["deleted_categories"]
+
+    def set_dirty_save(self, category: str, key: str, value: any) -> None:
+        """
+        Record a saved value in dirty keys.
+        """
+        dirty, deleted_categories = self.get_changes(category)
+        dirty_key = (category, key)
+        if dirty_key in dirty:
+            operation, last_value = dirty[dirty_key]
+            if operation == "delete":
+                dirty[dirty_key] = ("replace", self.copy_value(value))
+            else:
+                dirty[dirty_key] = (operation, self.merge_value(last_value, value))
+        else:
+            dirty[dirty_key] = ("save", self.copy_value(value))
+
+    def set_dirty_delete(self, category: str, key: str) -> None:
+        """
+        Record a deleted key in dirty keys.
+        """
+        dirty, deleted_categories = self.get_changes(category)
+        dirty_key = (category, key)
+        if dirty_key in dirty and dirty[dirty_key][0] == "add":
+            # The record has not been written to the database yet.
+            del dirty[dirty_key]
+        else:
+            dirty[dirty_key] = ("delete", None)
+
+    def copy_value(self, value: any) -> any:
+        """
+        Copy dict values, so later changes of the caller will not affect dirty values.
+        """
+        if type(value) == dict:
+            return value.copy()
+        else:
+            return value
+
+    def merge_value(self, last_value: any, value: any) -> any:
+        """
+        Merge two values of a key.
+        """
+        if type(last_value) == dict and type(value) == dict:
+            merged = last_value.copy()
+            merged.update(value)
+            return merged
+        else:
+            return self.copy_value(value)
+
+    def schedule_flush(self) -> None:
+        """
+        Flush dirty data later, or flush it now if there are too many dirty keys.
+        """
+        if self.transaction_var.get() is not None:
+            # Dirty data will be flushed when the transaction finishes.
+            return
+
+        if len(self.dirty) >= self.flush_size:
+            self.cancel_flush_timer()
+            asyncio.ensure_future(self.flush())
+        elif self.flush_handle is None:
+            self.flush_handle = asyncio.get_event_loop().call_later(self.flush_interval, self.on_flush_timer)
+
+    def cancel_flush_timer(self) -> None:
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+
+    def on_flush_timer(self) -> None:
+        self.flush_handle = None
+        asyncio.ensure_future(self.flush())
+
+    async def flush(self) -> None:
+        """
+        Write all dirty data to the database in one transaction. If it fails, write records one by
+        one, records which still fail are written in later flushes.
+        """
+        async with self.flush_lock:
+            self.cancel_flush_timer()
+            if not self.dirty and not self.deleted_categories:
+                return
+
+            dirty = self.dirty
+            deleted_categories = self.deleted_categories
+            self.dirty = {}
+            self.deleted_categories = set()
+
+            try:
+                await self.write_batch(dirty, deleted_categories)
+            except Exception as e:
+                logger.log_err("Can not write %s records to the database in a batch, write them one by one: %s" %
+                               (len(dirty), e))
+                dirty, deleted_categories = await self.write_one_by_one(dirty, deleted_categories)
+
+                # Keep the failed changes and write them in the next flush.
+                if dirty or deleted_categories:
+                    self.restore_dirty(dirty, deleted_categories)
+                    if self.flush_handle is None:
+                        self.flush_handle = asyncio.get_event_loop().call_later(self.flush_interval,
+                                                                                self.on_flush_timer)
+            else:
+                if self.failures:
+                    for dirty_key in dirty:
+                        self.failures.pop(dirty_key, None)
+                    for category in deleted_categories:
+                        self.failures.pop((category, None), None)
+
+    async def write_batch(self, dirty: dict, deleted_categories: set) -> None:
+        """
+        Write dirty keys to the database in one transaction.
+        """
+        async with self.storage.transaction():
+            for category in deleted_categories:
+                await self.storage.delete_category(category)
+
+            # Write saved and deleted keys of a category in batches.
+            # {category: {key: value}}, {category: [key]}
+            saves = {}
+            deletes = {}
+            for (category, key), (operation, value) in dirty.items():
+                if operation == "add":
+                    await self.storage.add(category, key, value)
+                elif operation == "save":
+                    saves.setdefault(category, {})[key] = value
+                elif operation == "delete":
+                    deletes.setdefault(category, []).append(key)
+                elif operation == "replace":
+                    await self.storage.delete(category, key)
+                    await self.storage.add(category, key, value)
+
+            for category, keys in deletes.items():
+                await self.storage.delete_many(category, keys)
+
+            for category, values in saves.items():
+                await self.storage.save_many(category, values)
+
+    async def write_one_by_one(self, dirty: dict, deleted_categories: set) -> tuple:
+        """
+        Write deleted categories and dirty keys to the database, each in its own transaction.
+
+        Returns:
+            (dict, set) dirty keys and deleted categories which failed and can be retried.
+        """
+        failed_dirty = {}
+        failed_categories = set()
+
+        for category in deleted_categories:
+            try:
+                async with self.storage.transaction():
+                    await self.storage.delete_category(category)
+                self.failures.pop((category, None), None)
+            except Exception as e:
+                if self.add_failure(category, None, "delete_category", None, e):
+                    failed_categories.add(category)
+
+        for (category, key), (operation, value) in dirty.items():
+            try:
+                async with self.storage.transaction():
+                    if operation == "add":
+                        await self.storage.add(category, key, value)
+                    elif operation == "save":
+                        await self.storage.save(category, key, value)
+                    elif operation == "delete":
+                        await self.storage.delete(category, key)
+                    elif operation == "replace":
+                        await self.storage.delete(category, key)
+                        await self.storage.add(category, key, value)
+                self.failures.pop((category, key), None)
+            except Exception as e:
+                if self.add_failure(category, key, operation, value, e):
+                    failed_dirty[(category, key)] = (operation, value)
+
+        return failed_dirty, failed_categories
+
+    def add_failure(self, category: str, key: str or None, operation: str, value: any, error: Exception) -> bool:
+        """
+        Count a failed write of a record. Drop the record if it failed too many times.
+
+        Returns:
+            (bool) the record can be retried.
+        """
+        failure_key = (category, key)
+        times = self.failures.get(failure_key, 0) + 1
+        if times < self.max_retries:
+            self.failures[failure_key] = times
+            return True
+
+        self.failures.pop(failure_key, None)
+        self.dead_letters.append((category, key, operation, value, str(error)))
+
+        # Load the category from the database again, so the cache does not keep the dropped record.
+        self.cache.discard_category(category)
+        self.all_cached = False
+        logger.log_err("Drop the record after %s failed writes, category: %s, key: %s, operation: %s, "
+                       "value: %r, error: %s" % (times, category, key, operation, value, error))
+        return False
+
+    def restore_dirty(self, dirty: dict, deleted_categories: set) -> None:
+        """
+        Put back dirty keys which failed to be written to the database. Changes made after
+        them are kept.
+
+        Args:
+            dirty: (dict) failed dirty keys.
+            deleted_categories: (set) failed deleted categories.
+        """
+        self.merge_dirty(dirty, deleted_categories, self.dirty, self.deleted_categories)
+        self.dirty = dirty
+        self.deleted_categories = deleted_categories
+
+    def merge_dirty(self, dirty: dict, deleted_categories: set, new_dirty: dict, new_deleted_categories: set) -> None:
+        """
+        Merge newer dirty keys into older dirty keys.
+
+        Args:
+            dirty: (dict) older dirty keys, merged keys are set to it.
+            deleted_categories: (set) older deleted categories, merged categories are set to it.
+            new_dirty: (dict) newer dirty keys.
+            new_deleted_categories: (set) newer deleted categories.
+        """
+        if new_deleted_categories:
+            for dirty_key in [dirty_key for dirty_key in dirty if dirty_key[0] in new_deleted_categories]:
+                del dirty[dirty_key]
+            deleted_categories.update(new_deleted_categories)
+
+        for dirty_key, (operation, value) in new_dirty.items():
+            if dirty_key not in dirty:
+                dirty[dirty_key] = (operation, value)
+                continue
+
+            last_operation, last_value = dirty[dirty_key]
+            if operation == "save":
+                if last_operation == "delete":
+                    dirty[dirty_key] = ("replace", value)
+                else:
+                    dirty[dirty_key] = (last_operation, self.merge_value(last_value, value))
+            elif operation == "delete":
+                if last_operation == "add":
+                    # The record has not been written to the database yet.
+                    del dirty[dirty_key]
+                else:
+                    dirty[dirty_key] = ("delete", None)
+            else:
+                # An added key must have been deleted before.
+                dirty[dirty_key] = ("replace", value)
+
+    def has_dirty(self, category: str, dirty: dict, deleted_categories: set) -> bool:
+        """
+        Check if dirty keys change the category.
+        """
+        return category in deleted_categories or any(dirty_key[0] == category for dirty_key in dirty)
+
+    def apply_changes(self, category: str, data: dict) -> dict:
+        """
+        Apply dirty keys and running transactions' changes of a category to the data loaded from
+        the database.
+
+        Args:
+            category: (string) the category of data.
+            data: (dict) the category's data in the database.
+        """
+        data = self.apply_dirty(category, data, self.dirty, self.deleted_categories)
+        for trans in self.transactions:
+            if category in trans["categories"]:
+                data = self.apply_dirty(category, data, trans["dirty"], trans["deleted_categories"])
+
+        return data
+
+    def apply_dirty(self, category: str, data: dict, dirty: dict, deleted_categories: set) -> dict:
+        """
+        Apply dirty keys of a category to the category's data.
+
+        Args:
+            category: (string) the category of data.
+            data: (dict) the category's data.
+            dirty: (dict) dirty keys.
+            deleted_categories: (set) deleted categories.
+        """
+        if category in deleted_categories:
+            data = {}
+
+        for (dirty_category, key), (operation, value) in dirty.items():
+            if dirty_category != category:
+                continue
+
+            if operation == "delete":
+                data.pop(key, None)
+            elif operation == "save" and type(data.get(key)) == dict and type(value) == dict:
+                data[key] = self.merge_value(data[key], value)
+            else:
+                data[key] = self.copy_value(value)
+
+        return data
+
+    def transaction_enter(self):
+        trans = self.transaction_var.get()
+        if trans is not None:
+            # A nested transaction joins the outer transaction.
+            trans["depth"] += 1
+            return
+
+        trans = {
+            "dirty": {},
+            "deleted_categories": set(),
+            "categories": set(),
+            "depth": 1,
+        }
+        self.transaction_var.set(trans)
+        self.transactions.append(trans)
+
+    def transaction_success(self, exc_type, exc_value, trace) -> None:
+        trans = self.transaction_var.get()
+        trans["depth"] -= 1
+        if trans["depth"] > 0:
+            return
+
+        self.transaction_var.set(None)
+        self.transactions.remove(trans)
+
+        # Write the transaction's changes to the database.
+        self.merge_dirty(self.dirty, self.deleted_categories, trans["dirty"], trans["deleted_categories"])
+        if self.dirty or self.deleted_categories:
+            self.cancel_flush_timer()
+            asyncio.ensure_future(self.flush())
+
+    def transaction_failed(self, exc_type, exc_value, trace) -> None:
+        trans = self.transaction_var.get()
+        trans["depth"] -= 1
+        if trans["depth"] > 0:
+            return
+
+        self.transaction_var.set(None)
+        self.transactions.remove(trans)
+
+        # Discard the transaction's changes. Remove changed categories from the cache, they will
+        # be loaded again with other changes.
+        for category in trans["categories"]:
+            self.cache.discard_category(category)
+        if trans["categories"]:
+            self.all_cached = False
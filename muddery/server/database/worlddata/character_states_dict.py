@@ -2,6 +2,7 @@
 Query and deal common tables.
 """
 
+from muddery.common.utils.utils import parse_literal
 from muddery.server.database.worlddata.base_query import BaseQuery
 from muddery.server.database.worlddata.worlddata import WorldData
 
@@ -11,3 +12,25 @@ class CharacterStatesDict(BaseQuery):
     Object properties dict.
     """
     table_name = "character_states_dict"
+
+    # Parsed default values of states.
+    # [(state's key, default, parsed default value, is literal)]
+    defaults = []
+
+    # The worlddata's version of parsed values.
+    defaults_version = None
+
+    @classmethod
+    def get_defaults(cls):
+        """
+        Get all states' defaults. A default can be a python literal, or a raw string which may be
+        the key of a const value.
+
+        Returns:
+            (list) [(state's key, default, parsed default value, is literal)]
+        """
+        if cls.defaults_version != WorldData.version:
+            cls.defaults = [(record.key, record.default) + parse_literal(record.default) for record in cls.all()]
+            cls.defaults_version = WorldData.version
+
+        return cls.defaults
@@ -2,6 +2,7 @@
 Query and deal common tables.
 """
 
+from muddery.common.utils.utils import parse_literal
 from muddery.server.database.worlddata.base_query import BaseQuery
 from muddery.server.database.worlddata.worlddata import WorldData
 
@@ -12,6 +13,13 @@ class ElementProperties(BaseQuery):
     """
     table_name = "element_properties"
 
+    # Parsed values of all properties.
+    # {(element's type, element's key, level): {property's key: value}}
+    values = {}
+
+    # The worlddata's version of parsed values.
+    values_version = None
+
     @classmethod
     def get_properties(cls, element, key, level):
         """
@@ -23,3 +31,58 @@ class ElementProperties(BaseQuery):
             level: (number) object's level.
         """
         return WorldData.get_table_data(cls.table_name, element=element, key=key, level=level)
+
+    @classmethod
+    def get_values(cls, element, key, level):
+        """
+        Get element's parsed property values. Values are parsed once after the table is loaded.
+        Values which are not python literals are RawString objects, empty values are None.
+
+        Args:
+            element: (string) element's type.
+            key: (string) element's key
+            level: (number) object's level.
+
+        Returns:
+            (dict) {property's key: value}
+        """
+        if cls.values_version != WorldData.version:
+            cls.load_values()
+
+        return cls.values.get((element, key, level), {})
+
+    @classmethod
+    def get_levels(cls, element, key):
+        """
+        Get levels which have properties of an element.
+
+        Args:
+            element: (string) element's type.
+            key: (string) element's key
+
+        Returns:
+            (list) sorted levels
+        """
+        if cls.values_version != WorldData.version:
+            cls.load_values()
+
+        return sorted(level for (value_element, value_key, level) in cls.values
+                      if value_element == element and value_key == key and level is not None)
+
+    @classmethod
+    def load_values(cls):
+        """
+        Parse all property values.
+        """
+        values = {}
+        for record in cls.all():
+            if record.value == "":
+                value = None
+            else:
+                # Raw strings are RawString objects, so they can be told from parsed literals.
+                value, is_literal = parse_literal(record.value)
+
+            values.setdefault((record.element, record.key, record.level), {})[record.property] = value
+
+        cls.values = values
+        cls.values_version = WorldData.version
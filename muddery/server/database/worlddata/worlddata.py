@@ -4,11 +4,15 @@ Load and cache all worlddata.
 import importlib
 import inspect
 import traceback
+from sqlalchemy.orm import Session
 from muddery.common.utils.exception import MudderyError
 from muddery.server.settings import SETTINGS
-from muddery.server.database.storage.memory_record import MemoryRecord
 from muddery.server.database.storage.memory_table import MemoryTable
+from muddery.server.database.storage.memory_joined_table import MemoryJoinedTable
 from muddery.server.database.worlddata_db import WorldDataDB
+from muddery.server.database.worlddata.worlddata_snapshot import WorldDataSnapshot
+from muddery.server.statements.statement_compiler import StatementCompiler
+from muddery.server.utils.logger import logger
 
 
 class WorldData(object):
@@ -17,12 +21,22 @@ class WorldData(object):
     """
     tables = {}
 
+    # It increases when worlddata changes, so data built from worlddata can be rebuilt.
+    version = 0
+
+    # tables joined by key
+    # {tables' names: MemoryJoinedTable}
+    joined_tables = {}
+
     @classmethod
     def clear_all(cls):
         """
         Clear data.
         """
         cls.tables = {}
+        cls.joined_tables = {}
+        cls.version += 1
+        StatementCompiler.inst().clear()
 
     @classmethod
     def reload_all(cls):
@@ -31,14 +45,125 @@ class WorldData(object):
         """
         cls.clear_all()
 
-        module = importlib.import_module(SETTINGS.WORLD_DATA_MODEL_FILE)
-        models = [cls for cls in vars(module).values() if inspect.isclass(cls)]
-        for model in models:
-            config = SETTINGS.DATABASES[SETTINGS.WORLD_DATA_APP]
-            cls.tables[model.__name__] = MemoryTable(
-                SETTINGS.WORLD_DATA_APP,
-                config["MODELS"],
-                model.__name__)
+        for name in cls.get_table_names():
+            cls.load_table(name)
+
+    @classmethod
+    def get_table_names(cls):
+        """
+        Get names of all worlddata tables.
+        """
+        module = importlib.import_module(SETTINGS.WORLDDATA_DB["MODELS"])
+        return [
+            name for name, model in vars(module).items()
+            if inspect.isclass(model) and hasattr(model, "__table__") and model.__table__.name == name
+        ]
+
+    @classmethod
+    def load_changed(cls):
+        """
+        Load tables whose records have been changed in the database. Records are compared by their
+        hashes. It does not change cached tables and uses its own database session, so it can run
+        in another thread.
+
+        Return:
+            (dict) {changed table's name: (new table, (set) values of added, changed and removed records)}
+        """
+        config = SETTINGS.WORLDDATA_DB
+        session = Session(WorldDataDB.inst().get_engine(), autocommit=True)
+
+        changed = {}
+        try:
+            for table_name, table in list(cls.tables.items()):
+                try:
+                    new_table = MemoryTable(session, config["MODELS"], table_name)
+                except Exception as e:
+                    logger.log_err("Can not load table %s: %s" % (table_name, e))
+                    continue
+
+                changed_rows = set(table.rows()) ^ set(new_table.rows())
+                if changed_rows:
+                    changed[table_name] = (new_table, changed_rows)
+        finally:
+            session.close()
+
+        return changed
+
+    @classmethod
+    def apply_changed(cls, changed):
+        """
+        Replace cached tables with changed tables.
+
+        Args:
+            changed: (dict) changed tables from load_changed().
+
+        Return:
+            (dict) {changed table's name: (set) values of added, changed and removed records}
+        """
+        if not changed:
+            return {}
+
+        for table_name, (new_table, changed_rows) in changed.items():
+            cls.tables[table_name] = new_table
+
+        cls.joined_tables = {
+            tables_key: joined for tables_key, joined in cls.joined_tables.items()
+            if not any(table_name in changed for table_name in tables_key)
+        }
+        cls.version += 1
+        StatementCompiler.inst().clear()
+
+        return {table_name: changed_rows for table_name, (new_table, changed_rows) in changed.items()}
+
+    @classmethod
+    def save_snapshot(cls):
+        """
+        Write all cached tables to the snapshot.
+        """
+        if SETTINGS.WORLDDATA_SNAPSHOT:
+            WorldDataSnapshot.save({table_name: table.dump() for table_name, table in cls.tables.items()})
+
+    @classmethod
+    def init(cls):
+        """
+        Load all tables from the snapshot. If the snapshot is stale, load tables from the database and
+        write a new snapshot.
+        """
+        if not SETTINGS.WORLDDATA_SNAPSHOT:
+            return
+
+        if cls.load_snapshot():
+            return
+
+        cls.reload_all()
+        cls.save_snapshot()
+
+    @classmethod
+    def load_snapshot(cls):
+        """
+        Load all tables from the snapshot.
+
+        Return:
+            (boolean) success or not
+        """
+        tables_data = WorldDataSnapshot.load()
+        if tables_data is None:
+            return False
+
+        try:
+            config = SETTINGS.WORLDDATA_DB
+            session = WorldDataDB.inst().get_session()
+            tables = {
+                table_name: MemoryTable(session, config["MODELS"], table_name, data)
+                for table_name, data in tables_data.items()
+            }
+        except Exception as e:
+            logger.log_err("Can not load the worlddata snapshot: %s" % e)
+            return False
+
+        cls.clear_all()
+        cls.tables = tables
+        return True
 
     @classmethod
     def refresh(cls, table_name):
@@ -48,6 +173,16 @@ class WorldData(object):
         if table_name in cls.tables:
             del cls.tables[table_name]
 
+        # Remove joined tables of this table.
+        cls.joined_tables = {
+            tables_key: joined for tables_key, joined in cls.joined_tables.items() if table_name not in tables_key
+        }
+
+        cls.version += 1
+
+        # Statements may be changed.
+        StatementCompiler.inst().clear()
+
     @classmethod
     def load_table(cls, table_name):
         """
@@ -110,24 +245,14 @@ class WorldData(object):
         Return:
             (list) records
         """
-        all_fields = {}
-        row_data = []
-        for table_name in tables:
-            if table_name not in cls.tables:
-                cls.load_table(table_name)
-
-            fields = cls.tables[table_name].fields()
-            records = cls.tables[table_name].filter(key=key)
-            field_pos = dict(zip(fields, range(len(row_data), len(row_data) + len(fields))))
-
-            if not records:
-                all_fields.update(field_pos)
-                row_data.extend([None] * len(fields))
-            elif len(records) > 1:
-                raise MudderyError("Can not solve more than one records from table: %s" % table_name)
-            else:
-                record = records[0]
-                all_fields.update(field_pos)
-                row_data.extend([getattr(record, field_name) for field_name in fields])
-
-        return [MemoryRecord(all_fields, row_data)]
+        tables_key = tuple(tables)
+        if tables_key not in cls.joined_tables:
+            for table_name in tables:
+                if table_name not in cls.tables:
+                    cls.load_table(table_name)
+
+            cls.joined_tables[tables_key] = MemoryJoinedTable(
+                [(table_name, cls.tables[table_name]) for table_name in tables]
+            )
+
+        return [cls.joined_tables[tables_key].get(key)]
@@ -0,0 +1,98 @@
+"""
+A compiled snapshot of all worlddata tables.
+
+The snapshot file contains two pickled objects: a header of the snapshot's format and the
+worlddata database's content hash, then all tables' records and indexes. The header is checked
+before loading tables, so a stale snapshot is skipped quickly.
+"""
+
+import os
+import pickle
+import hashlib
+from muddery.server.settings import SETTINGS
+from muddery.server.utils.logger import logger
+
+
+class WorldDataSnapshot(object):
+    """
+    Save and load the worlddata snapshot.
+    """
+    # Change it when the snapshot's structure changes.
+    SNAPSHOT_FORMAT = 1
+
+    @classmethod
+    def get_version(cls):
+        """
+        Get the content hash of the worlddata database. Returns None if the database does not support snapshots.
+        """
+        config = SETTINGS.WORLDDATA_DB
+        if config["ENGINE"] != "sqlite3":
+            return None
+
+        try:
+            sha = hashlib.sha1()
+            with open(config["NAME"], "rb") as fp:
+                for block in iter(lambda: fp.read(1 << 20), b""):
+                    sha.update(block)
+            return sha.hexdigest()
+        except OSError as e:
+            logger.log_err("Can not read the worlddata database: %s" % e)
+            return None
+
+    @classmethod
+    def load(cls):
+        """
+        Load tables' data from the snapshot.
+
+        Returns:
+            (dict) {table's name: table's data}, or None if the snapshot is missing or stale.
+        """
+        filename = SETTINGS.WORLDDATA_SNAPSHOT
+        if not filename or not os.path.exists(filename):
+            return None
+
+        version = cls.get_version()
+        if not version:
+            return None
+
+        try:
+            with open(filename, "rb") as fp:
+                header = pickle.load(fp)
+                if header != (cls.SNAPSHOT_FORMAT, version):
+                    logger.log_info("The worlddata snapshot is stale.")
+                    return None
+
+                return pickle.load(fp)
+        except Exception as e:
+            logger.log_err("Can not load the worlddata snapshot: %s" % e)
+            return None
+
+    @classmethod
+    def save(cls, tables_data):
+        """
+        Save tables' data to the snapshot.
+
+        Args:
+            tables_data: (dict) {table's name: table's data}
+        """
+        filename = SETTINGS.WORLDDATA_SNAPSHOT
+        if not filename:
+            return
+
+        version = cls.get_version()
+        if not version:
+            return
+
+        # Write to a temporary file first, so a server starting at the same time will not read a partial file.
+        temp_filename = filename + ".tmp"
+        try:
+            with open(temp_filename, "wb") as fp:
+                pickle.dump((cls.SNAPSHOT_FORMAT, version), fp, pickle.HIGHEST_PROTOCOL)
+                pickle.dump(tables_data, fp, pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_filename, filename)
+        except Exception as e:
+            logger.log_err("Can not save the worlddata snapshot: %s" % e)
+            try:
+                os.remove(temp_filename)
+            except OSError:
+                pass
@@ -155,6 +155,12 @@ class MudderyAccount(BaseElement):
         """
         return self.id
 
+    def get_session(self):
+        """
+        Get the account's session.
+        """
+        return self.session
+
     def get_session_id(self):
         if self.session:
             return self.session.uid
@@ -278,7 +284,7 @@ class MudderyAccount(BaseElement):
         move_results = {}
         try:
             location_key = await CharacterLocation.inst().load(char_db_id)
-            location = Server.world.get_room(location_key)
+            location = await Server.world.get_room(location_key)
             move_results = await new_char.move_to(location)
         except KeyError:
             pass
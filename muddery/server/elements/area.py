@@ -122,6 +122,13 @@ class MudderyArea(ELEMENT("MATTER")):
         """
         return self.all_rooms.keys()
 
+    def unload(self):
+        """
+        Called when the area is removed from the world.
+        """
+        for room in self.all_rooms.values():
+            room.unload()
+
     def get_room(self, room_key):
         """
         Get a room by its key.
@@ -2,8 +2,9 @@
 MudderyObject is an object which can load it's data automatically.
 """
 
-import ast
+from types import MappingProxyType
 from muddery.server.utils.logger import logger
+from muddery.common.utils.utils import parse_literal
 from muddery.server.utils.data_field_handler import DataFieldHandler, ConstDataHolder
 from muddery.server.database.worlddata.properties_dict import PropertiesDict
 from muddery.server.mappings.element_set import ELEMENT
@@ -21,6 +22,13 @@ class BaseElement(object):
     # object's data model
     model_name = ""
 
+    # Read only const data shared by elements of the same type, key and level.
+    # {(element type, element key, ...): read only dict}
+    shared_const_data = {}
+
+    # The worlddata's version of shared const data.
+    shared_const_data_version = None
+
     def __init__(self, *agrs, **wargs):
         super(BaseElement, self).__init__(*agrs, **wargs)
 
@@ -91,14 +99,36 @@ class BaseElement(object):
 
                 records = PropertiesDict.get_properties(cls.element_type)
                 for record in records:
+                    default_value, is_literal = parse_literal(record.default)
                     cls._all_properties_[record.property] = {
                         "name": record.name,
                         "desc": record.desc,
                         "default": record.default,
+                        "default_value": default_value,     # parsed default
+                        "default_is_literal": is_literal,   # a raw default may be the key of another value
                     }
 
         return cls._all_properties_
 
+    @classmethod
+    def get_shared_const_data(cls, cache_key):
+        """
+        Get shared const data. Returns None if it has not been built.
+        """
+        if BaseElement.shared_const_data_version != WorldData.version:
+            # Worlddata has changed.
+            BaseElement.shared_const_data = {}
+            BaseElement.shared_const_data_version = WorldData.version
+
+        return BaseElement.shared_const_data.get(cache_key)
+
+    @classmethod
+    def set_shared_const_data(cls, cache_key, data):
+        """
+        Set shared const data.
+        """
+        BaseElement.shared_const_data[cache_key] = data
+
     # @property system stores object's data.
     def __const_get(self):
         """
@@ -175,20 +205,30 @@ class BaseElement(object):
 
         :return:
         """
-        # Load data.
-        try:
-            # Load db data.
-            base_model = self.get_base_model()
-            self.load_base_data(base_model, element_key)
+        # Elements of the same type and key share the same data.
+        cache_key = (self.element_type, element_key)
+        data = self.get_shared_const_data(cache_key)
+        if data is not None:
+            self.const_data_handler.clear()
+            self.const_data_handler.set_shared(data)
+        else:
+            # Load data.
+            self.const_data_handler.clear()
+            try:
+                # Load db data.
+                base_model = self.get_base_model()
+                self.load_base_data(base_model, element_key)
 
-            # check element type
-            if self.const_data_handler.has("element_type") and self.const.element_type != self.element_type:
-                logger.log_err("Wrong element type %s: %s" % (element_key, self.element_type))
+                # check element type
+                if self.const_data_handler.has("element_type") and self.const.element_type != self.element_type:
+                    logger.log_err("Wrong element type %s: %s" % (element_key, self.element_type))
 
-            # Load extend data.
-            self.load_extend_data(base_model, element_key)
-        except Exception as e:
-            logger.log_err("%s %s can not load data:%s" % (self.model_name, element_key, e))
+                # Load extend data.
+                self.load_extend_data(base_model, element_key)
+            except Exception as e:
+                logger.log_err("%s %s can not load data:%s" % (self.model_name, element_key, e))
+
+            self.set_shared_const_data(cache_key, self.const_data_handler.freeze())
 
         await self.load_custom_level_data(self.element_type, element_key, level)
 
@@ -279,41 +319,49 @@ class BaseElement(object):
         :param level:
         :return:
         """
+        # Elements of the same type, key and level share the same data.
+        cache_key = (self.element_type, self.element_key, element_type, element_key, level)
+        data = self.get_shared_const_data(cache_key)
+        if data is None:
+            data = self.build_custom_level_data(element_type, element_key, level)
+            self.set_shared_const_data(cache_key, data)
+
+        # Use level data instead of old values.
+        for key in self.get_properties_info():
+            self.const_data_handler.discard(key)
+        self.const_data_handler.set_shared(data)
+
+    def build_custom_level_data(self, element_type, element_key, level):
+        """
+        Build the element's base data and custom level data.
+
+        :return: (MappingProxyType) read only data.
+        """
+        data = dict(self.const_data_handler.get_shared())
+
         # Get custom data.
-        values = {}
-        for record in ElementProperties.get_properties(element_type, element_key, level):
-            key = record.property
-            serializable_value = record.value
-            if serializable_value == "":
-                value = None
-            else:
-                try:
-                    value = ast.literal_eval(serializable_value)
-                except (SyntaxError, ValueError) as e:
-                    # treat as a raw string
-                    value = serializable_value
-            values[key] = value
+        values = ElementProperties.get_values(element_type, element_key, level)
 
         # Set values.
         for key, info in self.get_properties_info().items():
             if key in values:
                 # direct value
                 value = values.get(key)
+            elif info["default_is_literal"]:
+                value = info["default_value"]
             elif info["default"] in values:
                 # Get default value.
                 # the value of another value
                 value = values.get(info["default"])
-            elif self.const_data_handler.has(info["default"]):
+            elif info["default"] in data:
                 # the value of another const
-                value = self.const_data_handler.get(info["default"])
+                value = data[info["default"]]
             else:
-                try:
-                    value = ast.literal_eval(info["default"])
-                except (SyntaxError, ValueError) as e:
-                    # treat as a raw string
-                    value = info["default"]
+                value = info["default_value"]
+
+            data[key] = value
 
-            self.const_data_handler.add(key, value)
+        return MappingProxyType(data)
 
     async def at_element_setup(self, first_time):
         """
@@ -8,6 +8,7 @@ distribution systems.
 """
 
 from muddery.server.elements.base_element import BaseElement
+from muddery.server.service.session import Session
 from muddery.server.server import Server
 
 
@@ -52,17 +53,25 @@ class MudderyChannel(BaseElement):
         :param caller: talker.
         :param message: content.
         """
+        sessions = []
+        offline = []
         for char_db_id in self.all_characters:
             try:
-                char = Server.world.get_character(char_db_id)
-                char.msg({
-                    "conversation": {
-                        "type": self.get_element_key(),
-                        "from_id": caller.get_db_id(),
-                        "from_name": caller.get_name(),
-                        "to": self.const.name,
-                        "msg": message,
-                    }
-                })
+                session = Server.world.get_character(char_db_id).get_session()
+                if session:
+                    sessions.append(session)
             except KeyError:
-                self.all_characters.remove(char_db_id)
+                offline.append(char_db_id)
+
+        for char_db_id in offline:
+            self.all_characters.remove(char_db_id)
+
+        Session.broadcast(sessions, {
+            "conversation": {
+                "type": self.get_element_key(),
+                "from_id": caller.get_db_id(),
+                "from_name": caller.get_name(),
+                "to": self.const.name,
+                "msg": message,
+            }
+        })
@@ -8,10 +8,7 @@ creation commands.
 
 """
 
-import time, traceback, ast
-from datetime import datetime
-import pytz
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
+import time, traceback
 from muddery.common.utils.exception import MudderyError, ERR
 from muddery.server.settings import SETTINGS
 from muddery.server.utils.logger import logger
@@ -23,6 +20,7 @@ from muddery.server.database.worlddata.worlddata import WorldData
 from muddery.server.database.worlddata.character_states_dict import CharacterStatesDict
 from muddery.server.utils.loot_handler import LootHandler
 from muddery.server.utils.game_settings import GameSettings
+from muddery.server.utils.timer_handler import TimerHandler
 from muddery.server.utils.localized_strings_handler import _
 from muddery.common.utils.defines import CombatType, EventType
 from muddery.server.utils.object_states_handler import ObjectStatesHandler
@@ -45,9 +43,6 @@ class MudderyCharacter(ELEMENT("MATTER")):
 
     last_id = 0
 
-    skill_scheduler_id = "skill"
-    reborn_scheduler_id = "reborn"
-
     @staticmethod
     def generate_id():
         """
@@ -69,7 +64,12 @@ class MudderyCharacter(ELEMENT("MATTER")):
 
         self.loot_handler = None
         self.location = None
-        self.scheduler = None
+
+        # the combat which makes the character cast skills automatically
+        self.auto_cast_combat = None
+
+        # timer jobs
+        self.reborn_job = None
 
         self.is_alive = True
         self.default_relationship = 0
@@ -111,12 +111,11 @@ class MudderyCharacter(ELEMENT("MATTER")):
         """
         return self.id
 
-    def get_scheduler(self):
-        # get the apscheduler
-        if not self.scheduler:
-            self.scheduler = AsyncIOScheduler(timezone=pytz.utc)
-            self.scheduler.start()
-        return self.scheduler
+    def get_time(self):
+        """
+        Get the current time of skills' cd.
+        """
+        return time.time()
 
     async def at_element_setup(self, first_time):
         """
@@ -142,7 +141,7 @@ class MudderyCharacter(ELEMENT("MATTER")):
         self.skill_gcd = GameSettings.inst().get("global_cd")
         self.auto_cast_skill_cd = GameSettings.inst().get("auto_cast_skill_cd")
 
-        time_now = time.time()
+        time_now = self.get_time()
         self.gcd_finish_time = time_now + self.skill_gcd
 
         # set reborn time
@@ -176,31 +175,27 @@ class MudderyCharacter(ELEMENT("MATTER")):
         """
         # set states
         to_save = {}
-        records = CharacterStatesDict.all()
+        defaults = CharacterStatesDict.get_defaults()
 
-        if keep_states and records:
-            has_status = await async_gather([self.states.has(record.key) for record in records])
+        if keep_states and defaults:
+            has_status = await self.states.has_many([key for key, default, default_value, is_literal in defaults])
         else:
-            has_status = []
+            has_status = {}
 
-        for index, record in enumerate(records):
-            if keep_states and has_status[index]:
+        for key, default, default_value, is_literal in defaults:
+            if keep_states and has_status[key]:
                 # Do not change existent states.
                 continue
 
             # set new states
-            if self.const_data_handler.has(record.default):
+            if not is_literal and self.const_data_handler.has(default):
                 # the value of another const
-                value = self.const_data_handler.get(record.default)
+                value = self.const_data_handler.get(default)
             else:
-                try:
-                    value = ast.literal_eval(record.default)
-                except (SyntaxError, ValueError) as e:
-                    # treat as a raw string
-                    value = record.default
+                value = default_value
 
             # set the value.
-            to_save[record.key] = value
+            to_save[key] = value
 
         if to_save:
             await self.states.saves(to_save)
@@ -339,6 +334,12 @@ class MudderyCharacter(ELEMENT("MATTER")):
         """
         pass
 
+    def get_session(self):
+        """
+        Get the session of the character's player if it has.
+        """
+        return None
+
     ########################################
     #
     # Skill methods.
@@ -351,7 +352,7 @@ class MudderyCharacter(ELEMENT("MATTER")):
         :param caller:
         :return: skills
         """
-        time_now = time.time()
+        time_now = self.get_time()
         if time_now < self.gcd_finish_time:
             return
 
@@ -394,7 +395,7 @@ class MudderyCharacter(ELEMENT("MATTER")):
         if not await skill_obj.is_available(self, False):
             raise MudderyError(ERR.invalid_input, _("This skill is not available."))
 
-        time_now = time.time()
+        time_now = self.get_time()
         if time_now < self.gcd_finish_time and time_now < skill_info["cd_finish"]:
             # In cd.
             raise MudderyError(ERR.skill_in_cd, _("This skill is cooling down."))
@@ -431,56 +432,65 @@ class MudderyCharacter(ELEMENT("MATTER")):
             logger.log_err("Character %s is not in combat." % self.id)
             raise MudderyError(ERR.invalid_input, _("You can only cast this skill in a combat."))
 
-    async def auto_cast_skill(self):
+    async def auto_cast_skill(self, combat):
         """
-        Cast a new skill automatically.
+        Choose a skill and cast it automatically. Called by the combat's tick.
+
+        Args:
+            combat: (object) the character's combat.
+
+        Returns:
+            (dict) the skill's cast result, or None if no skill is cast.
         """
         if not self.is_alive:
             return
 
-        if not self.is_in_combat():
-            # combat is finished, stop ticker
-            self.stop_auto_combat_skill()
-            return
-
         # Choose a skill and the skill's target.
         result = await self.ai_choose_skill.choose(self)
         if result:
             skill, target = result
-            await self.cast_combat_skill(skill, target)
+            return await combat.do_cast_skill(skill, self, target)
 
     def is_auto_cast_skill(self):
         """
         If the character is casting skills automatically.
         """
-        scheduler = self.get_scheduler()
-        return scheduler.get_job(self.skill_scheduler_id) is not None
+        return self.auto_cast_combat is not None
                 
-    def start_auto_combat_skill(self):
+    def start_auto_combat_skill(self, combat):
         """
-        Start auto cast skill.
-        """
-        # Cast a skill immediately
-        # self.auto_cast_skill()
+        Start auto cast skill. Skills are cast in the combat's ticks.
 
-        # Set timer of auto cast.
-        scheduler = self.get_scheduler()
-        if scheduler.get_job(self.skill_scheduler_id):
-            # auto cast job already exists
+        Args:
+            combat: (object) the character's combat.
+        """
+        if self.auto_cast_combat:
+            # already casting skills automatically
             return
 
-        scheduler.add_job(self.auto_cast_skill, "interval", seconds=self.auto_cast_skill_cd, id=self.skill_scheduler_id)
+        self.auto_cast_combat = combat
+        combat.add_auto_caster(self)
 
     def stop_auto_combat_skill(self):
         """
         Stop auto cast skill.
         """
-        scheduler = self.get_scheduler()
-        if not scheduler.get_job(self.skill_scheduler_id):
-            # auto cast job already removed
+        if not self.auto_cast_combat:
+            # auto cast already stopped
             return
 
-        scheduler.remove_job(self.skill_scheduler_id)
+        self.auto_cast_combat.remove_auto_caster(self)
+        self.auto_cast_combat = None
+
+    def unload(self):
+        """
+        Called when the character is removed from the world. Stop its timers.
+        """
+        self.stop_auto_combat_skill()
+
+        if self.reborn_job:
+            self.reborn_job.cancel()
+            self.reborn_job = None
 
 
     ########################################
@@ -658,14 +668,16 @@ class MudderyCharacter(ELEMENT("MATTER")):
 
         if not self.is_temp and self.reborn_time > 0:
             # Set reborn timer.
-            reborn_time = datetime.utcfromtimestamp(time.time() + self.reborn_time)
-            scheduler = self.get_scheduler()
-            scheduler.add_job(self.reborn, "date", run_date=reborn_time, id=self.reborn_scheduler_id)
+            if self.reborn_job:
+                self.reborn_job.cancel()
+            self.reborn_job = TimerHandler.inst().call_later(self.reborn_time, self.reborn)
 
     async def reborn(self):
         """
         Reborn after being killed.
         """
+        self.reborn_job = None
+
         # Recover properties.
         await self.recover()
         self.is_alive = True
@@ -674,7 +686,7 @@ class MudderyCharacter(ELEMENT("MATTER")):
         location_key = self.const.location
         if location_key:
             try:
-                home = Server.world.get_room(location_key)
+                home = await Server.world.get_room(location_key)
                 await self.move_to(home)
             except KeyError:
                 pass
@@ -731,22 +743,37 @@ class MudderyCharacter(ELEMENT("MATTER")):
         """
         pass
 
-    async def validate_property(self, key, value):
+    @staticmethod
+    def get_limit_keys(keys):
+        """
+        Get keys of properties' limits.
+
+        Args:
+            keys: (list) properties' keys.
+        """
+        return ["max_" + key for key in keys] + ["min_" + key for key in keys]
+
+    async def validate_property(self, key, value, states=None):
         """
         Check a property's value limit, return a validated value.
 
         Args:
             key: (string) values's key.
             value: (number) the value
+            states: (dict) states loaded by states.load_many() which contain the property's limits.
+                If it is not set, limits are loaded from the storage.
 
         Return:
             (number) validated values.
         """
+        if states is None:
+            states = await self.states.load_many(self.get_limit_keys([key]))
+
         # check limits
         max_value = None
         max_key = "max_" + key
-        if await self.states.has(max_key):
-            max_value = await self.states.load(max_key)
+        if max_key in states:
+            max_value = states[max_key]
         elif self.const_data_handler.has(max_key):
             max_value = self.const_data_handler.get(max_key)
 
@@ -756,8 +783,8 @@ class MudderyCharacter(ELEMENT("MATTER")):
 
         min_value = 0
         min_key = "min_" + key
-        if await self.states.has(min_key):
-            min_value = await self.states.load(min_key)
+        if min_key in states:
+            min_value = states[min_key]
         elif self.const_data_handler.has(min_key):
             min_value = self.const_data_handler.get(min_key)
 
@@ -774,9 +801,10 @@ class MudderyCharacter(ELEMENT("MATTER")):
         """
         change = 0
 
-        if await self.states.has(key):
-            current_value = await self.states.load(key)
-            new_value = await self.validate_property(key, current_value + increment)
+        states = await self.states.load_many([key] + self.get_limit_keys([key]))
+        if key in states:
+            current_value = states[key]
+            new_value = await self.validate_property(key, current_value + increment, states)
             if new_value != current_value:
                 change = new_value - current_value
                 await self.states.save(key, new_value)
@@ -793,12 +821,15 @@ class MudderyCharacter(ELEMENT("MATTER")):
         changes = {}
         state_values = {}
 
+        keys = list(increments.keys())
+        states = await self.states.load_many(keys + self.get_limit_keys(keys))
+
         for key, increment in increments.items():
             changes[key] = 0
 
-            if await self.states.has(key):
-                current_value = await self.states.load(key)
-                new_value = await self.validate_property(key, current_value + increment)
+            if key in states:
+                current_value = states[key]
+                new_value = await self.validate_property(key, current_value + increment, states)
                 if new_value != current_value:
                     changes[key] = new_value - current_value
                     state_values[key] = new_value
@@ -843,7 +874,8 @@ class MudderyCharacter(ELEMENT("MATTER")):
 
         # Get validated values
         if new_values:
-            validated_values = await async_gather([self.validate_property(key, value) for key, value in new_values.items()])
+            states = await self.states.load_many(self.get_limit_keys(new_values.keys()))
+            validated_values = [await self.validate_property(key, value, states) for key, value in new_values.items()]
             for index, key in enumerate(new_values):
                 new_value = validated_values[index]
                 changes[key] = new_value
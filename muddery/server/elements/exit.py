@@ -56,11 +56,13 @@ class MudderyExit(ELEMENT("MATTER")):
         if not await self.can_traverse(character):
             return {"traversed": False}
 
-        if not self.destination_obj:
-            self.destination_obj = weakref.ref(Server.world.get_room(self.const.destination))
+        destination = self.destination_obj() if self.destination_obj else None
+        if not destination:
+            destination = await Server.world.get_room(self.const.destination)
+            self.destination_obj = weakref.ref(destination)
 
         try:
-            results = await character.move_to(self.destination_obj())
+            results = await character.move_to(destination)
         except Exception as e:
             logger.log_trace("%s cannot set location: (%s)%s." % (character.get_id(), type(e).__name__, e))
             raise MudderyError(ERR.unknown, _("You can not go there."))
@@ -87,9 +89,7 @@ class MudderyExit(ELEMENT("MATTER")):
             return self.name
 
         if self.const.destination:
-            if not self.destination_obj:
-                self.destination_obj = weakref.ref(Server.world.get_room(self.const.destination))
-            name = self.destination_obj().get_name()
+            name = Server.world.get_room_name(self.const.destination)
         else:
             name = _("Exit")
 
@@ -202,7 +202,7 @@ class MudderyPlayerCharacter(ELEMENT("CHARACTER")):
         Returns:
             None
         """
-        with CharacterInfo.inst().transaction():
+        async with CharacterInfo.inst().transaction():
             new_level = await self.get_level() + 1
             await self.set_level(new_level)
 
@@ -394,6 +394,15 @@ class MudderyPlayerCharacter(ELEMENT("CHARACTER")):
         # relay to account
         self.account.msg(data)
 
+    def get_session(self):
+        """
+        Get the session of the character's player.
+        """
+        if not self.account:
+            return None
+
+        return self.account.get_session()
+
     async def get_level(self):
         """
         Get the character's level.
@@ -995,7 +1004,7 @@ class MudderyPlayerCharacter(ELEMENT("CHARACTER")):
         :param receive_list:
         :return:
         """
-        with self.states.transaction():
+        async with self.states.transaction():
             remove = await self.remove_objects_by_list(remove_list)
             receive = await self.receive_objects(receive_list)
 
@@ -1097,10 +1106,11 @@ class MudderyPlayerCharacter(ELEMENT("CHARACTER")):
         })
 
         records = CharacterStatesDict.all()
+        values = await self.states.load_many([record.key for record in records], None)
         state.update({
             record.key: {
                 "name": record.name,
-                "value": await self.states.load(record.key)
+                "value": values[record.key]
             } for record in records
         })
 
@@ -1190,7 +1200,7 @@ class MudderyPlayerCharacter(ELEMENT("CHARACTER")):
             item["obj"] = new_obj
 
         obj_num = item["number"]
-        with self.states.transaction():
+        async with self.states.transaction():
             # add to body
             await CharacterEquipments.inst().add(self.get_db_id(), body_position, item["object_key"], item["level"])
 
@@ -1237,7 +1247,7 @@ class MudderyPlayerCharacter(ELEMENT("CHARACTER")):
             new_position = 1
 
         # save to db first
-        with self.states.transaction():
+        async with self.states.transaction():
             await CharacterInventory.inst().add(self.get_db_id(), new_position, item["object_key"], 1, item["level"])
             await CharacterEquipments.inst().remove_equipment(self.get_db_id(), body_position)
 
@@ -1635,7 +1645,7 @@ class MudderyPlayerCharacter(ELEMENT("CHARACTER")):
         default_home_key = GameSettings.inst().get("default_player_home_key")
         if default_home_key:
             try:
-                home = Server.world.get_room(default_home_key)
+                home = await Server.world.get_room(default_home_key)
             except KeyError:
                 pass
 
@@ -6,10 +6,10 @@ Rooms are simple containers that has no location of their own.
 """
 
 import time
-import pytz
-import asyncio
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
+import heapq
+from muddery.common.utils.utils import async_wait
 from muddery.server.utils.loot_handler import LootHandler
+from muddery.server.utils.timer_handler import TimerHandler
 from muddery.server.database.worlddata.loot_list import RoomProfitList
 from muddery.server.statements.statement_handler import STATEMENT_HANDLER
 from muddery.server.mappings.element_set import ELEMENT
@@ -30,8 +30,18 @@ class MudderyProfitRoom(ELEMENT("ROOM")):
         """
         super(MudderyProfitRoom, self).__init__()
 
-        self.scheduler = AsyncIOScheduler(timezone=pytz.utc)
-        self.last_trigger_time = {}
+        # Characters who can get profits and their next profit time.
+        # {character's id: next profit time}
+        self.next_profit_time = {}
+
+        # A min-heap of characters' next profit time. Items that does not match next_profit_time are invalid.
+        # [(next profit time, character's id)]
+        self.profit_queue = []
+
+        # The timer job of the earliest profit. There is no job if no one can get profits.
+        self.profit_job = None
+        self.profit_job_time = None
+
         self.loot_handler = None
 
     async def at_element_setup(self, first_time):
@@ -43,11 +53,6 @@ class MudderyProfitRoom(ELEMENT("ROOM")):
         # initialize loot handler
         self.loot_handler = LootHandler(RoomProfitList.get(self.get_element_key()))
 
-        # add the auto profit job
-        if self.scheduler.get_job(self.get_element_key()) is None:
-            self.scheduler.add_job(self.put_profits, "interval", seconds=1, id=self.get_element_key())
-            self.scheduler.start()
-
     async def at_character_arrive(self, character):
         """
         Called after an object has been moved into this object.
@@ -60,7 +65,8 @@ class MudderyProfitRoom(ELEMENT("ROOM")):
 
         if character.is_player():
             if await STATEMENT_HANDLER.match_condition(self.const.condition, character, None):
-                self.last_trigger_time[character.get_id()] = time.time()
+                self.add_profit_time(character.get_id(), time.time() + self.get_profit_interval())
+                self.schedule_profits()
 
                 if self.const.begin_message:
                     if not results:
@@ -83,8 +89,9 @@ class MudderyProfitRoom(ELEMENT("ROOM")):
         results = await super(MudderyProfitRoom, self).at_character_leave(character)
 
         char_id = character.get_id()
-        if char_id in self.last_trigger_time:
-            del self.last_trigger_time[char_id]
+        if char_id in self.next_profit_time:
+            del self.next_profit_time[char_id]
+            self.schedule_profits()
 
             if self.const.end_message:
                 if not results:
@@ -97,39 +104,137 @@ class MudderyProfitRoom(ELEMENT("ROOM")):
 
         return results
 
+    async def at_character_restore(self, character):
+        """
+        Called when a character is put back to this room after the room has been set up again.
+
+        Args:
+        character (Object): The character put back to this room
+
+        """
+        await super(MudderyProfitRoom, self).at_character_restore(character)
+
+        if not character.is_player():
+            return
+
+        char_id = character.get_id()
+        if await STATEMENT_HANDLER.match_condition(self.const.condition, character, None):
+            if char_id not in self.next_profit_time:
+                self.add_profit_time(char_id, time.time() + self.get_profit_interval())
+        else:
+            self.next_profit_time.pop(char_id, None)
+        self.schedule_profits()
+
+    def unload(self):
+        """
+        Called when the room is removed from the world.
+        """
+        super(MudderyProfitRoom, self).unload()
+
+        if self.profit_job:
+            self.profit_job.cancel()
+            self.profit_job = None
+            self.profit_job_time = None
+
+    def get_profit_interval(self):
+        """
+        Get the interval of profits in seconds. It is at least 1 second, so profits will not be
+        put again and again at the same time.
+        """
+        return max(self.const.interval or 0, 1)
+
+    def add_profit_time(self, char_id, profit_time):
+        """
+        Set a character's next profit time.
+        """
+        self.next_profit_time[char_id] = profit_time
+        heapq.heappush(self.profit_queue, (profit_time, char_id))
+
+    def schedule_profits(self):
+        """
+        Set the timer job to the earliest profit time. Remove the job if no one can get profits.
+        """
+        # Remove invalid items.
+        while self.profit_queue and self.next_profit_time.get(self.profit_queue[0][1]) != self.profit_queue[0][0]:
+            heapq.heappop(self.profit_queue)
+
+        if not self.profit_queue:
+            if self.profit_job:
+                self.profit_job.cancel()
+                self.profit_job = None
+                self.profit_job_time = None
+            return
+
+        profit_time = self.profit_queue[0][0]
+        if self.profit_job:
+            if self.profit_job_time == profit_time:
+                return
+            self.profit_job.cancel()
+
+        self.profit_job = TimerHandler.inst().call_later(max(profit_time - time.time(), 0), self.put_profits)
+        self.profit_job_time = profit_time
+
     async def put_profits(self):
         """
-        Set profits to all characters in this room.
+        Set profits to all characters whose profit time is due.
 
         :return:
         """
+        self.profit_job = None
+        self.profit_job_time = None
+
         current_time = time.time()
-        for char_id, last_time in self.last_trigger_time.items():
-            if current_time - last_time >= self.const.interval:
-                char = self.all_characters[char_id]
-                obj_list = await self.loot_handler.get_obj_list(char)
-                self.last_trigger_time[char_id] = current_time
-
-                if not obj_list:
-                    continue
-
-                get_objects = await char.receive_objects(obj_list)
-                if not get_objects:
-                    continue
-
-                msg_templates = {item["object_key"]: item["message"] for item in obj_list}
-                message = ""
-                for item in get_objects["objects"]:
-                    if message:
-                        message += ", "
-
-                    template = msg_templates[item["key"]]
-                    if template:
-                        try:
-                            message += template % item["number"]
-                        except Exception as e:
-                            message += template
-                    else:
-                        message += _("Get") + " " + item["name"] + " " + str(item["number"])
-
-                char.msg({"msg": message})
+        characters = []
+        while self.profit_queue and self.profit_queue[0][0] <= current_time:
+            profit_time, char_id = heapq.heappop(self.profit_queue)
+            if self.next_profit_time.get(char_id) != profit_time:
+                # invalid item
+                continue
+
+            try:
+                characters.append(self.all_characters[char_id])
+            except KeyError:
+                del self.next_profit_time[char_id]
+                continue
+
+            interval = self.get_profit_interval()
+            next_time = profit_time + interval
+            if next_time <= current_time:
+                next_time = current_time + interval
+            self.add_profit_time(char_id, next_time)
+
+        self.schedule_profits()
+
+        if characters:
+            await async_wait([self.put_character_profits(char) for char in characters])
+
+    async def put_character_profits(self, char):
+        """
+        Set profits to a character.
+
+        :return:
+        """
+        obj_list = await self.loot_handler.get_obj_list(char)
+        if not obj_list:
+            return
+
+        get_objects = await char.receive_objects(obj_list)
+        if not get_objects:
+            return
+
+        msg_templates = {item["object_key"]: item["message"] for item in obj_list}
+        message = ""
+        for item in get_objects["objects"]:
+            if message:
+                message += ", "
+
+            template = msg_templates[item["key"]]
+            if template:
+                try:
+                    message += template % item["number"]
+                except Exception as e:
+                    message += template
+            else:
+                message += _("Get") + " " + item["name"] + " " + str(item["number"])
+
+        char.msg({"msg": message})
@@ -17,6 +17,7 @@ from muddery.common.utils.defines import ConversationType, EventType
 from muddery.server.utils.localized_strings_handler import _
 from muddery.server.database.worlddata.worlddata import WorldData
 from muddery.common.utils.utils import async_wait
+from muddery.server.service.session import Session
 
 
 class MudderyRoom(ELEMENT("MATTER")):
@@ -192,6 +193,13 @@ class MudderyRoom(ELEMENT("MATTER")):
         if self.all_objects:
             await async_wait([obj["obj"].setup_element(key) for key, obj in self.all_objects.items()])
 
+    def unload(self):
+        """
+        Called when the room is removed from the world.
+        """
+        for character in self.all_characters.values():
+            character.unload()
+
     def get_character(self, char_id):
         """
         Get a character in the room.
@@ -254,8 +262,8 @@ class MudderyRoom(ELEMENT("MATTER")):
         else:
             chars = self.all_characters.values()
 
-        if chars:
-            [char.msg(msg) for char in chars]
+        sessions = [session for session in (char.get_session() for char in chars) if session]
+        Session.broadcast(sessions, msg)
 
     async def at_character_arrive(self, character):
         """
@@ -280,6 +288,18 @@ class MudderyRoom(ELEMENT("MATTER")):
                 }
                 self.msg_characters({"obj_moved_in": change}, {character.get_id()})
 
+    async def at_character_restore(self, character):
+        """
+        Called when a character is put back to this room after the room has been set up again.
+        The character does not move, so no arrive events or messages.
+
+        Args:
+        character (Object): The character put back to this room
+
+        """
+        self.all_characters[character.get_id()] = character
+        character.set_location(self)
+
     async def at_character_leave(self, character):
         """
         Called when a character leave this room.
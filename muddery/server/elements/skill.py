@@ -99,13 +99,18 @@ class MudderySkill(ELEMENT("MATTER")):
 
         if caller:
             skill_cast["caller"] = caller.get_id()
+
+        if target:
+            skill_cast["target"] = target.get_id()
+
+        # In combats, changed states are sent by the combat.
+        if caller and not caller.is_in_combat():
             skill_cast["states"] = {
                 caller.get_id(): await caller.get_combat_state(),
             }
 
-        if target:
-            skill_cast["target"] = target.get_id()
-            skill_cast["states"][target.get_id()] = await target.get_combat_state()
+            if target:
+                skill_cast["states"][target.get_id()] = await target.get_combat_state()
 
         if results:
             skill_cast["result"] = " ".join(results)
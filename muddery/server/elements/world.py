@@ -2,16 +2,27 @@
 The World is the base controller of a server. It managers all areas, maps and characters on this server.
 """
 
+import ast
+import time
+import asyncio
 from muddery.server.settings import SETTINGS
+from muddery.server.utils.logger import logger
+from muddery.server.utils.timer_handler import TimerHandler
 from muddery.server.elements.base_element import BaseElement
 from muddery.server.mappings.element_set import ELEMENT
 from muddery.server.database.gamedata.honours_mapper import HonoursMapper
 from muddery.server.database.worlddata.world_areas import WorldAreas
 from muddery.server.database.worlddata.world_channels import WorldChannels
+from muddery.server.database.worlddata.world_rooms import WorldRooms
+from muddery.server.database.worlddata.world_exits import WorldExits
+from muddery.server.database.worlddata.world_objects import WorldObjects
+from muddery.server.database.worlddata.image_resource import ImageResource
 from muddery.server.database.worlddata.worlddata import WorldData
+from muddery.server.database.storage.lru_memory_kv_storage import LRUMemoryKVStorage
 from muddery.common.utils.defines import ConversationType
 from muddery.common.utils.utils import class_from_path
 from muddery.common.utils.utils import async_wait
+from muddery.server.service.session import Session
 
 
 class MudderyWorld(BaseElement):
@@ -32,6 +43,23 @@ class MudderyWorld(BaseElement):
         # all_areas: {area's key: area's object}
         self.all_areas = {}
 
+        # Areas are created when they are used.
+        self.lazy_areas = SETTINGS.WORLD_LAZY_AREAS
+
+        # Keys of all areas.
+        self.area_keys = set()
+
+        # Areas which are being created.
+        # loading_areas: {area's key: loading task}
+        self.loading_areas = {}
+
+        # Last used time of created areas.
+        # area_access: {area's key: time}
+        self.area_access = {}
+
+        # The job to remove unused areas.
+        self.unload_job = None
+
         # All rooms in this world.
         # room_dict: {room's key: area's key}
         self.room_dict = {}
@@ -82,6 +110,10 @@ class MudderyWorld(BaseElement):
         """
         Load all areas.
         """
+        if self.lazy_areas:
+            self.load_areas_lazily()
+            return
+
         records = WorldAreas.all()
         base_model = ELEMENT("AREA").get_base_model()
         self.all_areas = {}
@@ -104,29 +136,336 @@ class MudderyWorld(BaseElement):
             room_key: area_key for area_key, area in self.all_areas.items() for room_key in area.get_rooms_key()
         }
 
+    def load_areas_lazily(self):
+        """
+        Only load areas' keys and rooms' keys. Areas will be created when they are used.
+        """
+        self.all_areas = {}
+        self.loading_areas = {}
+        self.area_access = {}
+
+        self.area_keys = set(record.key for record in WorldAreas.all())
+        self.room_dict = {
+            record.key: record.area for record in WorldRooms.all() if record.area in self.area_keys
+        }
+
+        if self.unload_job:
+            self.unload_job.cancel()
+            self.unload_job = None
+
+        if SETTINGS.WORLD_AREA_IDLE_TIME > 0:
+            self.unload_job = TimerHandler.inst().call_interval(SETTINGS.WORLD_AREA_IDLE_TIME, self.unload_idle_areas)
+
+    async def create_area(self, area_key):
+        """
+        Create an area and its rooms.
+        """
+        base_model = ELEMENT("AREA").get_base_model()
+        table_data = WorldData.get_table_data(base_model, key=area_key)
+        table_data = table_data[0]
+
+        new_area = ELEMENT(table_data.element_type)()
+        await new_area.setup_element(area_key)
+
+        self.all_areas[area_key] = new_area
+        return new_area
+
+    def unload_idle_areas(self):
+        """
+        Remove areas which have no player characters and have not been used for WORLD_AREA_IDLE_TIME seconds.
+        """
+        # Areas where are player characters.
+        used_areas = set()
+        for character in self.all_characters.values():
+            location = character.get_location()
+            if location:
+                used_areas.add(self.room_dict.get(location.get_element_key()))
+
+        deadline = time.monotonic() - SETTINGS.WORLD_AREA_IDLE_TIME
+        for area_key in list(self.all_areas.keys()):
+            if area_key in used_areas or self.area_access.get(area_key, 0) > deadline:
+                continue
+
+            area = self.all_areas.pop(area_key)
+            self.area_access.pop(area_key, None)
+            try:
+                area.unload()
+            except Exception as e:
+                logger.log_trace("Unload area %s error: %s" % (area_key, e))
+
+    async def reload(self, changed_values):
+        """
+        Set up areas and rooms again after worlddata changes. Only affected areas and rooms are
+        set up again, player characters stay in their rooms.
+
+        Args:
+            changed_values: (set) values of changed worlddata records. Areas, rooms, exits,
+                objects and NPCs whose keys are in it are affected. A moved exit, object or NPC
+                affects both rooms, because both rooms' keys are in its old and new records.
+        """
+        area_keys = set(record.key for record in WorldAreas.all())
+        room_dict = {record.key: record.area for record in WorldRooms.all() if record.area in area_keys}
+
+        # Areas whose data or rooms have been changed are created again.
+        rebuild_areas = set()
+        area_rooms = {}
+        for room_key, area_key in room_dict.items():
+            area_rooms.setdefault(area_key, set()).add(room_key)
+
+        room_model = ELEMENT("ROOM").get_base_model()
+        for area_key, area in self.all_areas.items():
+            if area_key not in area_keys or area_key in changed_values or \
+                    set(area.get_rooms_key()) != area_rooms.get(area_key, set()):
+                rebuild_areas.add(area_key)
+                continue
+
+            for room_key, room in area.all_rooms.items():
+                if room_key in changed_values:
+                    record = WorldData.get_table_data(room_model, key=room_key)[0]
+                    if ELEMENT(record.element_type) is not type(room):
+                        # The room's type has been changed.
+                        rebuild_areas.add(area_key)
+                        break
+
+        self.area_keys = area_keys
+        self.room_dict = room_dict
+
+        # Player characters in rebuilt areas, {room's key: (old room, player characters)}
+        moving_players = {}
+        for area_key in rebuild_areas:
+            moving_players.update(await self.rebuild_area(area_key))
+
+        if not self.lazy_areas:
+            # Create new areas.
+            for area_key in area_keys:
+                if area_key not in self.all_areas:
+                    await self.create_area(area_key)
+
+        # Put player characters to new rooms.
+        for room_key, (old_room, players) in moving_players.items():
+            if room_key in self.room_dict:
+                await self.put_players(await self.get_room(room_key), players)
+            else:
+                logger.log_warn("Room %s has been removed, %s characters stay in it." % (room_key, len(players)))
+                await self.put_players(old_room, players)
+
+        for area_key, area in self.all_areas.items():
+            if area_key in rebuild_areas:
+                continue
+
+            for room in area.all_rooms.values():
+                if self.is_room_changed(room, changed_values):
+                    await self.reload_room(room)
+
+        self.load_map()
+
+    def is_room_changed(self, room, changed_values):
+        """
+        Check if a room or its contents have been changed.
+        """
+        if room.get_element_key() in changed_values:
+            return True
+
+        if any(key in changed_values for key in room.all_exits):
+            return True
+
+        if any(key in changed_values for key in room.all_objects):
+            return True
+
+        return any(
+            character.get_element_key() in changed_values
+            for character in room.all_characters.values() if not character.is_player()
+        )
+
+    def take_players(self, room):
+        """
+        Remove player characters from a room.
+
+        Return:
+            (list) player characters
+        """
+        players = [character for character in room.all_characters.values() if character.is_player()]
+        for character in players:
+            del room.all_characters[character.get_id()]
+        return players
+
+    async def put_players(self, room, players):
+        """
+        Put player characters to a room and show them the room again.
+        """
+        for character in players:
+            await room.at_character_restore(character)
+            character.msg({"look_around": character.look_around()})
+
+    async def reload_room(self, room):
+        """
+        Set up a room again, player characters stay in it.
+        """
+        players = self.take_players(room)
+        room.unload()
+
+        try:
+            await room.setup_element(room.get_element_key())
+        finally:
+            await self.put_players(room, players)
+
+    async def rebuild_area(self, area_key):
+        """
+        Remove an area and create it again if it still exists. Lazy areas are created again when
+        they are used. Player characters are taken out of its rooms.
+
+        Return:
+            (dict) {room's key: (old room, player characters)}
+        """
+        old_area = self.all_areas.pop(area_key)
+        players = {}
+        for room_key, room in old_area.all_rooms.items():
+            characters = self.take_players(room)
+            if characters:
+                players[room_key] = (room, characters)
+        old_area.unload()
+
+        if self.lazy_areas:
+            self.area_access.pop(area_key, None)
+        elif area_key in self.area_keys:
+            await self.create_area(area_key)
+
+        return players
+
     def load_map(self):
         """
         Load the world's map data.
         """
-        self.map_data = {key: item.load_map() for key, item in self.all_areas.items()}
+        if self.lazy_areas:
+            self.map_data = self.load_map_from_data()
+        else:
+            self.map_data = {key: item.load_map() for key, item in self.all_areas.items()}
         return self.map_data
 
-    def get_area(self, area_key):
-        """
-        Get a room by its key.
+    def load_map_from_data(self):
+        """
+        Load the world's map data from worlddata without creating areas.
+        """
+        area_model = ELEMENT("AREA").get_base_model()
+        room_model = ELEMENT("ROOM").get_base_model()
+        exit_model = ELEMENT("EXIT").get_base_model()
+        object_models = ELEMENT("WORLD_OBJECT").get_models()
+
+        def get_appearance(record):
+            return {
+                "key": record.key,
+                "name": record.name,
+                "desc": record.desc,
+                "icon": record.icon,
+            }
+
+        map_data = {}
+        for area_record in WorldAreas.all():
+            area_data = get_appearance(WorldData.get_table_data(area_model, key=area_record.key)[0])
+            area_data["background"] = self.get_background(area_data["key"], area_record.background)
+            area_data["rooms"] = {}
+            map_data[area_record.key] = area_data
+
+        for room_record in WorldData.get_table_all(room_model):
+            if room_record.area not in map_data:
+                continue
+
+            room_data = get_appearance(room_record)
+            room_data["peaceful"] = room_record.peaceful
+            room_data["background"] = self.get_background(room_record.key, room_record.background)
+
+            if room_record.position:
+                try:
+                    room_data["pos"] = ast.literal_eval(room_record.position)
+                except Exception as e:
+                    logger.log_trace("load position error: %s" % e)
+
+            room_data["objects"] = [
+                get_appearance(WorldData.get_tables_data(object_models, record.key)[0])
+                for record in WorldObjects.get_location(room_record.key)
+            ]
+
+            room_data["exits"] = []
+            for record in WorldExits.get_location(room_record.key):
+                exit_data = get_appearance(WorldData.get_table_data(exit_model, key=record.key)[0])
+                exit_data["destination"] = record.destination
+                if not exit_data["name"]:
+                    exit_data["name"] = self.get_room_name(record.destination)
+                room_data["exits"].append(exit_data)
+
+            map_data[room_record.area]["rooms"][room_record.key] = room_data
+
+        return map_data
+
+    def get_background(self, key, resource):
+        """
+        Get the background image's information.
+        """
+        if not resource:
+            return None
+
+        try:
+            resource_info = ImageResource.get(resource)
+            resource_info = resource_info[0]
+            return {"resource": resource_info.resource,
+                    "width": resource_info.image_width,
+                    "height": resource_info.image_height}
+        except Exception as e:
+            logger.log_trace("Load background %s error: %s" % (resource, e))
+            return None
+
+    async def get_area(self, area_key):
+        """
+        Get an area by its key. Create it if it has not been created.
         :param area_key:
         :return:
         """
-        return self.all_areas[area_key]
+        if area_key in self.all_areas:
+            if self.lazy_areas:
+                self.area_access[area_key] = time.monotonic()
+            return self.all_areas[area_key]
+
+        if not self.lazy_areas or area_key not in self.area_keys:
+            raise KeyError(area_key)
+
+        # Only create the area once, other callers wait for it.
+        task = self.loading_areas.get(area_key)
+        if not task:
+            task = asyncio.ensure_future(self.create_area(area_key))
+            self.loading_areas[area_key] = task
+
+            def done(task):
+                if self.loading_areas.get(area_key) is task:
+                    del self.loading_areas[area_key]
+            task.add_done_callback(done)
+
+        area = await asyncio.shield(task)
+        self.area_access[area_key] = time.monotonic()
+        return area
 
-    def get_room(self, room_key):
+    async def get_room(self, room_key):
         """
         Get a room by its key.
         :param room_key:
         :return:
         """
         area_key = self.room_dict[room_key]
-        return self.all_areas[area_key].get_room(room_key)
+        area = await self.get_area(area_key)
+        return area.get_room(room_key)
+
+    def get_room_name(self, room_key):
+        """
+        Get a room's name without creating it.
+        :param room_key:
+        :return:
+        """
+        area_key = self.room_dict.get(room_key)
+        if area_key in self.all_areas:
+            return self.all_areas[area_key].get_room(room_key).get_name()
+
+        records = WorldData.get_table_data(ELEMENT("ROOM").get_base_model(), key=room_key)
+        if records:
+            return records[0].name
 
     def get_area_key_by_room(self, room_key):
         """
@@ -136,14 +475,14 @@ class MudderyWorld(BaseElement):
         """
         return self.room_dict.get(room_key)
 
-    def get_area_by_room(self, room_key):
+    async def get_area_by_room(self, room_key):
         """
         Get the room's area.
         :param room_key:
         :return:
         """
         area_key = self.room_dict[room_key]
-        return self.all_areas[area_key]
+        return await self.get_area(area_key)
 
     def get_map_data(self):
         """
@@ -161,6 +500,9 @@ class MudderyWorld(BaseElement):
         char_db_id = character.get_db_id()
         self.all_characters[char_db_id] = character
 
+        # Keep the character's data in caches.
+        LRUMemoryKVStorage.pin(char_db_id)
+
         for channel in self.all_channels.values():
             channel.add_character(char_db_id)
 
@@ -174,6 +516,8 @@ class MudderyWorld(BaseElement):
         char_db_id = character.get_db_id()
         del self.all_characters[char_db_id]
 
+        LRUMemoryKVStorage.unpin(char_db_id)
+
         for channel in self.all_channels.values():
             channel.remove_character(char_db_id)
 
@@ -206,7 +550,7 @@ class MudderyWorld(BaseElement):
             channel = self.get_channel(target)
             channel.get_message(caller, message)
         elif target_type == ConversationType.LOCAL.value:
-            room = self.get_room(target)
+            room = await self.get_room(target)
             room.get_message(caller, message)
         elif target_type == ConversationType.PRIVATE.value:
             character = self.get_character(int(target))
@@ -215,6 +559,8 @@ class MudderyWorld(BaseElement):
     def broadcast(self, message):
         """
         Broadcast a message to all clients.
+
+        :param message: (dict) data to send
         """
-        # TODO
-        pass
+        sessions = [session for session in (char.get_session() for char in self.all_characters.values()) if session]
+        Session.broadcast(sessions, message)
@@ -2,11 +2,13 @@
 
 import traceback
 import os
+import hmac
 import signal
 import logging
 from sanic import Sanic
 from asyncio import CancelledError
 from muddery.common.utils.utils import write_pid_file, read_pid_file
+from muddery.common.utils.exception import ERR
 from muddery.common.networks import responses
 from muddery.server.networks.sanic_session import SanicSession
 from muddery.server.settings import SETTINGS
@@ -35,6 +37,11 @@ def run(port):
         print("\nGame server server started.\n")
         logger.log_critical("Game server server started.")
 
+    @app.before_server_stop
+    async def before_server_stop(app, loop):
+        # save data
+        await Server.inst().shutdown()
+
     @app.after_server_stop
     async def after_server_stop(app, loop):
         # server stopped
@@ -50,6 +57,21 @@ def run(port):
     async def get_status(request):
         return responses.success_response()
 
+    # reload changed worlddata, only for requests with the game server's secret
+    @app.post("/reload_world")
+    async def reload_world(request):
+        secret = request.headers.get("X-Muddery-Secret", "")
+        if not SETTINGS.GAME_SERVER_SECRET or not hmac.compare_digest(secret.encode(), SETTINGS.GAME_SERVER_SECRET.encode()):
+            return responses.error_response(ERR.no_authentication, msg="Can not reload the world.", status=403)
+
+        try:
+            tables = await Server.inst().reload_world()
+        except Exception as e:
+            logger.log_trace("Reload the world error: %s" % e)
+            return responses.error_response(ERR.build_world_error, msg=str(e), status=500)
+
+        return responses.success_response({"tables": tables})
+
     # set websocket interface
     @app.websocket("/")
     async def handler(request, ws):
@@ -1,5 +1,4 @@
 
-import json, traceback
 from muddery.server.service.session import Session
 
 
@@ -25,13 +24,16 @@ class SanicSession(Session):
         self.connection = connection
         self.address = "%s:%s" % (request.ip, request.port)
 
-    async def send_out(self, data: dict or list) -> None:
+    async def send_text(self, text: str) -> None:
         """
-        Send out message.
+        Send out an encoded message.
 
-        :param data: data to send
+        :param text: encoded data
         """
-        out_text = json.dumps(data, ensure_ascii=False)
+        await self.connection.send(text)
 
-        # send message
-        await self.connection.send(out_text)
+    async def close(self) -> None:
+        """
+        Close the connection.
+        """
+        await self.connection.close()
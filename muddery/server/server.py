@@ -1,9 +1,11 @@
 
+import asyncio
 import traceback
 from muddery.server.settings import SETTINGS
 from muddery.common.utils.singleton import Singleton
 from muddery.server.database.gamedata_db import GameDataDB
 from muddery.server.database.worlddata_db import WorldDataDB
+from muddery.server.database.worlddata.worlddata import WorldData
 from muddery.common.utils.utils import classes_in_path
 from muddery.server.database.gamedata.base_data import BaseData
 
@@ -23,6 +25,7 @@ class Server(Singleton):
         self.configs = {}
         self._world = None
         self.db_connected = False
+        self.reload_lock = asyncio.Lock()
 
     async def init(self):
         await self.connect_db()
@@ -31,6 +34,13 @@ class Server(Singleton):
         # load commands
         from muddery.server.commands import combat, general, player, unloggedin
 
+    async def shutdown(self):
+        """
+        Save data before the server stops.
+        """
+        from muddery.server.database.storage.write_behind_storage import WriteBehindStorage
+        await WriteBehindStorage.flush_all()
+
     async def connect_db(self):
         """
         Create the db connection.
@@ -45,6 +55,9 @@ class Server(Singleton):
             traceback.print_exc()
             raise
 
+        # load worlddata
+        WorldData.init()
+
         # load classes
         for cls in classes_in_path(SETTINGS.PATH_GAMEDATA_DAO, BaseData):
             await cls.inst().init()
@@ -68,6 +81,46 @@ class Server(Singleton):
             traceback.print_exc()
             raise
 
+    async def reload_world(self):
+        """
+        Reload changed worlddata and set up affected parts of the world again, without
+        disconnecting players.
+
+        Return:
+            (list) names of changed tables.
+        """
+        async with self.reload_lock:
+            # Read the database in another thread, so players' commands are not blocked.
+            loop = asyncio.get_running_loop()
+            changed = await loop.run_in_executor(None, WorldData.load_changed)
+            changes = WorldData.apply_changed(changed)
+            if not changes:
+                return []
+
+            from muddery.server.utils.game_settings import GameSettings
+            from muddery.server.utils.localized_strings_handler import LocalizedStringsHandler
+            from muddery.server.utils.dialogue_handler import DialogueHandler
+
+            if "game_settings" in changes:
+                GameSettings.inst().reset()
+
+            if SETTINGS.LOCALIZED_STRINGS_MODEL in changes:
+                LocalizedStringsHandler.inst().load()
+
+            # Dialogues are cached when they are used.
+            DialogueHandler.inst().clear()
+
+            changed_values = set()
+            for rows in changes.values():
+                for row in rows:
+                    changed_values.update(value for value in row if isinstance(value, str))
+
+            if self._world:
+                await self._world.reload(changed_values)
+
+            await loop.run_in_executor(None, WorldData.save_snapshot)
+            return list(changes.keys())
+
     @ClassProperty
     def world(cls):
         """
@@ -31,6 +31,12 @@ class Session(object):
         if SETTINGS.SPECIAL_COMMAND_RATE:
             self.special_command_history = {key: deque() for key in SETTINGS.SPECIAL_COMMAND_RATE}
 
+        # Encoded messages waiting to be sent, and the coroutine sending them.
+        self.send_queue = asyncio.Queue(SETTINGS.SESSION_QUEUE_SIZE)
+        self.writer = None
+        self.closed = False
+        self.dropped_messages = 0
+
     def __str__(self):
         """
         Output self as a string
@@ -44,6 +50,11 @@ class Session(object):
         """
         Called on a client disconnected.
         """
+        self.closed = True
+        if self.writer:
+            self.writer.cancel()
+            self.writer = None
+
         if self.account:
             await self.logout()
 
@@ -145,12 +156,31 @@ class Session(object):
         self.account = None
         self.authed = False
 
-    async def send_out(self, data: dict or list) -> None:
+    @staticmethod
+    def encode(data: dict or list) -> str:
+        """
+        Encode data to the text sent to clients.
+        """
+        return json.dumps(data, ensure_ascii=False)
+
+    async def send_text(self, text: str) -> None:
+        """
+        Send out an encoded message. To be implemented by the network.
+        """
+        pass
+
+    async def close(self) -> None:
         """
-        Send out a message. To be implemented by the network.
+        Close the connection. To be implemented by the network.
         """
         pass
 
+    async def send_out(self, data: dict or list) -> None:
+        """
+        Send out a message.
+        """
+        await self.send_text(self.encode(data))
+
     def msg(self, data: dict or list) -> None:
         """
         Send data to the client.
@@ -158,9 +188,88 @@ class Session(object):
         :param data: data to send
         """
         logger.log_debug("[Send message][%s]%s" % (self, data))
+        self.put_text(self.encode(data))
+
+    def put_text(self, text: str) -> None:
+        """
+        Put an encoded message to the send queue.
+
+        :param text: encoded data
+        """
+        if self.closed:
+            return
+
+        if self.writer is None:
+            self.writer = asyncio.create_task(self.write_queue())
 
-        # send message
         try:
-            asyncio.create_task(self.send_out(data))
-        except Exception as e:
-            logger.log_err("[Send message error][%s]%s" % (self, e))
+            self.send_queue.put_nowait(text)
+        except asyncio.QueueFull:
+            self.dropped_messages += 1
+            if SETTINGS.SESSION_QUEUE_OVERFLOW == "disconnect":
+                logger.log_warn("[Send queue full][%s] Close the connection." % self)
+                self.closed = True
+                asyncio.create_task(self.close())
+            elif self.dropped_messages == 1 or self.dropped_messages % 100 == 0:
+                logger.log_warn("[Send queue full][%s] %s messages dropped." % (self, self.dropped_messages))
+
+    def get_queue_depth(self) -> int:
+        """
+        Get the number of messages waiting to be sent.
+        """
+        return self.send_queue.qsize()
+
+    async def write_queue(self) -> None:
+        """
+        Send queued messages one frame after another. Messages queued at the same time are
+        sent in one frame as a list.
+        """
+        queue = self.send_queue
+        max_messages = SETTINGS.SESSION_MAX_FRAME_MESSAGES
+        while True:
+            text = await queue.get()
+            if queue.empty():
+                frame = text
+            else:
+                texts = [text]
+                while not queue.empty() and len(texts) < max_messages:
+                    texts.append(queue.get_nowait())
+                frame = self.join_texts(texts)
+
+            try:
+                await self.send_text(frame)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.log_err("[Send message error][%s]%s" % (self, e))
+
+    @staticmethod
+    def join_texts(texts: list) -> str:
+        """
+        Join encoded messages into one encoded list. Encoded lists are merged into it.
+        """
+        items = []
+        for text in texts:
+            if text[0] == "[":
+                text = text[1:-1].strip()
+                if not text:
+                    continue
+            items.append(text)
+        return "[" + ",".join(items) + "]"
+
+    @classmethod
+    def broadcast(cls, sessions: list, data: dict or list) -> None:
+        """
+        Send the same data to many clients. The data is encoded only once.
+
+        :param sessions: sessions to send to
+        :param data: data to send
+        """
+        if not sessions:
+            return
+
+        logger.log_debug("[Broadcast message][%s sessions]%s" % (len(sessions), data))
+
+        text = cls.encode(data)
+        for session in sessions:
+            session.put_text(text)
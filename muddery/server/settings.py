@@ -99,6 +99,8 @@ class Settings(object):
     # PASSWORD - db admin password (unused in sqlite3)
     # HOST - empty string is localhost (unused in sqlite3)
     # PORT - empty string defaults to localhost (unused in sqlite3)
+    # ASYNC - also create an asyncio engine, needed by async storages
+    #         (requires aiosqlite for sqlite3 or aiomysql for mysql)
     ######################################################################
     GAMEDATA_DB = {
         'MODELS': 'gamedata.models',
@@ -109,6 +111,7 @@ class Settings(object):
         'HOST': '',
         'PORT': '',
         'DEBUG': False,
+        'ASYNC': False,
     }
 
     WORLDDATA_DB = {
@@ -122,12 +125,43 @@ class Settings(object):
         'DEBUG': False,
     }
 
+    # A compiled snapshot of all worlddata tables and their indexes, used to start the server
+    # quickly. It is rebuilt when the worlddata database changes. Only sqlite3 databases can use
+    # it. Set to None to load worlddata from the database.
+    WORLDDATA_SNAPSHOT = os.path.join(GAME_DIR, "server", "worlddata.snapshot")
+
     # Database Access Object
+    # Use 'muddery.server.database.storage.async_table_kv_storage.AsyncTableKVStorage' with
+    # GAMEDATA_DB['ASYNC'] = True to access the database without blocking the event loop.
     DATABASE_STORAGE_OBJECT = 'muddery.server.database.storage.table_kv_storage.TableKVStorage'
 
     # Database Access Object without cache
+    # Use 'muddery.server.database.storage.lru_memory_kv_storage.LRUMemoryKVStorage' to remove
+    # data of offline characters from the memory.
     DATABASE_CACHE_OBJECT = 'muddery.server.database.storage.memory_kv_storage.MemoryKVStorage'
 
+    # The max number of categories in a LRU cache.
+    DATABASE_CACHE_MAX_CATEGORIES = 10000
+
+    # Remove a category from a LRU cache if it has not been used for this many seconds.
+    # Set to 0 to keep categories until the cache is full.
+    DATABASE_CACHE_TTL = 3600
+
+    # Database Access Object with cache
+    # Use 'muddery.server.database.storage.write_behind_storage.WriteBehindStorage' to write
+    # changes to the database in batches.
+    DATABASE_CACHED_STORAGE_OBJECT = 'muddery.server.database.storage.storage_with_cache.StorageWithCache'
+
+    # The interval in seconds of writing dirty data to the database in write behind storages.
+    DATABASE_FLUSH_INTERVAL = 0.5
+
+    # Write dirty data at once when there are so many dirty keys in a write behind storage.
+    DATABASE_FLUSH_SIZE = 200
+
+    # A record which fails to be written to the database so many times is dropped from a write
+    # behind storage and logged, so it does not block other records.
+    DATABASE_FLUSH_MAX_RETRIES = 10
+
 
     ######################################################################
     # Web features
@@ -151,6 +185,10 @@ class Settings(object):
     # The game server API's url path.
     GAME_SERVER_API_PATH = "/api"
 
+    # The secret of requests from the world editor, like reloading the world. It is sent in the
+    # X-Muddery-Secret header. Requests are refused if it is empty.
+    GAME_SERVER_SECRET = ""
+
     # Encrypt secret messages in transporting messages.
     ENABLE_ENCRYPT = True
 
@@ -241,6 +279,17 @@ class Settings(object):
         }
     }
 
+    # The max number of messages waiting to be sent to a session. Messages queued
+    # at the same time are sent to the client in one frame.
+    SESSION_QUEUE_SIZE = 1000
+
+    # The max number of messages sent in one frame.
+    SESSION_MAX_FRAME_MESSAGES = 100
+
+    # What to do when a session's queue is full.
+    # "drop": drop new messages, "disconnect": close the connection.
+    SESSION_QUEUE_OVERFLOW = "drop"
+
     ######################################################################
     # World data features
     ######################################################################
@@ -254,6 +303,18 @@ class Settings(object):
     LOCALIZED_STRINGS_MODEL = "localized_strings"
 
 
+    ###################################
+    # World settings
+    ###################################
+    # Create areas and their rooms when they are used, instead of creating all areas when
+    # the server starts.
+    WORLD_LAZY_AREAS = False
+
+    # Remove areas which have no player characters and have not been used for this many seconds.
+    # Only works when WORLD_LAZY_AREAS is True. Set to 0 to keep all created areas.
+    WORLD_AREA_IDLE_TIME = 600
+
+
     ###################################
     # combat settings
     ###################################
@@ -266,6 +327,18 @@ class Settings(object):
 
     AUTO_COMBAT_TIMEOUT = 60
 
+    # The interval in seconds of combat ticks. Characters casting skills automatically cast
+    # skills in ticks, so their auto cast cd is rounded up to a multiple of this value.
+    COMBAT_TICK_INTERVAL = 0.1
+
+    # Only changed states are sent to characters after casting skills in combats. All
+    # characters' full states are sent every this many seconds.
+    COMBAT_FULL_STATE_INTERVAL = 10
+
+    # The max honour difference of matching honour combats increases by the original value
+    # every this many seconds a character waits in the queue. Set to 0 to keep the limit.
+    MATCH_PVP_HONOUR_DIFF_WIDEN_TIME = 60
+
 
     ###################################
     # AI modules
@@ -130,7 +130,7 @@ class FuncTeleportTo(StatementFunction):
 
         room_key = self.args[0]
         try:
-            destination = Server.world.get_room(room_key)
+            destination = await Server.world.get_room(room_key)
         except KeyError:
             return False
 
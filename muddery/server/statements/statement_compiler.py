@@ -0,0 +1,263 @@
+"""
+Compile statements into callable objects.
+
+A statement string is parsed only once, the compiled object is cached by the
+statement string. Only statement functions are evaluated at runtime.
+"""
+
+import re, ast
+from muddery.server.utils.logger import logger
+from muddery.common.utils.singleton import Singleton
+from muddery.common.utils.utils import async_gather
+
+
+re_function = re.compile(r'[a-zA-Z_][a-zA-Z0-9_\.]*\(.*?\)')
+
+
+class CompiledFunction(object):
+    """
+    A statement function with parsed args, such as: func("value")
+    """
+    __slots__ = ("func_word", "func_key", "func_args")
+
+    def __init__(self, func_word):
+        """
+        Args:
+            func_word: (string) function string, such as: func("value")
+        """
+        self.func_word = func_word
+
+        # separate function's key and args
+        try:
+            pos = func_word.index("(")
+            self.func_key = func_word[:pos]
+            func_args = ast.literal_eval(func_word[pos:])
+            if type(func_args) != tuple:
+                func_args = (func_args,)
+            self.func_args = func_args
+        except ValueError:
+            self.func_key = func_word
+            self.func_args = ()
+
+    async def call(self, func_set, caller, obj, **kwargs):
+        """
+        Do function.
+
+        Args:
+            func_set: (object) function set
+            caller: (object) statement's caller
+            obj: (object) caller's target
+
+        Returns:
+            function result
+        """
+        func_class = func_set.get_func_class(self.func_key)
+        if not func_class:
+            logger.log_err("Statement error: Can not find function: %s of %s." % (self.func_key, self.func_word))
+            return
+
+        func_obj = func_class()
+        func_obj.set(caller, obj, self.func_args, **kwargs)
+        try:
+            return await func_obj.func()
+        except Exception as e:
+            logger.log_err("Exec function error: %s %s" % (self.func_word, repr(e)))
+            return
+
+
+class ConditionContext(object):
+    """
+    Function results of a condition's evaluation. Each function is called once.
+    """
+    __slots__ = ("condition", "func_set", "caller", "obj", "kwargs", "results")
+
+    def __init__(self, condition, func_set, caller, obj, kwargs):
+        self.condition = condition
+        self.func_set = func_set
+        self.caller = caller
+        self.obj = obj
+        self.kwargs = kwargs
+        self.results = {}
+
+    async def get_value(self, name):
+        """
+        Get a function's result, functions' results can only be True, False or None.
+        """
+        if name in self.results:
+            return self.results[name]
+
+        result = await self.condition.functions[name].call(self.func_set, self.caller, self.obj, **self.kwargs)
+        value = None if result is None else True if result else False
+        self.results[name] = value
+        return value
+
+
+class CompiledCondition(object):
+    """
+    A condition expression, such as: is_quest_finished("quest") and not has_object("key")
+
+    Boolean operators are short-circuited, so functions are only called when they are needed.
+    """
+    def __init__(self, compiler, condition):
+        """
+        Args:
+            compiler: (StatementCompiler) the compiler.
+            condition: (string) condition statement.
+        """
+        self.condition = condition
+
+        # functions in the condition
+        # {function's name in the expression: compiled function}
+        self.functions = {}
+
+        names = {}
+
+        def replace(match):
+            func_word = match.group()
+            if func_word not in names:
+                name = "_func%d_" % len(names)
+                names[func_word] = name
+                self.functions[name] = compiler.get_function(func_word)
+            return names[func_word]
+
+        expression = re_function.sub(replace, condition).strip()
+        try:
+            tree = ast.parse(expression, mode="eval")
+            self.evaluate = self.compile_node(tree.body)
+        except Exception as e:
+            error = e
+
+            async def evaluate(context):
+                raise error
+            self.evaluate = evaluate
+
+    def compile_node(self, node):
+        """
+        Compile an expression node to an async function.
+        """
+        if isinstance(node, ast.BoolOp):
+            operands = [self.compile_node(value) for value in node.values]
+            if isinstance(node.op, ast.And):
+                async def evaluate(context):
+                    for operand in operands:
+                        value = await operand(context)
+                        if not value:
+                            return value
+                    return value
+            else:
+                async def evaluate(context):
+                    for operand in operands:
+                        value = await operand(context)
+                        if value:
+                            return value
+                    return value
+            return evaluate
+
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            operand = self.compile_node(node.operand)
+
+            async def evaluate(context):
+                return not await operand(context)
+            return evaluate
+
+        if isinstance(node, ast.Name) and node.id in self.functions:
+            name = node.id
+
+            async def evaluate(context):
+                return await context.get_value(name)
+            return evaluate
+
+        if isinstance(node, ast.Constant):
+            value = node.value
+
+            async def evaluate(context):
+                return value
+            return evaluate
+
+        # Other expressions, calculate all functions in it then evaluate it.
+        code = compile(ast.Expression(body=node), "<condition>", "eval")
+        names = [n.id for n in ast.walk(node) if isinstance(n, ast.Name) and n.id in self.functions]
+
+        async def evaluate(context):
+            values = await async_gather([context.get_value(name) for name in names])
+            return eval(code, {}, dict(zip(names, values)))
+        return evaluate
+
+    async def match(self, func_set, caller, obj, **kwargs):
+        """
+        Evaluate the condition.
+
+        Args:
+            func_set: (object) condition function set
+            caller: (object) statement's caller
+            obj: (object) caller's target
+
+        Returns:
+            result
+        """
+        return await self.evaluate(ConditionContext(self, func_set, caller, obj, kwargs))
+
+
+class StatementCompiler(Singleton):
+    """
+    Compile statements and cache the results.
+    """
+    def __init__(self):
+        # {function string: CompiledFunction}
+        self.functions = {}
+
+        # {statements separated by ";": [CompiledFunction]}
+        self.actions = {}
+
+        # {condition string: CompiledCondition}
+        self.conditions = {}
+
+    def clear(self):
+        """
+        Clear all cached statements. Called when worlddata reloads.
+        """
+        self.functions = {}
+        self.actions = {}
+        self.conditions = {}
+
+    def get_function(self, func_word):
+        """
+        Get a compiled function.
+
+        Args:
+            func_word: (string) function string, such as: func("value")
+        """
+        try:
+            return self.functions[func_word]
+        except KeyError:
+            compiled = CompiledFunction(func_word)
+            self.functions[func_word] = compiled
+            return compiled
+
+    def get_actions(self, action):
+        """
+        Get compiled functions of an action.
+
+        Args:
+            action: (string) statements separated by ";"
+        """
+        try:
+            return self.actions[action]
+        except KeyError:
+            compiled = [self.get_function(f) for f in action.split(";")]
+            self.actions[action] = compiled
+            return compiled
+
+    def get_condition(self, condition):
+        """
+        Get a compiled condition.
+
+        Args:
+            condition: (string) a condition expression
+        """
+        try:
+            return self.conditions[condition]
+        except KeyError:
+            compiled = CompiledCondition(self, condition)
+            self.conditions[condition] = compiled
+            return compiled
@@ -5,6 +5,11 @@ Data are arbitrary data stored in worlddata tables. They are read only.
 
 from builtins import object
 import weakref
+from types import MappingProxyType
+
+
+EMPTY_DATA = MappingProxyType({})
+
 
 class DataFieldHandler(object):
     """
@@ -17,6 +22,10 @@ class DataFieldHandler(object):
         """
         Initialized on the object
         """
+        # Read only data shared by many objects.
+        self._shared = EMPTY_DATA
+
+        # The object's own data, it overrides shared data.
         self._store = {}
         self.obj = weakref.proxy(obj)
 
@@ -31,7 +40,7 @@ class DataFieldHandler(object):
             has_data (bool): If Data is set or not.
 
         """
-        return key in self._store
+        return key in self._store or key in self._shared
 
     def get(self, key):
         """
@@ -43,9 +52,11 @@ class DataFieldHandler(object):
         Returns:
             the value of the Data.
         """
-        if key not in self._store:
-            raise AttributeError
-        return self._store.get(key)
+        if key in self._store:
+            return self._store[key]
+        if key in self._shared:
+            return self._shared[key]
+        raise AttributeError
 
     def add(self, key, value):
         """
@@ -58,11 +69,49 @@ class DataFieldHandler(object):
         """
         self._store[key] = value
 
+    def discard(self, key):
+        """
+        Remove the object's own value of the key, the shared value will be used.
+
+        Args:
+            key (str): The data's key.
+        """
+        self._store.pop(key, None)
+
+    def get_shared(self):
+        """
+        Get shared data.
+        """
+        return self._shared
+
+    def set_shared(self, data):
+        """
+        Use shared data. The object's own values are kept.
+
+        Args:
+            data (MappingProxyType): read only data.
+        """
+        self._shared = data
+
+    def freeze(self):
+        """
+        Turn all values into read only shared data.
+
+        Returns:
+            (MappingProxyType) the shared data.
+        """
+        data = dict(self._shared)
+        data.update(self._store)
+        self._shared = MappingProxyType(data)
+        self._store = {}
+        return self._shared
+
     def clear(self):
         """
         Remove all NAttributes from handler.
 
         """
+        self._shared = EMPTY_DATA
         self._store = {}
 
     def all(self):
@@ -79,7 +128,12 @@ class DataFieldHandler(object):
                 setting of `return_tuples`.
 
         """
-        return self._store
+        if not self._shared:
+            return self._store
+
+        data = dict(self._shared)
+        data.update(self._store)
+        return data
 
 
 class DataHolder(object):
@@ -4,14 +4,18 @@ This module imports data from files to db.
 
 import os, glob
 import traceback
-from sqlalchemy import delete
+from sqlalchemy import delete, insert
 from muddery.common.utils.exception import MudderyError, ERR
 from muddery.common.utils import readers
 from muddery.server.database.worlddata_db import WorldDataDB
 from muddery.server.utils.logger import logger
 
 
-def import_file(fullname, file_type=None, table_name=None, clear=True, except_errors=False, **kwargs):
+# The max number of records inserted in one statement in the bulk mode.
+BULK_BATCH_SIZE = 5000
+
+
+def import_file(fullname, file_type=None, table_name=None, clear=True, except_errors=False, bulk=True, **kwargs):
     """
     Import data from a data file to the db model
 
@@ -22,6 +26,9 @@ def import_file(fullname, file_type=None, table_name=None, clear=True, except_er
                    the file type from the extension name of the file.
         clear: (boolean) clear old data.
         except_errors: (boolean) except error records and load other records.
+        bulk: (boolean) insert records in batches. If except_errors is set, a batch with database
+              errors is inserted again record by record, error records are reported and skipped.
+              Set it to False to insert records one by one.
     """
     def get_field_types(model_obj, field_names):
         """
@@ -59,48 +66,56 @@ def import_file(fullname, file_type=None, table_name=None, clear=True, except_er
 
         return field_types
 
-    def parse_record(field_names, field_types, values):
+    def to_bool(value):
         """
-        Parse text values to field values.
+        Parse a boolean value.
         """
-        record = {}
-        for item in zip(field_names, field_types, values):
-            field_name = item[0]
-            # skip "id" field
-            if field_name == "id":
-                continue
+        upper = value.upper()
+        if upper == 'TRUE' or upper == 'T':
+            return True
+        elif upper == 'FALSE' or upper == 'F':
+            return False
+        else:
+            return int(value) != 0
+
+    # converters of field types, None means keep the text value
+    converters = {
+        0: None,
+        1: to_bool,
+        2: int,
+        3: float,
+    }
+
+    def get_columns(field_names, field_types):
+        """
+        Get columns to import. Unsupported fields and the "id" field are skipped.
 
-            field_type = item[1]
-            value = item[2]
+        Returns:
+            (list) [(value's position, field's name, converter)]
+        """
+        return [
+            (pos, field_name, converters[field_type])
+            for pos, (field_name, field_type) in enumerate(zip(field_names, field_types))
+            if field_name != "id" and field_type in converters
+        ]
 
-            try:
-                # set field values
-                if field_type == -1:
-                    # not support this field
-                    continue
-                elif field_type == 0:
-                    # default
-                    record[field_name] = value
-                elif field_type == 1:
-                    # boolean value
-                    if value:
-                        upper = value.upper()
-                        if upper == 'TRUE' or upper == 'T':
-                            record[field_name] = True
-                        elif upper == 'FALSE' or upper == 'F':
-                            record[field_name] = False
-                        else:
-                            record[field_name] = (int(value) != 0)
-                elif field_type == 2:
-                    # interger value
-                    if value:
-                        record[field_name] = int(value)
-                elif field_type == 3:
-                    # float value
-                    if value:
-                        record[field_name] = float(value)
-            except Exception as e:
-                raise Exception("%s '%s' error: %s" % (field_name, value, e))
+    def parse_record(columns, values):
+        """
+        Parse text values to field values.
+        """
+        record = {}
+        for pos, field_name, converter in columns:
+            if pos >= len(values):
+                break
+
+            value = values[pos]
+            if converter is None:
+                record[field_name] = value
+            elif value:
+                try:
+                    record[field_name] = converter(value)
+                except Exception as e:
+                    raise Exception("%s '%s' error: %s" % (field_name, value, e))
 
         return record
 
@@ -118,31 +133,82 @@ def import_file(fullname, file_type=None, table_name=None, clear=True, except_er
         try:
             # read title
             titles = next(data_iterator)
-            field_types = get_field_types(model, titles)
-
-            # import values
-            with session.begin():
-                for index, values in enumerate(data_iterator):
-                    # skip blank lines
-                    if not "".join(values):
-                        continue
+        except StopIteration:
+            # empty file
+            return
+
+        field_types = get_field_types(model, titles)
+        columns = get_columns(titles, field_types)
+
+        # Records of the same fields are inserted in batches. Records without some fields
+        # (empty numbers) use the fields' default values, so they are in different batches.
+        # [(line number, record)]
+        batch = []
+        batch_fields = None
+
+        def insert_batch():
+            """
+            Insert the batch of records in one executemany statement.
+            """
+            if not batch:
+                return
+
+            if except_errors:
+                try:
+                    with session.begin_nested():
+                        session.execute(insert(model), [record for line, record in batch])
+                except Exception:
+                    # Insert records one by one to find error records.
+                    for line, record in batch:
+                        try:
+                            with session.begin_nested():
+                                session.execute(insert(model), [record])
+                        except Exception as e:
+                            msg = "Import %s line %s error: %s" % (model.__tablename__, line, e)
+                            print(msg)
+                            logger.log_warn(msg)
+            else:
+                try:
+                    session.execute(insert(model), [record for line, record in batch])
+                except Exception as e:
+                    msg = "Import %s line %s-%s error: %s" % (model.__tablename__, batch[0][0], batch[-1][0], e)
+                    logger.log_err(msg)
+                    raise MudderyError(ERR.import_data_error, msg)
+
+            batch.clear()
+
+        with session.begin():
+            for index, values in enumerate(data_iterator):
+                # skip blank lines
+                if not "".join(values):
+                    continue
 
-                    try:
-                        data = parse_record(titles, field_types, values)
+                line = index + 2
+                try:
+                    data = parse_record(columns, values)
+                    if not bulk:
                         record = model(**data)
                         session.add(record)
                         session.flush()
-                    except Exception as e:
-                        msg = "Import %s line %s error: %s" % (model.__tablename__, index + 2, e)
-                        if except_errors:
-                            print(msg)
-                            logger.log_warn(msg)
-                        else:
-                            logger.log_err(msg)
-                            raise MudderyError(ERR.import_data_error, msg)
-        except StopIteration:
-            # reach the end of file, pass this exception
-            pass
+                        continue
+                except Exception as e:
+                    msg = "Import %s line %s error: %s" % (model.__tablename__, line, e)
+                    if except_errors:
+                        print(msg)
+                        logger.log_warn(msg)
+                    else:
+                        logger.log_err(msg)
+                        raise MudderyError(ERR.import_data_error, msg)
+                    continue
+
+                fields = data.keys()
+                if fields != batch_fields or len(batch) >= BULK_BATCH_SIZE:
+                    insert_batch()
+                    batch_fields = fields
+
+                batch.append((line, data))
+
+            insert_batch()
 
     # separate name and ext name
     try:
@@ -27,6 +27,33 @@ class ObjectStatesHandler(object):
         self.obj_id = obj_id
         self.storage = storage_class()
 
+        # changed attributes since the last pop_changes(), {key: new value}
+        # None if changes are not tracked.
+        self.changes = None
+
+    def track_changes(self, enable):
+        """
+        Start or stop recording changed attributes.
+
+        Args:
+            enable (bool): record changes or not.
+        """
+        self.changes = {} if enable else None
+
+    def pop_changes(self):
+        """
+        Get attributes changed since the last call and clear them.
+
+        Returns:
+            (dict): {key: new value}, a deleted attribute's value is None.
+        """
+        if self.changes is None:
+            return {}
+
+        changes = self.changes
+        self.changes = {}
+        return changes
+
     async def has(self, key):
         """
         Checks if the given Attribute exists on the object.
@@ -57,6 +84,32 @@ class ObjectStatesHandler(object):
         """
         return await self.storage.load(self.obj_id, key, default)
 
+    async def has_many(self, keys):
+        """
+        Checks if the given Attributes exist on the object.
+
+        Args:
+            keys (list): Attribute keys to check for.
+
+        Returns:
+            (dict): {key: exists or not}
+        """
+        return await self.storage.has_many(self.obj_id, keys)
+
+    async def load_many(self, keys, *default):
+        """
+        Get Attributes in one call.
+
+        Args:
+            keys (list): attribute identifiers.
+            default (any or none): default value of missing Attributes. If it is not set,
+                missing Attributes are omitted.
+
+        Returns:
+            (dict): {key: value}
+        """
+        return await self.storage.load_many(self.obj_id, keys, *default)
+
     async def save(self, key, value):
         """
         Add attribute to object.
@@ -67,12 +120,16 @@ class ObjectStatesHandler(object):
                 `strattr` keyword is set, this *must* be a string.
         """
         await self.storage.save(self.obj_id, key, value)
+        if self.changes is not None:
+            self.changes[key] = value
 
     async def saves(self, value_dict):
         """
         Set attributes.
         """
         await self.storage.save_keys(self.obj_id, value_dict)
+        if self.changes is not None:
+            self.changes.update(value_dict)
 
     async def delete(self, key):
         """
@@ -90,12 +147,27 @@ class ObjectStatesHandler(object):
 
         """
         await self.storage.delete(self.obj_id, key)
+        if self.changes is not None:
+            self.changes[key] = None
+
+    async def delete_many(self, keys):
+        """
+        Remove attributes from object.
+
+        Args:
+            keys (list): Attribute keys to remove.
+        """
+        await self.storage.delete_keys(self.obj_id, keys)
+        if self.changes is not None:
+            self.changes.update((key, None) for key in keys)
 
     async def clear(self):
         """
         Remove all Attributes on this object.
         """
         await self.storage.remove_obj(self.obj_id)
+        if self.changes is not None:
+            self.changes.clear()
 
     async def all(self):
         """
@@ -0,0 +1,216 @@
+"""
+A process-wide timer. All timed jobs of the game server share one heap of jobs and
+one event loop callback, instead of running a scheduler per object.
+"""
+
+import heapq
+import asyncio
+import itertools
+from muddery.server.utils.logger import logger
+from muddery.common.utils.singleton import Singleton
+
+
+class TimerJob(object):
+    """
+    A timed job. It can be cancelled by calling its cancel method.
+    """
+    __slots__ = ("handler", "when", "interval", "callback", "args", "cancelled", "task")
+
+    def __init__(self, handler, when, interval, callback, args):
+        self.handler = handler
+        self.when = when
+        self.interval = interval
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+        # The running task of an async callback.
+        self.task = None
+
+    def __lt__(self, other):
+        return self.when < other.when
+
+    def cancel(self):
+        """
+        Cancel the job.
+        """
+        if not self.cancelled:
+            self.handler.cancel(self)
+
+    def is_active(self):
+        """
+        If the job will run later.
+        """
+        return not self.cancelled
+
+
+class TimerHandler(Singleton):
+    """
+    Run one-shot and interval jobs on the event loop.
+    """
+    def __init__(self):
+        # jobs ordered by their run time
+        # [(run time, sequence, job)]
+        self.jobs = []
+        self.sequence = itertools.count()
+        self.active_jobs = 0
+        self.cancelled_jobs = 0
+
+        # the event loop's callback of the earliest job
+        self.loop_handle = None
+        self.loop_handle_time = None
+
+        # statistics
+        self.runs = 0
+        self.last_lag = 0
+        self.max_lag = 0
+
+    def call_later(self, delay: float, callback, *args) -> TimerJob:
+        """
+        Run a callback once after delay seconds.
+
+        Args:
+            delay: (float) seconds to wait.
+            callback: (callable) a function or a coroutine function.
+            args: callback's args.
+        """
+        loop = asyncio.get_event_loop()
+        return self.add_job(loop.time() + delay, 0, callback, args)
+
+    def call_interval(self, interval: float, callback, *args, delay: float = None) -> TimerJob:
+        """
+        Run a callback every interval seconds. If an async callback is still running, the next run is skipped.
+
+        Args:
+            interval: (float) seconds between two runs.
+            callback: (callable) a function or a coroutine function.
+            args: callback's args.
+            delay: (float) seconds to wait before the first run, default is the interval.
+
+        Raises:
+            ValueError: if the interval is not positive.
+        """
+        if not interval or interval <= 0:
+            raise ValueError("The interval must be positive: %s" % interval)
+
+        if delay is None:
+            delay = interval
+
+        loop = asyncio.get_event_loop()
+        return self.add_job(loop.time() + delay, interval, callback, args)
+
+    def add_job(self, when: float, interval: float, callback, args: tuple) -> TimerJob:
+        """
+        Add a job to the heap.
+        """
+        job = TimerJob(self, when, interval, callback, args)
+        heapq.heappush(self.jobs, (when, next(self.sequence), job))
+        self.active_jobs += 1
+        self.schedule()
+        return job
+
+    def cancel(self, job: TimerJob) -> None:
+        """
+        Cancel a job. The job is removed from the heap lazily.
+        """
+        if job.cancelled:
+            return
+
+        job.cancelled = True
+        self.active_jobs -= 1
+        self.cancelled_jobs += 1
+
+        if self.cancelled_jobs > 64 and self.cancelled_jobs > len(self.jobs) // 2:
+            # Too many cancelled jobs, rebuild the heap.
+            self.jobs = [item for item in self.jobs if not item[2].cancelled]
+            heapq.heapify(self.jobs)
+            self.cancelled_jobs = 0
+
+    def schedule(self) -> None:
+        """
+        Set the event loop's callback to the earliest job's time.
+        """
+        while self.jobs and self.jobs[0][2].cancelled:
+            heapq.heappop(self.jobs)
+            self.cancelled_jobs -= 1
+
+        if not self.jobs:
+            return
+
+        when = self.jobs[0][0]
+        if self.loop_handle is not None:
+            if self.loop_handle_time <= when:
+                return
+            self.loop_handle.cancel()
+
+        self.loop_handle = asyncio.get_event_loop().call_at(when, self.run_jobs)
+        self.loop_handle_time = when
+
+    def run_jobs(self) -> None:
+        """
+        Run all due jobs.
+        """
+        self.loop_handle = None
+        self.loop_handle_time = None
+
+        now = asyncio.get_event_loop().time()
+        while self.jobs and self.jobs[0][0] <= now:
+            when, _, job = heapq.heappop(self.jobs)
+            if job.cancelled:
+                self.cancelled_jobs -= 1
+                continue
+
+            lag = now - when
+            self.last_lag = lag
+            if lag > self.max_lag:
+                self.max_lag = lag
+
+            if job.interval > 0:
+                # Set the next run time, skip missed runs.
+                job.when = when + job.interval
+                if job.when <= now:
+                    job.when = now + job.interval
+                heapq.heappush(self.jobs, (job.when, next(self.sequence), job))
+            else:
+                job.cancelled = True
+                self.active_jobs -= 1
+
+            self.run_job(job)
+
+        self.schedule()
+
+    def run_job(self, job: TimerJob) -> None:
+        """
+        Call a job's callback.
+        """
+        if job.task is not None and not job.task.done():
+            # The last run has not finished.
+            return
+
+        self.runs += 1
+        try:
+            result = job.callback(*job.args)
+            if asyncio.iscoroutine(result):
+                job.task = asyncio.ensure_future(result)
+                job.task.add_done_callback(self.job_done)
+        except Exception as e:
+            logger.log_trace("Timer job error: %s" % e)
+
+    def job_done(self, task) -> None:
+        """
+        Log async jobs' errors.
+        """
+        if not task.cancelled() and task.exception():
+            exc = task.exception()
+            logger.log_err("Timer job error: %s" % repr(exc))
+
+    def get_stats(self) -> dict:
+        """
+        Get timer statistics.
+        """
+        return {
+            "jobs": self.active_jobs,
+            "runs": self.runs,
+            "last_lag": self.last_lag,
+            "max_lag": self.max_lag,
+        }
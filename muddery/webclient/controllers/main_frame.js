@@ -4670,6 +4670,7 @@ MudderyCombat = function(el) {
 	this.timeline = 0;
 	this.combat_finished = true;
 	this.skill_cd_time = {};
+	this.states = {};
 
 	this.full_hp_width = this.select(".hp-bar").width();
 	this.character_hp_width = 0;
@@ -4803,6 +4804,7 @@ MudderyCombat.prototype.setCombat = function(desc, timeout, characters, self_id)
 	this.combat_finished = false;
 
 	this.self_id = self_id;
+	this.states = {};
 
 	var self_team = "";
 	for (var i in characters) {
@@ -5014,16 +5016,24 @@ MudderyCombat.prototype.displayMessage = function(msg) {
 }
 
 /*
- * Update character's state.
+ * Update character's state. States can contain only changed fields.
  */
 MudderyCombat.prototype.updateStates = function(states) {
 	for (var key in states) {
+		if (!(key in this.states)) {
+			this.states[key] = {};
+		}
+		var state = this.states[key];
+		for (var field in states[key]) {
+			state[field] = states[key][field];
+		}
+
 		var hp_bar = "#combat-char-" + key + " .character-hp-bar";
-		$(hp_bar).width(this.character_hp_width * states[key]["hp"] / states[key]["max_hp"]);
+		$(hp_bar).width(this.character_hp_width * state["hp"] / state["max_hp"]);
 
 		if (this.self_id == key) {
-		    this.select(".hp-bar").width(this.full_hp_width * states[key]["hp"] / states[key]["max_hp"]);
-		    this.select(".hp-number").text(states[key]["hp"] + "/" + states[key]["max_hp"]);
+		    this.select(".hp-bar").width(this.full_hp_width * state["hp"] / state["max_hp"]);
+		    this.select(".hp-number").text(state["hp"] + "/" + state["max_hp"]);
 		}
 	}
 }
@@ -7,7 +7,7 @@ from muddery.common.utils.exception import MudderyError, ERR
 from muddery.common.networks.responses import success_response
 from muddery.server.mappings.event_action_set import EVENT_ACTION_SET
 from muddery.launcher import manager
-from muddery.worldeditor.services import data_query, data_edit
+from muddery.worldeditor.services import data_query, data_edit, game_server
 from muddery.worldeditor.utils.logger import logger
 from muddery.worldeditor.controllers.base_request_processer import BaseRequestProcesser
 from muddery.worldeditor.dao import general_querys
@@ -867,7 +867,7 @@ class QueryDialoguesTable(BaseRequestProcesser):
 
 class ApplyChanges(BaseRequestProcesser):
     """
-    Query all tables' names.
+    Apply worlddata changes to the running game server.
 
     Args:
         None.
@@ -877,11 +877,10 @@ class ApplyChanges(BaseRequestProcesser):
 
     async def func(self, args, request):
         try:
-            # restart the game server
-            import subprocess
-            subprocess.Popen("muddery restart", shell=True)
-
-            # await manager.restart_servers(server=True, webclient=False, editor=False)
+            # reload changed worlddata in the game server
+            await game_server.reload_world()
+        except MudderyError:
+            raise
         except Exception as e:
             message = "Can not build the world: %s" % e
             logger.log_trace(message)
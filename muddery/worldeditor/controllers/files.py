@@ -2,11 +2,11 @@
 Battle commands. They only can be used when a character is in a combat.
 """
 
-import os, tempfile, time
+import os, tempfile, time, itertools
 from io import BytesIO
 from PIL import Image
 from muddery.common.utils.exception import MudderyError, ERR
-from muddery.common.networks.responses import success_response, file_response
+from muddery.common.networks.responses import success_response, file_response, stream_response
 from muddery.common.utils import writers
 from muddery.server.utils.importer import import_file
 from muddery.worldeditor.controllers.base_request_processer import BaseRequestProcesser
@@ -131,16 +131,15 @@ class DownloadZip(BaseRequestProcesser):
         file_type = args.get("type", "csv")
 
         # get data's zip
-        fp = tempfile.TemporaryFile()
         try:
-            exporter.export_zip_all(fp, file_type)
-            fp.flush()
+            chunks = exporter.iter_zip_all(file_type)
+
+            # Check the file type before sending the response.
+            first_chunk = next(chunks)
 
             filename = time.strftime("worlddata_%Y%m%d_%H%M%S.zip", time.localtime())
-            return await file_response(fp, filename)
+            return await stream_response(itertools.chain([first_chunk], chunks), filename)
         except Exception as e:
-            if fp:
-                fp.close()
             logger.log_trace("Download error: %s" % e)
             raise MudderyError(ERR.download_error, "Download file error: %s" % e)
 
@@ -156,17 +155,12 @@ class DownloadResources(BaseRequestProcesser):
     name = ""
 
     async def func(self, args, request):
-        # get data's zip
-        fp = tempfile.TemporaryFile()
+        # get resources' zip
         try:
-            exporter.export_resources(fp)
-            fp.flush()
-
+            chunks = exporter.iter_resources()
             filename = time.strftime("resources_%Y%m%d_%H%M%S.zip", time.localtime())
-            return await file_response(fp, filename)
+            return await stream_response(chunks, filename)
         except Exception as e:
-            if fp:
-                fp.close()
             logger.log_trace("Download error: %s" % e)
             raise MudderyError(ERR.download_error, "Download file error: %s" % e)
 
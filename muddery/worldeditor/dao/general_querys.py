@@ -115,6 +115,26 @@ def get_all_records(table_name):
     return filter_records(table_name)
 
 
+def iter_all_rows(table_name, batch_size=1000):
+    """
+    Iterate over a table's all rows. Rows are fetched from the database in batches, so the
+    whole table is not loaded in the memory.
+
+    Args:
+        table_name: (string) db table's name.
+        batch_size: (number) the number of rows in a batch.
+
+    Returns:
+        (generator) rows of column values.
+    """
+    session = WorldDataDB.inst().get_session()
+    model = WorldDataDB.inst().get_model(table_name)
+
+    stmt = select(model.__table__).order_by(model.__table__.c.id).execution_options(yield_per=batch_size)
+    for row in session.execute(stmt):
+        yield tuple(row)
+
+
 def get_record_by_id(table_name, record_id):
     """
     Get a record by record's id.
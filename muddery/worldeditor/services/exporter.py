@@ -2,8 +2,8 @@
 This module imports data from files to db.
 """
 
+import io
 import os
-import tempfile
 import zipfile
 from muddery.launcher import configs
 from muddery.common.utils.exception import MudderyError, ERR
@@ -13,6 +13,52 @@ from muddery.worldeditor.settings import SETTINGS
 from muddery.worldeditor.dao import general_querys
 
 
+# The size of chunks of streaming exports.
+CHUNK_SIZE = 65536
+
+
+class ChunkBuffer(io.RawIOBase):
+    """
+    A write-only stream which keeps written data until it is popped. Exported zip files
+    are written to it and sent in chunks, so the whole file is never in the memory.
+    """
+    def __init__(self):
+        super(ChunkBuffer, self).__init__()
+        self.chunks = []
+        self.size = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def pop(self):
+        """
+        Get and remove all written data.
+        """
+        data = b"".join(self.chunks)
+        self.chunks = []
+        self.size = 0
+        return data
+
+
+def write_table(writer, table_name):
+    """
+    Write a table's records to a writer. Records are read from the database in batches.
+    """
+    fields = general_querys.get_field_names(table_name)
+    writer.writeln(fields)
+
+    for record in general_querys.iter_all_rows(table_name):
+        writer.writeln(["" if value is None else str(value) for value in record])
+        yield
+
+    writer.save()
+
+
 def export_file(filename, table_name, file_type=None):
     """
     Export a table to a csv file.
@@ -31,20 +77,17 @@ def export_file(filename, table_name, file_type=None):
     if not writer:
         raise(MudderyError(ERR.export_data_error, "Can not export table %s" % table_name))
 
-    fields = general_querys.get_field_names(table_name)
-    writer.writeln(fields)
+    for _ in write_table(writer, table_name):
+        pass
 
-    records = general_querys.get_all_records(table_name)
-    for record in records:
-        line = [str(getattr(record, field)) if getattr(record, field) is not None else "" for field in fields]
-        writer.writeln(line)
 
-    writer.save()
-
-
-def export_zip_all(file_obj, file_type=None):
+def iter_zip_all(file_type=None):
     """
-    Export all tables to a zip file which contains a group of csv files.
+    Export all tables to a zip file which contains a group of csv files. Table files are
+    written into the archive directly and the archive's data is returned in chunks.
+
+    Returns:
+        (generator) chunks of the zip file.
     """
     if not file_type:
         # Set default file type.
@@ -54,43 +97,64 @@ def export_zip_all(file_obj, file_type=None):
     if not writer_class:
         raise(MudderyError(ERR.export_data_error, "Unsupport file type %s" % file_type))
 
-    # Get tempfile's name.
-    temp_filename = tempfile.mktemp()
     file_ext = writer_class.file_ext
 
-    try:
-        archive = zipfile.ZipFile(file_obj, 'w', zipfile.ZIP_DEFLATED)
-
+    buffer = ChunkBuffer()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
         # get model names
         table_names = WorldDataDB.inst().get_tables()
         for table_name in table_names:
-            export_file(temp_filename, table_name, file_type)
             filename = table_name + "." + file_ext
-            archive.write(temp_filename, filename)
+            with archive.open(filename, "w") as fp:
+                writer = writer_class(file_obj=fp)
+                for _ in write_table(writer, table_name):
+                    if buffer.size >= CHUNK_SIZE:
+                        yield buffer.pop()
 
         # add version file
         version_file = os.path.join(configs.GAME_DIR, configs.CONFIG_FILE)
         archive.write(version_file, configs.CONFIG_FILE)
-    finally:
-        try:
-            os.remove(temp_filename)
-        except PermissionError:
-            pass
 
+    yield buffer.pop()
 
-def export_resources(file_obj):
+
+def export_zip_all(file_obj, file_type=None):
+    """
+    Export all tables to a zip file which contains a group of csv files.
+    """
+    for chunk in iter_zip_all(file_type):
+        file_obj.write(chunk)
+
+
+def iter_resources():
     """
     Export all resource files to a zip file.
+
+    Returns:
+        (generator) chunks of the zip file.
     """
     dir_name = SETTINGS.MEDIA_ROOT
     dir_length = len(dir_name)
 
-    archive = zipfile.ZipFile(file_obj, 'w', zipfile.ZIP_DEFLATED)   
-    for root, dirs, files in os.walk(dir_name):
-        for filename in files:
-            if filename[:1] == '.':
-                continue
+    buffer = ChunkBuffer()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for root, dirs, files in os.walk(dir_name):
+            for filename in files:
+                if filename[:1] == '.':
+                    continue
+
+                full_path = os.path.join(root, filename)
+                file_name = full_path[dir_length:]
+                archive.write(full_path, file_name)
+                if buffer.size >= CHUNK_SIZE:
+                    yield buffer.pop()
+
+    yield buffer.pop()
+
 
-            full_path = os.path.join(root, filename)
-            file_name = full_path[dir_length:]
-            archive.write(full_path, file_name)
+def export_resources(file_obj):
+    """
+    Export all resource files to a zip file.
+    """
+    for chunk in iter_resources():
+        file_obj.write(chunk)
@@ -0,0 +1,64 @@
+"""
+Call the local game server's HTTP interface.
+"""
+
+import json
+import asyncio
+import subprocess
+from urllib import request, error
+from muddery.server.settings import SETTINGS as GAME_SERVER_SETTINGS
+from muddery.common.utils.exception import MudderyError, ERR
+from muddery.worldeditor.utils.logger import logger
+
+
+# Timeout of requests to the game server in seconds.
+REQUEST_TIMEOUT = 60
+
+
+def get_game_server_url(path):
+    """
+    Get the url of the game server's interface.
+    """
+    port = getattr(GAME_SERVER_SETTINGS, "GAME_SERVER_PORT", GAME_SERVER_SETTINGS.WEBSERVER_PORT)
+    return "http://localhost:%s/%s" % (port, path)
+
+
+def post_request(url):
+    """
+    Send a POST request with the game server's secret and get the response's json data.
+    """
+    headers = {"X-Muddery-Secret": GAME_SERVER_SETTINGS.GAME_SERVER_SECRET}
+    req = request.Request(url, data=b"", headers=headers, method="POST")
+    try:
+        with request.urlopen(req, timeout=REQUEST_TIMEOUT) as response:
+            return json.loads(response.read())
+    except error.HTTPError as e:
+        return json.loads(e.read())
+
+
+async def reload_world():
+    """
+    Let the game server reload changed worlddata without restarting. If the game server is not
+    running, start it.
+
+    Return:
+        (list) names of changed tables, or None if the game server is restarted.
+    """
+    if not GAME_SERVER_SETTINGS.GAME_SERVER_SECRET:
+        # Games created by old versions do not have the secret.
+        logger.log_info("The game server's secret is not set, restart the game server.")
+        subprocess.Popen("muddery restart", shell=True)
+        return None
+
+    loop = asyncio.get_event_loop()
+    try:
+        result = await loop.run_in_executor(None, post_request, get_game_server_url("reload_world"))
+    except error.URLError as e:
+        logger.log_info("Can not connect to the game server, restart it: %s" % e)
+        subprocess.Popen("muddery restart", shell=True)
+        return None
+
+    if result.get("code") != 0:
+        raise MudderyError(ERR.build_world_error, result.get("msg"))
+
+    return result["data"]["tables"]